@@ -0,0 +1,258 @@
+"""
+Benchmark reprodutível das operações principais da locadora e da lista encadeada.
+
+Gera catálogos e clientes sintéticos (semente fixa), mede operações por
+segundo de cada caminho quente e o pico de memória alocada durante as
+operações, e grava o resultado em JSON. Dois resultados podem ser comparados
+para detectar regressões.
+
+Uso:
+    python benchmark.py executar [--tamanhos 1000 10000 100000] [--repeticoes 3] [--saida resultado.json]
+    python benchmark.py comparar base.json novo.json [--tolerancia 0.10]
+"""
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import contextlib
+import tracemalloc
+from linkedlist import DoublyLinkedList, Node
+from gerenciador_locadora import GerenciadorLocadora
+
+VERSAO_RESULTADO = 1
+GENEROS = ["Ação", "Aventura", "Drama", "Comédia", "Fantasia", "Ficção Científica", "Terror", "Animação"]
+# Listagens e buscas são medidas por página, como a CLI as exibe.
+TAMANHO_PAGINA = 50
+
+
+class SaidaNula:
+    """Destino de escrita que descarta tudo (mede as operações, não o terminal)."""
+
+    def write(self, texto: str) -> int:
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def gerar_filmes(quantidade: int, aleatorio: random.Random, prefixo: str = "Filme"):
+    for i in range(quantidade):
+        yield {
+            'titulo': f"{prefixo} {i}",
+            'ano': aleatorio.randint(1950, 2024),
+            'diretor': f"Diretor {aleatorio.randrange(max(1, quantidade // 20))}",
+            'generos': set(aleatorio.sample(GENEROS, 2)),
+            'atores': [f"Ator {aleatorio.randrange(max(1, quantidade // 5))}" for _ in range(3)],
+        }
+
+
+def gerar_clientes(quantidade: int):
+    for i in range(quantidade):
+        yield {'nome': f"Cliente {i}", 'contato': f"cliente{i}@email.com"}
+
+
+def montar_gerenciador(tamanho: int, semente: int) -> GerenciadorLocadora:
+    aleatorio = random.Random(semente)
+    gerenciador = GerenciadorLocadora()
+    gerenciador.importar_filmes(gerar_filmes(tamanho, aleatorio))
+    gerenciador.importar_clientes(gerar_clientes(max(10, tamanho // 10)))
+    return gerenciador
+
+
+def _cronometrar(funcao, argumentos) -> tuple[int, float, int | None]:
+    """Retorna (operações, segundos, pico de memória) — o pico só quando o tracemalloc está ativo."""
+    rastreando = tracemalloc.is_tracing()
+    if rastreando:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(*argumento)
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] - base if rastreando else None
+    return len(argumentos), segundos, pico
+
+
+def rodada_gerenciador(gerenciador: GerenciadorLocadora, tamanho: int, semente: int) -> dict:
+    """
+    Executa uma rodada de operações e retorna {nome: (operações, segundos, pico)}.
+
+    A rodada desfaz o que fez (filmes adicionados são removidos, aluguéis são
+    devolvidos), então pode ser repetida sobre o mesmo gerenciador.
+    """
+    aleatorio = random.Random(semente)
+    quantidade = min(tamanho, 10000)
+    consultas = min(tamanho, 500)
+    tempos = {}
+
+    novos = [
+        (f['titulo'], f['ano'], f['diretor'], f['generos'], f['atores'])
+        for f in gerar_filmes(quantidade, aleatorio, prefixo="Novo")
+    ]
+    primeiro_id = gerenciador.gerador_ids_filmes.proximo_valor
+    tempos['adicionar_filme_catalogo'] = _cronometrar(gerenciador.adicionar_filme_catalogo, novos)
+    ids_novos = [gerenciador.gerador_ids_filmes.codificar(valor)
+                 for valor in range(primeiro_id, gerenciador.gerador_ids_filmes.proximo_valor)]
+
+    ids_disponiveis = list(gerenciador.filmes_por_status_idx['disponivel'])
+    ids_clientes = list(gerenciador.clientes_cadastrados)
+    alugueis = [(id_filme, aleatorio.choice(ids_clientes))
+                for id_filme in aleatorio.sample(ids_disponiveis, min(quantidade, len(ids_disponiveis)))]
+    tempos['alugar_filme'] = _cronometrar(gerenciador.alugar_filme, alugueis)
+
+    status = [(('alugado', 'disponivel')[i % 2], 0, TAMANHO_PAGINA) for i in range(consultas)]
+    tempos['listar_filmes_por_status'] = _cronometrar(gerenciador.listar_filmes_por_status, status)
+
+    generos = [(aleatorio.choice(GENEROS), 0, TAMANHO_PAGINA) for _ in range(consultas)]
+    tempos['buscar_por_genero'] = _cronometrar(gerenciador.buscar_por_genero, generos)
+
+    devolucoes = [(id_filme,) for id_filme, _ in alugueis]
+    tempos['devolver_filme'] = _cronometrar(gerenciador.devolver_filme, devolucoes)
+
+    remocoes = [(id_filme,) for id_filme in ids_novos]
+    tempos['remover_filme_catalogo'] = _cronometrar(gerenciador.remover_filme_catalogo, remocoes)
+    return tempos
+
+
+def rodada_lista(tamanho: int) -> dict:
+    """Mede a DoublyLinkedList crua: inserção no fim, iteração completa e remoção de nós arbitrários."""
+    tempos = {}
+    lista = DoublyLinkedList()
+    nos = [(Node(i),) for i in range(tamanho)]
+    tempos['dll_add_last'] = _cronometrar(lista.add_last, nos)
+    operacoes, segundos, pico = _cronometrar(lambda: sum(1 for _ in lista), [()])
+    tempos['dll_iterar'] = (tamanho, segundos, pico)
+    # Remove na ordem intercalada para não favorecer a cabeça nem a cauda.
+    tempos['dll_remove'] = _cronometrar(lista.remove, nos[::2] + nos[1::2])
+    return tempos
+
+
+def _medir(rodada, repeticoes: int, medir_memoria: bool) -> dict:
+    """Executa a rodada várias vezes, fica com o melhor tempo de cada operação e mede o pico de memória."""
+    melhores = {}
+    for _ in range(repeticoes):
+        for nome, (operacoes, segundos, _) in rodada().items():
+            if nome not in melhores or segundos < melhores[nome][1]:
+                melhores[nome] = (operacoes, segundos, None)
+
+    if medir_memoria:
+        # Rodada separada: o tracemalloc deixa as operações bem mais lentas.
+        tracemalloc.start()
+        try:
+            picos = {nome: pico for nome, (_, _, pico) in rodada().items()}
+        finally:
+            tracemalloc.stop()
+        melhores = {nome: (operacoes, segundos, picos.get(nome))
+                    for nome, (operacoes, segundos, _) in melhores.items()}
+    return melhores
+
+
+def executar(tamanhos: list[int], repeticoes: int, semente: int, medir_memoria: bool) -> dict:
+    resultados = []
+    with contextlib.redirect_stdout(SaidaNula()):
+        for tamanho in tamanhos:
+            inicio = time.perf_counter()
+            gerenciador = montar_gerenciador(tamanho, semente)
+            montagem = time.perf_counter() - inicio
+            medidas = _medir(lambda: rodada_gerenciador(gerenciador, tamanho, semente), repeticoes, medir_memoria)
+            medidas.update(_medir(lambda: rodada_lista(tamanho), repeticoes, medir_memoria))
+            medidas['montagem_catalogo'] = (tamanho, montagem, None)
+            for nome, (operacoes, segundos, pico) in sorted(medidas.items()):
+                resultados.append({
+                    'nome': nome,
+                    'tamanho': tamanho,
+                    'operacoes': operacoes,
+                    'segundos': round(segundos, 6),
+                    'ops_por_segundo': round(operacoes / segundos, 1) if segundos > 0 else None,
+                    'pico_memoria_bytes': pico,
+                })
+            print(f"Tamanho {tamanho} concluído.", file=sys.stderr)
+    return {
+        'versao': VERSAO_RESULTADO,
+        'data': datetime.datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': semente,
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+
+
+def exibir_resultados(resultado: dict):
+    print(f"{'operação':<28}{'tamanho':>10}{'ops/s':>16}{'pico memória':>16}")
+    for item in resultado['resultados']:
+        pico = f"{item['pico_memoria_bytes'] / 1024:,.0f} KiB" if item['pico_memoria_bytes'] is not None else "-"
+        ops = f"{item['ops_por_segundo']:,.0f}" if item['ops_por_segundo'] is not None else "-"
+        print(f"{item['nome']:<28}{item['tamanho']:>10}{ops:>16}{pico:>16}")
+
+
+def comparar(base: dict, novo: dict, tolerancia: float) -> list[str]:
+    """Compara dois resultados e retorna a descrição das regressões (ops/s abaixo de 1 - tolerância)."""
+    indice_base = {(item['nome'], item['tamanho']): item for item in base['resultados']}
+    regressoes = []
+    print(f"{'operação':<28}{'tamanho':>10}{'base ops/s':>16}{'novo ops/s':>16}{'variação':>12}")
+    for item in novo['resultados']:
+        anterior = indice_base.get((item['nome'], item['tamanho']))
+        if anterior is None or not anterior['ops_por_segundo'] or not item['ops_por_segundo']:
+            continue
+        razao = item['ops_por_segundo'] / anterior['ops_por_segundo']
+        marcador = ""
+        if razao < 1 - tolerancia:
+            marcador = "  << REGRESSÃO"
+            regressoes.append(f"{item['nome']} ({item['tamanho']}): {razao - 1:+.1%}")
+        print(f"{item['nome']:<28}{item['tamanho']:>10}{anterior['ops_por_segundo']:>16,.0f}"
+              f"{item['ops_por_segundo']:>16,.0f}{razao - 1:>+12.1%}{marcador}")
+    return regressoes
+
+
+def obter_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark da locadora e da lista encadeada")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    executar_parser = subcomandos.add_parser("executar", help="mede as operações e grava o resultado em JSON")
+    executar_parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000],
+                                 help="tamanhos de catálogo (de 10^3 a 10^6)")
+    executar_parser.add_argument("--repeticoes", type=int, default=3, help="rodadas por tamanho (vale a melhor)")
+    executar_parser.add_argument("--semente", type=int, default=42)
+    executar_parser.add_argument("--saida", metavar="ARQUIVO", help="arquivo JSON de saída (padrão: saída padrão)")
+    executar_parser.add_argument("--sem-memoria", action="store_true",
+                                 help="não mede o pico de memória (evita uma rodada extra com tracemalloc)")
+
+    comparar_parser = subcomandos.add_parser("comparar", help="compara dois resultados e aponta regressões")
+    comparar_parser.add_argument("base")
+    comparar_parser.add_argument("novo")
+    comparar_parser.add_argument("--tolerancia", type=float, default=0.10,
+                                 help="queda relativa de ops/s tolerada antes de acusar regressão (padrão: 0.10)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    argumentos = obter_argumentos()
+    if argumentos.comando == "executar":
+        resultado = executar(argumentos.tamanhos, argumentos.repeticoes, argumentos.semente, not argumentos.sem_memoria)
+        if argumentos.saida:
+            with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            exibir_resultados(resultado)
+        else:
+            json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        return 0
+
+    with open(argumentos.base, "r", encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(argumentos.novo, "r", encoding="utf-8") as arquivo:
+        novo = json.load(arquivo)
+    regressoes = comparar(base, novo, argumentos.tolerancia)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {argumentos.tolerancia:.0%}: " + "; ".join(regressoes))
+        return 1
+    print("\nNenhuma regressão encontrada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
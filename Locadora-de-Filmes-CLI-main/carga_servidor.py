@@ -0,0 +1,179 @@
+"""
+Gerador de carga para o servidor da locadora (servidor.py).
+
+Abre várias conexões persistentes, envia requisições em pipeline (até
+`--janela` requisições em voo por conexão) com uma mistura de consultas,
+aluguéis e devoluções, e ao final mostra a vazão e as latências p50/p90/p99.
+
+Uso:
+    python carga_servidor.py --porta 8765 [--conexoes 200] [--requisicoes 500] [--janela 8]
+    python carga_servidor.py --embutido      # sobe um servidor no mesmo processo com dados gerados
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import contextlib
+import collections
+from gerenciador_locadora import GerenciadorLocadora
+from servidor import ServidorLocadora
+
+# As respostas das listagens podem ser bem maiores que as requisições.
+TAMANHO_MAXIMO_RESPOSTA = 1 << 24
+
+GENEROS = ["Ação", "Drama", "Comédia", "Terror", "Animação", "Fantasia"]
+
+
+def percentil(valores_ordenados: list[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    if not valores_ordenados:
+        return 0.0
+    posto = max(1, math.ceil(p / 100 * len(valores_ordenados)))
+    return valores_ordenados[posto - 1]
+
+
+def popular_gerenciador(quantidade_filmes: int, quantidade_clientes: int) -> GerenciadorLocadora:
+    gerenciador = GerenciadorLocadora()
+    with open(os.devnull, "w") as descarte, contextlib.redirect_stdout(descarte):
+        for i in range(quantidade_filmes):
+            gerenciador.adicionar_filme_catalogo(f"Filme {i}", 1950 + i % 70, f"Diretor {i % 300}",
+                                                 {GENEROS[i % len(GENEROS)]}, [f"Ator {i % 900}"])
+        for i in range(quantidade_clientes):
+            gerenciador.adicionar_cliente(f"Cliente {i}", f"cliente{i}@email.com")
+    return gerenciador
+
+
+async def conectar(argumentos):
+    if argumentos.unix:
+        return await asyncio.open_unix_connection(argumentos.unix, limit=TAMANHO_MAXIMO_RESPOSTA)
+    return await asyncio.open_connection(argumentos.host, argumentos.porta, limit=TAMANHO_MAXIMO_RESPOSTA)
+
+
+async def chamar(leitor, escritor, op: str, **args) -> dict:
+    escritor.write((json.dumps({'id': 0, 'op': op, 'args': args}) + "\n").encode("utf-8"))
+    await escritor.drain()
+    return json.loads(await leitor.readline())
+
+
+async def coletar_ids(argumentos, maximo: int = 5000) -> tuple[list[str], list[str]]:
+    """Obtém IDs de filmes (paginando pelo cursor) e de clientes para montar a carga."""
+    leitor, escritor = await conectar(argumentos)
+    ids_filmes, apos_id = [], None
+    while len(ids_filmes) < maximo:
+        resposta = await chamar(leitor, escritor, 'listar_filmes', limite=500, apos_id=apos_id)
+        pagina = resposta['resultado']
+        ids_filmes.extend(filme['id'] for filme in pagina['filmes'])
+        apos_id = pagina['proximo']
+        if apos_id is None or len(pagina['filmes']) < 500:
+            break
+    resposta = await chamar(leitor, escritor, 'listar_clientes', limite=500)
+    ids_clientes = [cliente['id_cliente'] for cliente in resposta['resultado']]
+    escritor.close()
+    await escritor.wait_closed()
+    return ids_filmes, ids_clientes
+
+
+def gerar_requisicao(aleatorio: random.Random, ids_filmes, ids_clientes) -> dict:
+    sorteio = aleatorio.random()
+    if sorteio < 0.5:
+        return {'op': 'buscar_filme', 'args': {'id': aleatorio.choice(ids_filmes)}}
+    if sorteio < 0.6:
+        return {'op': 'buscar', 'args': {'generos': [aleatorio.choice(GENEROS)], 'status': 'disponivel', 'limite': 20}}
+    if sorteio < 0.7:
+        # Só o número: "Filme" aparece em todos os títulos gerados e pontuaria o catálogo inteiro.
+        return {'op': 'buscar_titulo', 'args': {'consulta': str(aleatorio.randrange(1000)), 'k': 5}}
+    if sorteio < 0.85 and ids_clientes:
+        return {'op': 'alugar', 'args': {'id_filme': aleatorio.choice(ids_filmes), 'id_cliente': aleatorio.choice(ids_clientes)}}
+    return {'op': 'devolver', 'args': {'id_filme': aleatorio.choice(ids_filmes)}}
+
+
+async def executar_conexao(argumentos, indice: int, ids_filmes, ids_clientes, latencias: list, erros: list):
+    aleatorio = random.Random(argumentos.semente + indice)
+    leitor, escritor = await conectar(argumentos)
+    janela = asyncio.Semaphore(argumentos.janela)
+    # As respostas chegam na ordem dos envios: basta uma fila com os instantes de envio.
+    enviados = collections.deque()
+
+    async def enviar():
+        for numero in range(argumentos.requisicoes):
+            await janela.acquire()
+            requisicao = gerar_requisicao(aleatorio, ids_filmes, ids_clientes)
+            requisicao['id'] = numero
+            enviados.append(time.perf_counter())
+            escritor.write((json.dumps(requisicao) + "\n").encode("utf-8"))
+            await escritor.drain()
+
+    async def receber():
+        for _ in range(argumentos.requisicoes):
+            linha = await leitor.readline()
+            if not linha:
+                erros.append("conexão encerrada pelo servidor")
+                return
+            latencias.append(time.perf_counter() - enviados.popleft())
+            resposta = json.loads(linha)
+            if 'erro' in resposta:
+                erros.append(resposta['erro'])
+            janela.release()
+
+    await asyncio.gather(enviar(), receber())
+    escritor.close()
+    await escritor.wait_closed()
+
+
+async def executar_carga(argumentos):
+    servidor = None
+    if argumentos.embutido:
+        gerenciador = popular_gerenciador(argumentos.filmes, argumentos.clientes)
+        servidor = await ServidorLocadora(gerenciador).iniciar(argumentos.host, 0)
+        argumentos.porta = servidor.sockets[0].getsockname()[1]
+
+    ids_filmes, ids_clientes = await coletar_ids(argumentos)
+    if not ids_filmes:
+        print("ERRO: O servidor não tem filmes cadastrados para gerar a carga.")
+        return 1
+
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        executar_conexao(argumentos, indice, ids_filmes, ids_clientes, latencias, erros)
+        for indice in range(argumentos.conexoes)
+    ))
+    segundos = time.perf_counter() - inicio
+
+    if servidor is not None:
+        servidor.close()
+        await servidor.wait_closed()
+
+    latencias.sort()
+    print(f"{len(latencias)} requisições em {segundos:.2f}s ({len(latencias) / segundos:,.0f} req/s) "
+          f"com {argumentos.conexoes} conexões e janela {argumentos.janela}.")
+    print("Latência (ms): " + ", ".join(
+        f"p{p}={percentil(latencias, p) * 1000:.2f}" for p in (50, 90, 99)
+    ) + f", máx={latencias[-1] * 1000:.2f}" if latencias else "Nenhuma resposta recebida.")
+    if erros:
+        print(f"AVISO: {len(erros)} resposta(s) com erro (ex.: {erros[0]}).")
+    return 0
+
+
+def obter_argumentos():
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor da locadora")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", metavar="CAMINHO", help="conecta por socket Unix em vez de TCP")
+    parser.add_argument("--conexoes", type=int, default=200)
+    parser.add_argument("--requisicoes", type=int, default=500, help="requisições por conexão")
+    parser.add_argument("--janela", type=int, default=8, help="requisições em voo por conexão (pipelining)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--embutido", action="store_true",
+                        help="sobe um servidor no mesmo processo com dados gerados")
+    parser.add_argument("--filmes", type=int, default=20000, help="filmes gerados com --embutido")
+    parser.add_argument("--clientes", type=int, default=500, help="clientes gerados com --embutido")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(executar_carga(obter_argumentos())))
@@ -1,3 +1,6 @@
+import datetime
+from gerenciador_locadora import formatar_data
+
 def exibir_menu_principal():
     print("\n=========== LOCADORA DE FILMES CLI ===========")
     print("--- Gerenciar Filmes ---")
@@ -8,16 +11,40 @@ def exibir_menu_principal():
     print("5. Buscar filmes por gênero")
     print("6. Buscar filme por ID")
     print("7. Remover filme do catálogo (por ID)")
+    print("8. Busca avançada (gênero, ator, diretor, ano, status)")
+    print("9. Listar filmes por ano de lançamento")
+    print("10. Adicionar ou remover cópias de um filme")
     print("--- Gerenciar Clientes ---")
-    print("10. Adicionar novo cliente")
-    print("11. Listar todos os clientes")
-    print("12. Ver histórico de aluguéis de um cliente")
-    print("13. Remover cliente (por ID)")
+    print("11. Adicionar novo cliente")
+    print("12. Listar todos os clientes")
+    print("13. Ver histórico de aluguéis de um cliente")
+    print("14. Remover cliente (por ID)")
+    print("15. Buscar clientes por nome")
+    print("16. Ver filmes alugados por um cliente")
     print("--- Operações de Aluguel ---")
     print("20. Alugar filme")
     print("21. Devolver filme")
+    print("22. Listar aluguéis atrasados (com multas)")
+    print("23. Listar aluguéis que vencem nos próximos dias")
+    print("24. Definir prazo de aluguel de um filme")
+    print("25. Reservar filme (entrar na fila de espera)")
+    print("26. Cancelar reserva")
+    print("27. Ver fila de reservas de um filme")
+    print("28. Ver reservas de um cliente")
+    print("--- Consultas ---")
+    print("30. Buscar filmes por título")
+    print("31. Filmes similares a um filme")
     print("--- Sistema ---")
     print("40. Ver últimas ações realizadas")
+    print("41. Ver métricas de desempenho")
+    print("42. Exportar métricas (formato Prometheus)")
+    print("43. Perfilar a próxima operação (cProfile)")
+    print("--- Relatórios ---")
+    print("50. Filmes mais alugados (no mês ou no geral)")
+    print("51. Clientes que mais alugam")
+    print("52. Gêneros mais procurados")
+    print("53. Aluguéis e devoluções por mês")
+    print("54. Aluguéis feitos em um período")
     print("0. Sair do programa")
     print("===============================================")
 
@@ -56,7 +83,14 @@ def obter_detalhes_filme_usuario() -> dict | None:
         print("AVISO: Nenhum ator informado. Será registrado como 'Não informado'.")
         atores = ["Não informado"]
 
-    return {"titulo": titulo, "ano": ano, "diretor": diretor, "generos": generos, "atores": atores}
+    copias_str = input("Quantidade de cópias (padrão: 1): ").strip()
+    try:
+        copias = int(copias_str) if copias_str else 1
+    except ValueError:
+        print("Quantidade de cópias inválida.")
+        return None
+
+    return {"titulo": titulo, "ano": ano, "diretor": diretor, "generos": generos, "atores": atores, "copias": copias}
 
 def obter_detalhes_cliente_usuario() -> dict | None:
     print("\n--- Adicionar Novo Cliente ---")
@@ -65,6 +99,35 @@ def obter_detalhes_cliente_usuario() -> dict | None:
     contato = input("Contato (telefone/email): ").strip()
     return {"nome": nome, "contato": contato}
 
+def obter_criterios_busca_usuario() -> dict | None:
+    print("\n--- Busca Avançada de Filmes (deixe em branco para ignorar) ---")
+    criterios = {}
+    generos_str = input("Gêneros (separados por vírgula): ").strip()
+    if generos_str:
+        criterios["generos"] = [g.strip() for g in generos_str.split(',') if g.strip()]
+        if len(criterios["generos"]) > 1:
+            modo = input("Exigir todos os gêneros (E) ou qualquer um (OU)? [E/ou]: ").strip().lower()
+            criterios["todos_generos"] = modo != "ou"
+    ator = input("Ator: ").strip()
+    if ator: criterios["ator"] = ator
+    diretor = input("Diretor: ").strip()
+    if diretor: criterios["diretor"] = diretor
+    try:
+        ano_min = input("Ano mínimo: ").strip()
+        if ano_min: criterios["ano_min"] = int(ano_min)
+        ano_max = input("Ano máximo: ").strip()
+        if ano_max: criterios["ano_max"] = int(ano_max)
+    except ValueError:
+        print("Ano inválido.")
+        return None
+    status = input("Status (disponivel/alugado): ").strip().lower()
+    if status:
+        if status not in ("disponivel", "alugado"):
+            print("Status inválido.")
+            return None
+        criterios["status"] = status
+    return criterios
+
 def iniciar_interface(gerenciador):
     historico_comandos_menu = [] 
     while True:
@@ -77,7 +140,7 @@ def iniciar_interface(gerenciador):
             if detalhes:
                 gerenciador.adicionar_filme_catalogo(
                     detalhes["titulo"], detalhes["ano"], detalhes["diretor"],
-                    detalhes["generos"], detalhes["atores"]
+                    detalhes["generos"], detalhes["atores"], detalhes["copias"]
                 )
         elif escolha == 2:
             gerenciador.listar_todos_os_filmes()
@@ -102,40 +165,165 @@ def iniciar_interface(gerenciador):
                 print(f"Gêneros: {', '.join(filme.get('generos', ['N/A']))}")
                 print(f"Atores: {', '.join(filme.get('atores', ['N/A']))}")
                 print(f"Status: {filme['status'].upper()}")
-                if filme['status'] == 'alugado':
-                    cliente_alugou = gerenciador.buscar_cliente_por_id(filme.get('id_cliente_alugou', ''))
+                if filme['copias'] > 1:
+                    print(f"Cópias: {filme.copias_disponiveis()} disponível(is) de {filme['copias']}")
+                for id_cliente, (copia, data_aluguel, data_vencimento) in list((filme['alugueis'] or {}).items()):
+                    cliente_alugou = gerenciador.buscar_cliente_por_id(id_cliente)
                     nome_cliente = cliente_alugou['nome'] if cliente_alugou else "Desconhecido"
-                    print(f"Alugado por: {nome_cliente} (ID Cliente: {filme.get('id_cliente_alugou', 'N/A')}) em {filme.get('data_aluguel', 'N/A')}")
+                    copia_str = f"Cópia {copia} alugada" if filme['copias'] > 1 else "Alugado"
+                    print(f"{copia_str} por: {nome_cliente} (ID Cliente: {id_cliente}) em {data_aluguel}")
+                    print(f"Devolução prevista: {formatar_data(data_vencimento)}")
+                    multa = gerenciador.calcular_multa(filme['id'], id_cliente=id_cliente)
+                    if multa:
+                        print(f"Multa por atraso até hoje: R$ {multa:.2f}")
         elif escolha == 7:
             id_filme = input("Digite o ID do filme para remover do catálogo: ").strip()
             gerenciador.remover_filme_catalogo(id_filme)
+        elif escolha == 8:
+            criterios = obter_criterios_busca_usuario()
+            if criterios is not None:
+                gerenciador.exibir_busca_filmes(**criterios)
+        elif escolha == 9:
+            try:
+                ano_ini = input("Ano inicial (em branco para o mais antigo): ").strip()
+                ano_fim = input("Ano final (em branco para o mais recente): ").strip()
+                gerenciador.listar_filmes_por_ano(int(ano_ini) if ano_ini else None, int(ano_fim) if ano_fim else None)
+            except ValueError:
+                print("Ano inválido.")
         elif escolha == 10:
+            id_filme = input("Digite o ID do filme: ").strip()
+            try:
+                quantidade = int(input("Quantidade de cópias (negativa para remover): ").strip())
+            except ValueError:
+                print("Quantidade inválida.")
+            else:
+                if quantidade >= 0:
+                    gerenciador.adicionar_copias(id_filme, quantidade)
+                else:
+                    gerenciador.remover_copias(id_filme, -quantidade)
+        elif escolha == 11:
             detalhes_cliente = obter_detalhes_cliente_usuario()
             if detalhes_cliente:
                 gerenciador.adicionar_cliente(detalhes_cliente['nome'], detalhes_cliente['contato'])
-        elif escolha == 11:
-            gerenciador.listar_clientes()
         elif escolha == 12:
+            gerenciador.listar_clientes()
+        elif escolha == 13:
             id_cliente = input("Digite o ID do cliente para ver o histórico: ").strip()
             gerenciador.ver_historico_cliente(id_cliente)
-        elif escolha == 13:
+        elif escolha == 14:
             id_cliente = input("Digite o ID do cliente para remover: ").strip()
             gerenciador.remover_cliente(id_cliente)
+        elif escolha == 15:
+            prefixo = input("Digite o nome (ou início do nome) do cliente: ").strip()
+            clientes = gerenciador.buscar_clientes_por_prefixo(prefixo, limite=20)
+            if not clientes:
+                print(f"Nenhum cliente encontrado para '{prefixo}'.")
+            else:
+                print(f"\n--- Clientes encontrados para '{prefixo}' ---")
+                for i, cliente in enumerate(clientes, 1):
+                    print(f"{i}. Nome: {cliente['nome']} (ID: {cliente['id_cliente']}, Contato: {cliente['contato']})")
+        elif escolha == 16:
+            id_cliente = input("Digite o ID do cliente: ").strip()
+            if gerenciador.buscar_cliente_por_id(id_cliente):
+                filmes = gerenciador.listar_alugueis_ativos(id_cliente)
+                if not filmes:
+                    print("Este cliente não possui filmes alugados no momento.")
+                for filme in filmes:
+                    aluguel = (filme['alugueis'] or {}).get(id_cliente)
+                    if aluguel:
+                        print(f"- {filme['titulo']} ({filme['ano']}) - ID: {filme['id']}, alugado em {aluguel[1]}, "
+                              f"devolução prevista em {formatar_data(aluguel[2])}")
         elif escolha == 20:
             id_filme = input("Digite o ID do filme a ser alugado: ").strip()
             id_cliente = input("Digite o ID do cliente que está alugando: ").strip()
             gerenciador.alugar_filme(id_filme, id_cliente)
         elif escolha == 21:
             id_filme = input("Digite o ID do filme a ser devolvido: ").strip()
-            gerenciador.devolver_filme(id_filme)
+            filme = gerenciador.buscar_filme_por_id(id_filme)
+            id_cliente = None
+            if filme and filme.copias_alugadas() > 1:
+                id_cliente = input("Várias cópias estão alugadas. Digite o ID do cliente que está devolvendo: ").strip()
+            gerenciador.devolver_filme(id_filme, id_cliente)
+        elif escolha == 22:
+            gerenciador.listar_atrasados()
+        elif escolha == 23:
+            try:
+                dias = input("Vencimentos nos próximos quantos dias? (padrão: 3): ").strip()
+                gerenciador.listar_vencimentos(int(dias) if dias else 3)
+            except ValueError:
+                print("Quantidade de dias inválida.")
+        elif escolha == 24:
+            id_filme = input("Digite o ID do filme: ").strip()
+            dias = input("Prazo em dias (em branco para voltar ao prazo do gênero/padrão): ").strip()
+            try:
+                gerenciador.definir_prazo_filme(id_filme, int(dias) if dias else None)
+            except ValueError:
+                print("Prazo inválido.")
+        elif escolha == 25:
+            id_filme = input("Digite o ID do filme a ser reservado: ").strip()
+            id_cliente = input("Digite o ID do cliente: ").strip()
+            gerenciador.reservar_filme(id_filme, id_cliente)
+        elif escolha == 26:
+            id_filme = input("Digite o ID do filme: ").strip()
+            id_cliente = input("Digite o ID do cliente: ").strip()
+            gerenciador.cancelar_reserva(id_filme, id_cliente)
+        elif escolha == 27:
+            id_filme = input("Digite o ID do filme: ").strip()
+            gerenciador.listar_fila_reservas(id_filme)
+        elif escolha == 28:
+            id_cliente = input("Digite o ID do cliente: ").strip()
+            gerenciador.listar_reservas_cliente(id_cliente)
+        elif escolha == 30:
+            consulta = input("Digite o título (ou parte dele): ").strip()
+            gerenciador.exibir_busca_titulo(consulta)
+        elif escolha == 31:
+            id_filme = input("Digite o ID do filme: ").strip()
+            gerenciador.exibir_filmes_similares(id_filme)
+        elif escolha in (50, 51, 52):
+            quantidade = input("Quantas posições deseja ver? (padrão: 10): ").strip()
+            try:
+                quantidade = int(quantidade) if quantidade else 10
+            except ValueError:
+                print("Quantidade inválida. Usando o valor padrão de 10.")
+                quantidade = 10
+            if escolha == 50:
+                mes_atual = datetime.date.today().strftime("%Y-%m")
+                mes = input(f"Mês no formato AAAA-MM (Enter para {mes_atual}, 'geral' para todo o período): ").strip()
+                gerenciador.exibir_filmes_mais_alugados(quantidade, None if mes.lower() == "geral" else mes or mes_atual)
+            elif escolha == 51:
+                gerenciador.exibir_clientes_que_mais_alugam(quantidade)
+            else:
+                gerenciador.exibir_generos_mais_alugados(quantidade)
+        elif escolha == 53:
+            gerenciador.exibir_alugueis_por_mes()
+        elif escolha == 54:
+            hoje = datetime.date.today().strftime("%Y-%m-%d")
+            data_ini = input("Data inicial (AAAA-MM-DD): ").strip()
+            data_fim = input(f"Data final (AAAA-MM-DD, Enter para {hoje}): ").strip() or hoje
+            gerenciador.exibir_alugueis_entre(data_ini, data_fim)
         elif escolha == 40:
             quantidade = input("Quantas últimas ações deseja ver? (padrão: 10): ").strip()
+            id_entidade = input("Filtrar por ID de filme ou cliente (Enter para todas): ").strip() or None
             try:
                 quantidade = int(quantidade) if quantidade else 10
-                gerenciador.ver_ultimas_acoes(quantidade)
+                gerenciador.ver_ultimas_acoes(quantidade, id_entidade=id_entidade)
             except ValueError:
                 print("Quantidade inválida. Usando o valor padrão de 10.")
-                gerenciador.ver_ultimas_acoes()
+                gerenciador.ver_ultimas_acoes(id_entidade=id_entidade)
+        elif escolha in (41, 42, 43) and gerenciador.metricas is None:
+            print("Métricas desativadas. Inicie o programa com --metricas para ativá-las.")
+        elif escolha == 41:
+            gerenciador.metricas.exibir()
+        elif escolha == 42:
+            caminho = input("Arquivo de destino (padrão: metricas.prom): ").strip() or "metricas.prom"
+            try:
+                gerenciador.metricas.exportar_prometheus(caminho)
+                print(f"SUCESSO: Métricas exportadas para '{caminho}'.")
+            except OSError as e:
+                print(f"ERRO: Não foi possível gravar as métricas. {e}")
+        elif escolha == 43:
+            gerenciador.metricas.perfilar_proxima = True
+            print("A próxima operação será executada sob o cProfile e o perfil será exibido ao final.")
         elif escolha == 0:
             print("\nObrigado por usar a Locadora de Filmes CLI!")
             if len(historico_comandos_menu) > 1:
@@ -145,5 +333,8 @@ def iniciar_interface(gerenciador):
             break
         else:
             print("Opção desconhecida. Por favor, tente novamente.")
+        # No menu cada comando vai para o disco antes da pausa; o lote de --lote-journal fica para scripts e servidor.
+        if gerenciador.persistencia is not None:
+            gerenciador.persistencia.sincronizar()
         if escolha != 0:
             input("\nPressione Enter para continuar...")
\ No newline at end of file
@@ -0,0 +1,398 @@
+import threading
+import contextlib
+import functools
+from gerenciador_locadora import GerenciadorLocadora
+
+
+class TravaLeituraEscrita:
+    """
+    Trava de leitores e escritor com preferência para o escritor.
+
+    Vários leitores podem segurar a trava ao mesmo tempo; o escritor espera
+    até que todos saiam e, enquanto espera, novos leitores ficam bloqueados
+    (evita que um fluxo contínuo de leituras impeça as escritas). A trava é
+    reentrante: uma thread que já lê pode ler de novo, e quem escreve pode
+    ler ou escrever de novo. Promover uma leitura para escrita não é
+    suportado e gera RuntimeError em vez de travar o programa.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        self._leitores = 0
+        self._escritor = None
+        self._profundidade_escrita = 0
+        self._escritores_esperando = 0
+        self._local = threading.local()
+
+    def adquirir_leitura(self):
+        leituras = getattr(self._local, 'leituras', 0)
+        if leituras or self._escritor == threading.get_ident():
+            self._local.leituras = leituras + 1
+            return
+        with self._condicao:
+            while self._escritor is not None or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        self._local.leituras = 1
+        self._local.registrado = True
+
+    def liberar_leitura(self):
+        self._local.leituras -= 1
+        if self._local.leituras or not getattr(self._local, 'registrado', False):
+            return
+        self._local.registrado = False
+        with self._condicao:
+            self._leitores -= 1
+            if not self._leitores:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        eu = threading.get_ident()
+        if self._escritor == eu:
+            self._profundidade_escrita += 1
+            return
+        if getattr(self._local, 'leituras', 0):
+            raise RuntimeError("Não é possível promover uma trava de leitura para escrita.")
+        with self._condicao:
+            self._escritores_esperando += 1
+            try:
+                while self._escritor is not None or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_esperando -= 1
+            self._escritor = eu
+            self._profundidade_escrita = 1
+
+    def liberar_escrita(self):
+        self._profundidade_escrita -= 1
+        if self._profundidade_escrita:
+            return
+        with self._condicao:
+            self._escritor = None
+            self._condicao.notify_all()
+
+    @contextlib.contextmanager
+    def leitura(self):
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextlib.contextmanager
+    def escrita(self):
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+class TravasListradas:
+    """
+    Conjunto fixo de travas escolhidas pelo hash da chave (lock striping).
+
+    Cada ID de filme ou cliente cai sempre na mesma listra, então operações
+    sobre entidades diferentes raramente disputam a mesma trava e o consumo de
+    memória não cresce com o catálogo. Quando várias chaves são travadas juntas,
+    as listras são adquiridas em ordem crescente, o que impede deadlock entre
+    threads que travam as mesmas chaves em ordens diferentes.
+    """
+
+    def __init__(self, quantidade: int = 64):
+        if quantidade < 1:
+            raise ValueError("A quantidade de travas deve ser pelo menos 1.")
+        self._travas = [threading.Lock() for _ in range(quantidade)]
+
+    def _listras(self, chaves) -> list[int]:
+        return sorted({hash(chave) % len(self._travas) for chave in chaves if chave is not None})
+
+    @contextlib.contextmanager
+    def travar(self, *chaves):
+        listras = self._listras(chaves)
+        adquiridas = []
+        try:
+            for listra in listras:
+                self._travas[listra].acquire()
+                adquiridas.append(listra)
+            yield
+        finally:
+            for listra in reversed(adquiridas):
+                self._travas[listra].release()
+
+
+# Métodos que alteram a estrutura do catálogo ou dos clientes (DLL e índices).
+METODOS_ESCRITA = (
+    'adicionar_filme_catalogo', 'remover_filme_catalogo', 'importar_filmes',
+    'adicionar_cliente', 'remover_cliente', 'importar_clientes',
+    'definir_prazo_genero', 'definir_prazo_filme', 'adicionar_copias', 'remover_copias',
+    'ativar_cache_similares', 'precomputar_similares',
+)
+
+# Métodos que só consultam o estado.
+METODOS_LEITURA = (
+    'buscar_filme_por_titulo_ano', 'buscar_filme_por_id', 'contar_filmes_por_status',
+    'buscar_por_titulo', 'buscar_cliente_por_nome', 'buscar_clientes_por_prefixo',
+    'buscar_cliente_por_id', 'listar_alugueis_ativos', 'ver_ultimas_acoes',
+    'listar_todos_os_filmes', 'listar_filmes_por_status', 'listar_clientes',
+    'ver_historico_cliente', 'listar_generos_disponiveis', 'buscar_por_genero',
+    'listar_filmes_por_ano', 'exibir_busca_filmes', 'exibir_busca_titulo',
+    'calcular_multa', 'listar_atrasados', 'listar_vencimentos',
+    'tamanho_fila', 'listar_fila_reservas', 'listar_reservas_cliente',
+    'exibir_filmes_mais_alugados', 'exibir_clientes_que_mais_alugam', 'exibir_generos_mais_alugados',
+    'exibir_alugueis_por_mes', 'exibir_alugueis_entre', 'filmes_similares', 'exibir_filmes_similares',
+)
+
+# Consultas que retornam iteradores preguiçosos: a página é materializada sob a
+# trava de leitura, para que nenhuma trava fique presa a um gerador não consumido.
+METODOS_ITERADORES = (
+    'iterar_filmes', 'iterar_filmes_por_genero', 'iterar_clientes',
+    'filmes_entre', 'iterar_filmes_por_ano',
+)
+
+
+def _com_escrita(metodo):
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self.trava_catalogo.escrita():
+            resultado = metodo(self, *args, **kwargs)
+        self._compactar_se_pendente()
+        return resultado
+    return envolvido
+
+
+def _com_leitura(metodo):
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self.trava_catalogo.leitura():
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+def _com_leitura_materializada(metodo):
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self.trava_catalogo.leitura():
+            return iter(list(metodo(self, *args, **kwargs)))
+    return envolvido
+
+
+class GerenciadorLocadoraConcorrente(GerenciadorLocadora):
+    """
+    GerenciadorLocadora seguro para uso por várias threads (vários terminais).
+
+    - Uma trava de leitores e escritor protege a DLL e os índices: consultas
+      rodam em paralelo e inclusões/remoções de filmes e clientes são exclusivas.
+    - Aluguel e devolução seguram apenas a trava de leitura mais as listras do
+      filme e do cliente, então operações em filmes diferentes não se bloqueiam
+      e o "verifica status e marca como alugado" é atômico para cada filme.
+      Reservas seguem o mesmo esquema; a fila de um filme é atendida depois
+      da devolução, travando um cliente da fila de cada vez.
+    - O índice de status e o heap de vencimentos, os únicos alterados por
+      aluguéis e devoluções, têm uma trava própria: quem os percorre a segura
+      durante a página, em vez de copiar todas as chaves a cada consulta.
+    - As estatísticas e o histórico de aluguéis em colunas são compartilhados
+      por todos os filmes e clientes e têm cada um sua própria trava, segura só
+      durante cada atualização ou consulta.
+    - A compactação da persistência é adiada e feita com a trava de escrita,
+      para que o snapshot nunca capture um aluguel pela metade.
+    """
+
+    def __init__(self, *args, quantidade_travas: int = 64, **kwargs):
+        self.trava_catalogo = TravaLeituraEscrita()
+        self.travas_entidades = TravasListradas(quantidade_travas)
+        self.trava_status = threading.Lock()
+        self.trava_estatisticas = threading.Lock()
+        self.trava_historico = threading.Lock()
+        self._persistencia = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def persistencia(self):
+        return self._persistencia
+
+    @persistencia.setter
+    def persistencia(self, persistencia):
+        if persistencia is not None:
+            persistencia.adiar_compactacao = True
+        self._persistencia = persistencia
+
+    def _compactar_se_pendente(self):
+        persistencia = self._persistencia
+        if persistencia is None or not persistencia.compactacao_pendente:
+            return
+        with self.trava_catalogo.escrita():
+            if persistencia.compactacao_pendente:
+                persistencia.compactar()
+
+    def _alterar_status_filme(self, dados_filme: dict, novo_status: str):
+        with self.trava_status:
+            super()._alterar_status_filme(dados_filme, novo_status)
+
+    def _agendar_vencimento(self, data_vencimento: int, id_filme: str, id_cliente: str):
+        with self.trava_status:
+            super()._agendar_vencimento(data_vencimento, id_filme, id_cliente)
+
+    def _descartar_vencimento(self):
+        with self.trava_status:
+            super()._descartar_vencimento()
+
+    def _anotar_aluguel(self, dados_filme: dict, id_cliente: str, data_aluguel: str) -> int:
+        with self.trava_historico:
+            return super()._anotar_aluguel(dados_filme, id_cliente, data_aluguel)
+
+    def _anotar_devolucao(self, offset: int, data_devolucao: str) -> str:
+        with self.trava_historico:
+            return super()._anotar_devolucao(offset, data_devolucao)
+
+    def _filmes_recentes_do_cliente(self, id_cliente: str, quantidade: int) -> set[str]:
+        with self.trava_historico:
+            return super()._filmes_recentes_do_cliente(id_cliente, quantidade)
+
+    def iterar_historico_cliente(self, id_cliente: str, offset: int = 0, limite: int | None = None):
+        with self.trava_catalogo.leitura(), self.trava_historico:
+            return iter(list(super().iterar_historico_cliente(id_cliente, offset, limite)))
+
+    def alugueis_entre(self, data_ini: str | None, data_fim: str | None, offset: int = 0, limite: int | None = None,
+                       decrescente: bool = False):
+        with self.trava_catalogo.leitura(), self.trava_historico:
+            return iter(list(super().alugueis_entre(data_ini, data_fim, offset, limite, decrescente)))
+
+    def _contabilizar_aluguel(self, dados_filme: dict, id_cliente: str, data_aluguel: str):
+        with self.trava_estatisticas:
+            super()._contabilizar_aluguel(dados_filme, id_cliente, data_aluguel)
+
+    def _contabilizar_devolucao(self, id_filme: str, data_aluguel: str, data_devolucao: str):
+        with self.trava_estatisticas:
+            super()._contabilizar_devolucao(id_filme, data_aluguel, data_devolucao)
+
+    def _contabilizar_historico(self, cliente: dict, sinal: int):
+        with self.trava_estatisticas:
+            super()._contabilizar_historico(cliente, sinal)
+
+    def filmes_mais_alugados(self, k: int = 10, mes: str | None = None) -> list[tuple[dict, int]]:
+        with self.trava_catalogo.leitura(), self.trava_estatisticas:
+            return super().filmes_mais_alugados(k, mes)
+
+    def clientes_que_mais_alugam(self, k: int = 10) -> list[tuple[dict, int]]:
+        with self.trava_catalogo.leitura(), self.trava_estatisticas:
+            return super().clientes_que_mais_alugam(k)
+
+    def generos_mais_alugados(self, k: int = 10) -> list[tuple[str, int]]:
+        with self.trava_estatisticas:
+            return super().generos_mais_alugados(k)
+
+    def alugueis_por_mes(self, ultimos: int | None = 12) -> list[tuple[str, int, int]]:
+        with self.trava_estatisticas:
+            return super().alugueis_por_mes(ultimos)
+
+    def _clientes_recentes_do_filme(self, id_filme: str, limite: int) -> list[str]:
+        with self.trava_estatisticas:
+            return super()._clientes_recentes_do_filme(id_filme, limite)
+
+    def duracao_media_aluguel(self, id_filme: str) -> float | None:
+        with self.trava_estatisticas:
+            return super().duracao_media_aluguel(id_filme)
+
+    def _alugueis_do_filme(self, filme: dict) -> list[tuple[str, tuple]]:
+        # Aluguel e devolução alteram (ou trocam por None) o dicionário sob a listra do filme.
+        with self.travas_entidades.travar(filme['id']):
+            return super()._alugueis_do_filme(filme)
+
+    def filmes_atrasados(self, hoje: int | None = None, limite: int | None = None):
+        with self.trava_catalogo.leitura(), self.trava_status:
+            return iter(list(super().filmes_atrasados(hoje, limite)))
+
+    def filmes_vencendo(self, dias: int, hoje: int | None = None, limite: int | None = None):
+        with self.trava_catalogo.leitura(), self.trava_status:
+            return iter(list(super().filmes_vencendo(dias, hoje, limite)))
+
+    def iterar_filmes_por_status(self, status: str, offset: int = 0, limite: int | None = None):
+        with self.trava_catalogo.leitura(), self.trava_status:
+            return iter(list(super().iterar_filmes_por_status(status, offset, limite)))
+
+    def buscar_filmes(self, *args, **kwargs):
+        with self.trava_catalogo.leitura(), self.trava_status:
+            return iter(list(super().buscar_filmes(*args, **kwargs)))
+
+    def alugar_filme(self, id_filme: str, id_cliente: str) -> bool:
+        with self.trava_catalogo.leitura(), self.travas_entidades.travar(id_filme, id_cliente):
+            resultado = super().alugar_filme(id_filme, id_cliente)
+        self._compactar_se_pendente()
+        return resultado
+
+    def devolver_filme(self, id_filme: str, id_cliente: str | None = None) -> bool:
+        with self.trava_catalogo.leitura():
+            if id_cliente is not None:
+                with self.travas_entidades.travar(id_filme, id_cliente):
+                    resultado = super()._devolver_copia(id_filme, id_cliente)
+            else:
+                while True:
+                    # Sem o cliente, ele só é conhecido depois de ler o filme; se outro terminal
+                    # devolver e realugar no intervalo, as listras são escolhidas de novo.
+                    no_filme = self.filmes_por_id_idx.get(id_filme)
+                    id_cliente_unico = self._cliente_unico(no_filme.data) if no_filme else None
+                    with self.travas_entidades.travar(id_filme, id_cliente_unico):
+                        no_atual = self.filmes_por_id_idx.get(id_filme)
+                        if no_atual is None or self._cliente_unico(no_atual.data) == id_cliente_unico:
+                            resultado = super()._devolver_copia(id_filme, None)
+                            break
+        # A fila de reservas é atendida depois de soltar as listras: cada entrega trava o próximo cliente.
+        if resultado:
+            self._atender_fila(id_filme)
+        self._compactar_se_pendente()
+        return resultado
+
+    def _atender_fila(self, id_filme: str):
+        while True:
+            with self.trava_catalogo.leitura():
+                fila = self.reservas_por_filme.get(id_filme)
+                cabeca = fila.head if fila else None
+                if cabeca is None:
+                    return
+                id_cliente = cabeca.data[0]
+                with self.travas_entidades.travar(id_filme, id_cliente):
+                    # O primeiro da fila pode ter mudado antes das listras; nesse caso, tenta de novo.
+                    fila = self.reservas_por_filme.get(id_filme)
+                    if fila and fila.head.data[0] == id_cliente and not self._entregar_reserva(id_filme):
+                        return
+
+    def reservar_filme(self, id_filme: str, id_cliente: str) -> bool:
+        with self.trava_catalogo.leitura(), self.travas_entidades.travar(id_filme, id_cliente):
+            resultado = super().reservar_filme(id_filme, id_cliente)
+        self._compactar_se_pendente()
+        return resultado
+
+    def cancelar_reserva(self, id_filme: str, id_cliente: str) -> bool:
+        with self.trava_catalogo.leitura(), self.travas_entidades.travar(id_filme, id_cliente):
+            resultado = super().cancelar_reserva(id_filme, id_cliente)
+        self._compactar_se_pendente()
+        return resultado
+
+    def posicao_na_fila(self, id_filme: str, id_cliente: str) -> int | None:
+        with self.trava_catalogo.leitura(), self.travas_entidades.travar(id_filme, id_cliente):
+            return super().posicao_na_fila(id_filme, id_cliente)
+
+    def iterar_fila(self, id_filme: str, offset: int = 0, limite: int | None = None):
+        with self.trava_catalogo.leitura(), self.travas_entidades.travar(id_filme):
+            return iter(list(super().iterar_fila(id_filme, offset, limite)))
+
+    def reservas_do_cliente(self, id_cliente: str) -> list[tuple[dict, int]]:
+        reservas = []
+        with self.trava_catalogo.leitura():
+            for id_filme in list(self.reservas_por_cliente.get(id_cliente, ())):
+                # A posição depende dos nós anteriores da fila, protegidos pela listra do filme.
+                with self.travas_entidades.travar(id_filme, id_cliente):
+                    no_reserva = self.reservas_por_cliente.get(id_cliente, {}).get(id_filme)
+                    if no_reserva is not None:
+                        reservas.append((self.filmes_por_id_idx[id_filme].data, self._posicao_do_no(no_reserva)))
+        return reservas
+
+
+for _nome in METODOS_ESCRITA:
+    setattr(GerenciadorLocadoraConcorrente, _nome, _com_escrita(getattr(GerenciadorLocadora, _nome)))
+for _nome in METODOS_LEITURA:
+    setattr(GerenciadorLocadoraConcorrente, _nome, _com_leitura(getattr(GerenciadorLocadora, _nome)))
+for _nome in METODOS_ITERADORES:
+    setattr(GerenciadorLocadoraConcorrente, _nome, _com_leitura_materializada(getattr(GerenciadorLocadora, _nome)))
+del _nome
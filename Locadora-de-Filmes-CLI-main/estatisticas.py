@@ -0,0 +1,194 @@
+import heapq
+import datetime
+import itertools
+
+
+class ContadorRanking:
+    """
+    Contagens por chave com consulta das k maiores sem ordenar tudo.
+
+    Cada alteração empilha a nova contagem em um max-heap; a entrada anterior
+    da chave fica obsoleta e é ignorada na leitura (remoção preguiçosa, como no
+    heap de vencimentos do gerenciador). O heap é reconstruído quando mais da
+    metade das entradas está obsoleta. `maiores(k)` percorre o heap sem
+    alterá-lo e custa O(k log k) mais as entradas obsoletas encontradas.
+    """
+
+    def __init__(self):
+        self.contagens = {}
+        self._heap = []
+        self._obsoletos = 0
+
+    def __len__(self) -> int:
+        return len(self.contagens)
+
+    def get(self, chave) -> int:
+        return self.contagens.get(chave, 0)
+
+    def somar(self, chave, quantidade: int = 1):
+        """Soma `quantidade` (negativa para subtrair) à contagem; a chave sai ao chegar a zero."""
+        if chave in self.contagens:
+            self._obsoletos += 1
+        nova = self.contagens.get(chave, 0) + quantidade
+        if nova > 0:
+            self.contagens[chave] = nova
+            heapq.heappush(self._heap, (-nova, chave))
+        else:
+            self.contagens.pop(chave, None)
+        self._compactar_se_necessario()
+
+    def remover(self, chave) -> int:
+        """Tira a chave do ranking e retorna a contagem que ela tinha."""
+        contagem = self.contagens.pop(chave, 0)
+        if contagem:
+            self._obsoletos += 1
+            self._compactar_se_necessario()
+        return contagem
+
+    def _compactar_se_necessario(self):
+        if self._obsoletos > 64 and self._obsoletos * 2 > len(self._heap):
+            self._heap = [(-contagem, chave) for chave, contagem in self.contagens.items()]
+            heapq.heapify(self._heap)
+            self._obsoletos = 0
+
+    def maiores(self, k: int | None = None):
+        """Gera (chave, contagem) em ordem decrescente de contagem (empates pela chave)."""
+        heap = self._heap
+        if not heap or k == 0:
+            return
+        fronteira = [(heap[0], 0)]
+        vistas = set()
+        while fronteira:
+            (negativo, chave), posicao = heapq.heappop(fronteira)
+            # Depois de uma subtração, uma entrada antiga pode voltar a coincidir com a contagem atual.
+            if self.contagens.get(chave) == -negativo and chave not in vistas:
+                vistas.add(chave)
+                yield chave, -negativo
+                if k is not None and len(vistas) >= k:
+                    return
+            for filho in (2 * posicao + 1, 2 * posicao + 2):
+                if filho < len(heap):
+                    heapq.heappush(fronteira, (heap[filho], filho))
+
+
+class EstatisticasAlugueis:
+    """
+    Contadores de aluguéis atualizados a cada aluguel e devolução.
+
+    Mantém rankings de filmes, clientes e gêneros, o ranking de filmes de cada
+    mês ('AAAA-MM'), a quantidade de aluguéis e devoluções por dia e, por filme,
+    quantas devoluções houve, quantos dias as cópias ficaram alugadas e quais
+    clientes o alugaram (para o sinal de coaluguel das recomendações). Tudo é
+    derivado dos históricos dos clientes: o gerenciador reconstrói os contadores
+    ao carregar um snapshot e desconta o histórico de um cliente removido, de
+    modo que o resultado é o mesmo antes e depois de reiniciar.
+    """
+
+    def __init__(self):
+        self.filmes = ContadorRanking()
+        self.clientes = ContadorRanking()
+        self.generos = ContadorRanking()
+        self.filmes_por_mes = {}
+        self.alugueis_por_dia = {}
+        self.devolucoes_por_dia = {}
+        # id_filme -> [devoluções, dias alugados somados]
+        self.devolucoes_por_filme = {}
+        # id_filme -> {id_cliente: None}, do cliente que alugou há mais tempo ao mais recente (sinal de coaluguel).
+        self.clientes_por_filme = {}
+
+    def registrar_aluguel(self, id_filme: str, generos, id_cliente: str, data_aluguel: str, sinal: int = 1):
+        """Conta um aluguel; com sinal=-1, desconta (usado ao remover o cliente)."""
+        self.clientes.somar(id_cliente, sinal)
+        _somar_dia(self.alugueis_por_dia, data_aluguel, sinal)
+        if generos is None:
+            # Filme que já saiu do catálogo: só o cliente e o dia continuam contando.
+            return
+        self.filmes.somar(id_filme, sinal)
+        mes = data_aluguel[:7]
+        ranking_mes = self.filmes_por_mes.get(mes)
+        if ranking_mes is None:
+            ranking_mes = self.filmes_por_mes[mes] = ContadorRanking()
+        ranking_mes.somar(id_filme, sinal)
+        if not ranking_mes:
+            del self.filmes_por_mes[mes]
+        for genero in generos:
+            self.generos.somar(genero.lower(), sinal)
+        clientes = self.clientes_por_filme.setdefault(id_filme, {})
+        clientes.pop(id_cliente, None)
+        if sinal > 0:
+            clientes[id_cliente] = None
+        elif not clientes:
+            del self.clientes_por_filme[id_filme]
+
+    def registrar_devolucao(self, id_filme: str, data_aluguel: str, data_devolucao: str, sinal: int = 1,
+                            filme_no_catalogo: bool = True):
+        _somar_dia(self.devolucoes_por_dia, data_devolucao, sinal)
+        if not filme_no_catalogo:
+            return
+        dias = (datetime.date.fromisoformat(data_devolucao) - datetime.date.fromisoformat(data_aluguel)).days
+        totais = self.devolucoes_por_filme.setdefault(id_filme, [0, 0])
+        totais[0] += sinal
+        totais[1] += sinal * dias
+        if not totais[0]:
+            del self.devolucoes_por_filme[id_filme]
+
+    def registrar_historico(self, id_cliente: str, historico, generos_do_filme, sinal: int = 1):
+        """Conta (ou desconta) todos os aluguéis de um histórico; generos_do_filme(id) é None para filmes removidos."""
+        for id_filme, _, data_aluguel, data_devolucao in historico:
+            generos = generos_do_filme(id_filme)
+            self.registrar_aluguel(id_filme, generos, id_cliente, data_aluguel, sinal)
+            if data_devolucao is not None:
+                self.registrar_devolucao(id_filme, data_aluguel, data_devolucao, sinal, generos is not None)
+
+    def remover_filme(self, id_filme: str, generos):
+        """Tira um filme removido dos rankings de filmes e desconta seus aluguéis dos gêneros."""
+        alugueis = self.filmes.remover(id_filme)
+        for genero in generos:
+            self.generos.somar(genero.lower(), -alugueis)
+        for mes in list(self.filmes_por_mes):
+            self.filmes_por_mes[mes].remover(id_filme)
+            if not self.filmes_por_mes[mes]:
+                del self.filmes_por_mes[mes]
+        self.devolucoes_por_filme.pop(id_filme, None)
+        self.clientes_por_filme.pop(id_filme, None)
+
+    def remover_cliente(self, id_cliente: str):
+        self.clientes.remover(id_cliente)
+
+    def top_filmes(self, k: int, mes: str | None = None) -> list[tuple[str, int]]:
+        """Os k filmes mais alugados, no geral ou no mês informado ('AAAA-MM')."""
+        ranking = self.filmes if mes is None else self.filmes_por_mes.get(mes)
+        return list(ranking.maiores(k)) if ranking is not None else []
+
+    def top_clientes(self, k: int) -> list[tuple[str, int]]:
+        return list(self.clientes.maiores(k))
+
+    def top_generos(self, k: int) -> list[tuple[str, int]]:
+        return list(self.generos.maiores(k))
+
+    def alugueis_por_mes(self, ultimos: int | None = None) -> list[tuple[str, int, int]]:
+        """(mês, aluguéis, devoluções) em ordem cronológica; com `ultimos`, só os últimos meses."""
+        meses = {}
+        for dias, posicao in ((self.alugueis_por_dia, 0), (self.devolucoes_por_dia, 1)):
+            for dia, quantidade in dias.items():
+                meses.setdefault(dia[:7], [0, 0])[posicao] += quantidade
+        resultado = [(mes, alugueis, devolucoes) for mes, (alugueis, devolucoes) in sorted(meses.items())]
+        return resultado[-ultimos:] if ultimos else resultado
+
+    def clientes_recentes(self, id_filme: str, limite: int) -> list[str]:
+        """Os `limite` clientes que alugaram o filme mais recentemente, do mais recente ao mais antigo."""
+        clientes = self.clientes_por_filme.get(id_filme)
+        return list(itertools.islice(reversed(clientes), limite)) if clientes else []
+
+    def duracao_media(self, id_filme: str) -> float | None:
+        """Média de dias que as cópias do filme ficaram alugadas, ou None sem devoluções."""
+        totais = self.devolucoes_por_filme.get(id_filme)
+        return totais[1] / totais[0] if totais else None
+
+
+def _somar_dia(contagens: dict, dia: str, quantidade: int):
+    total = contagens.get(dia, 0) + quantidade
+    if total:
+        contagens[dia] = total
+    else:
+        contagens.pop(dia, None)
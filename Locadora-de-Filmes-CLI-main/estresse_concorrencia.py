@@ -0,0 +1,291 @@
+"""
+Teste de estresse do modo concorrente da locadora.
+
+Várias threads alugam, devolvem, reservam e consultam filmes ao mesmo tempo em um
+GerenciadorLocadoraConcorrente; ao final, as invariantes do estado são
+conferidas. Sai com código 1 se alguma for violada.
+
+Uso:
+    python estresse_concorrencia.py [--threads N] [--operacoes N] [--filmes N] [--clientes N]
+                                    [--copias N] [--com-persistencia] [--sem-travas]
+
+Com --sem-travas o teste roda no GerenciadorLocadora comum, o que serve para
+mostrar as violações que as travas evitam.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+from gerenciador_locadora import GerenciadorLocadora
+from concorrencia import GerenciadorLocadoraConcorrente
+from persistencia import PersistenciaLocadora
+
+
+def popular(gerenciador, quantidade_filmes: int, quantidade_clientes: int, copias: int = 1):
+    generos = ["Ação", "Drama", "Comédia", "Terror", "Animação"]
+    ids_filmes = [
+        gerenciador.adicionar_filme_catalogo(f"Filme {i}", 1950 + i % 70, f"Diretor {i % 40}",
+                                             {generos[i % len(generos)]}, [f"Ator {i % 90}"], copias)['id']
+        for i in range(quantidade_filmes)
+    ]
+    ids_clientes = [
+        gerenciador.adicionar_cliente(f"Cliente {i}", f"cliente{i}@email.com")['id_cliente']
+        for i in range(quantidade_clientes)
+    ]
+    return ids_filmes, ids_clientes
+
+
+def trabalhador(gerenciador, ids_filmes, ids_clientes, operacoes, semente, contadores, indice):
+    aleatorio = random.Random(semente)
+    alugueis = devolucoes = 0
+    falha = None
+    try:
+        for _ in range(operacoes):
+            sorteio = aleatorio.random()
+            id_filme = aleatorio.choice(ids_filmes)
+            if sorteio < 0.45:
+                if gerenciador.alugar_filme(id_filme, aleatorio.choice(ids_clientes)):
+                    alugueis += 1
+            elif sorteio < 0.85:
+                # Metade das devoluções informa o cliente (necessário quando há várias cópias alugadas).
+                clientes = list(gerenciador.buscar_filme_por_id(id_filme)['alugueis'] or ())
+                id_cliente = aleatorio.choice(clientes) if clientes and aleatorio.random() < 0.5 else None
+                if gerenciador.devolver_filme(id_filme, id_cliente):
+                    devolucoes += 1
+            elif sorteio < 0.89:
+                id_cliente = aleatorio.choice(ids_clientes)
+                if aleatorio.random() < 0.75:
+                    gerenciador.reservar_filme(id_filme, id_cliente)
+                else:
+                    gerenciador.cancelar_reserva(id_filme, id_cliente)
+            elif sorteio < 0.91:
+                sum(1 for _ in gerenciador.iterar_filmes_por_status('alugado', limite=50))
+            elif sorteio < 0.93:
+                # As listagens formatam quem está com cada cópia enquanto outras threads alugam e devolvem.
+                gerenciador.listar_filmes_por_status('alugado', limite=20)
+                gerenciador.listar_todos_os_filmes(aleatorio.randrange(len(ids_filmes)), 10)
+                gerenciador.exibir_busca_filmes(generos={"Drama"}, limite=10)
+                gerenciador.calcular_multa(id_filme)
+            elif sorteio < 0.95:
+                # Inclusão e remoção disputam a trava de escrita com as demais operações.
+                filme = gerenciador.adicionar_filme_catalogo(f"Temporário {indice}-{aleatorio.random()}", 2000,
+                                                             "Diretor 0", {"Drama"}, ["Ator 0"])
+                if filme:
+                    gerenciador.remover_filme_catalogo(filme['id'])
+            elif sorteio < 0.965:
+                gerenciador.buscar_filmes(generos={"Drama"}, status='disponivel', limite=20)
+            elif sorteio < 0.98:
+                gerenciador.filmes_similares(id_filme, 5)
+            else:
+                # O histórico em colunas recebe aluguéis de todas as threads enquanto é lido.
+                sum(1 for _ in gerenciador.alugueis_entre(None, None, limite=50, decrescente=True))
+                sum(1 for _ in gerenciador.iterar_historico_cliente(aleatorio.choice(ids_clientes), limite=20))
+    except Exception as e:
+        # Uma exceção (comum com --sem-travas) encerra só esta thread e entra no relatório como falha.
+        falha = f"{type(e).__name__}: {e}"
+    contadores[indice] = (alugueis, devolucoes, falha)
+
+
+def contar_entregas(gerenciador) -> list[int]:
+    """Conta os aluguéis feitos pelo atendimento da fila de reservas (não passam pelas threads)."""
+    contador = [0]
+    trava = threading.Lock()
+    entregar_reserva = gerenciador._entregar_reserva
+
+    def contando(id_filme):
+        entregue = entregar_reserva(id_filme)
+        if entregue:
+            with trava:
+                contador[0] += 1
+        return entregue
+
+    gerenciador._entregar_reserva = contando
+    return contador
+
+
+def verificar_invariantes(gerenciador, alugueis: int, devolucoes: int) -> list[str]:
+    erros = []
+    alugados = gerenciador.filmes_por_status_idx['alugado']
+    disponiveis = gerenciador.filmes_por_status_idx['disponivel']
+
+    total_alugueis = 0
+    alugueis_esperados = set()
+    for id_filme, no_filme in gerenciador.filmes_por_id_idx.items():
+        filme = no_filme.data
+        indice_status = 'alugado' if id_filme in alugados else 'disponivel' if id_filme in disponiveis else None
+        if indice_status != filme['status']:
+            erros.append(f"Filme {id_filme}: status '{filme['status']}' mas índice '{indice_status}'.")
+        if (id_filme in alugados) == (id_filme in disponiveis):
+            erros.append(f"Filme {id_filme} aparece em {int(id_filme in alugados) + int(id_filme in disponiveis)} índices de status.")
+        if filme['status'] != ('alugado' if filme.copias_disponiveis() == 0 else 'disponivel'):
+            erros.append(f"Filme {id_filme}: status '{filme['status']}' com {filme.copias_disponiveis()} cópia(s) livre(s).")
+        alugueis_filme = filme['alugueis'] or {}
+        if filme['copias_livres'] is not None:
+            numeros = list(filme['copias_livres']) + [aluguel[0] for aluguel in alugueis_filme.values()]
+            if len(numeros) != filme['copias'] or len(set(numeros)) != len(numeros):
+                erros.append(f"Filme {id_filme}: cópias livres e alugadas não somam {filme['copias']} cópias distintas.")
+        total_alugueis += len(alugueis_filme)
+        for id_cliente in alugueis_filme:
+            alugueis_esperados.add((id_filme, id_cliente))
+            if id_filme not in gerenciador.alugueis_ativos_por_cliente.get(id_cliente, {}):
+                erros.append(f"Filme {id_filme} alugado sem aluguel ativo no cliente {id_cliente}.")
+
+    total_ativos = sum(len(ativos) for ativos in gerenciador.alugueis_ativos_por_cliente.values())
+    if total_ativos != total_alugueis:
+        erros.append(f"{total_alugueis} cópia(s) alugada(s), mas {total_ativos} aluguel(éis) ativo(s) nos clientes.")
+
+    abertos_por_filme = {}
+    for id_cliente in gerenciador.clientes_cadastrados:
+        for id_filme, offset in gerenciador.alugueis_ativos_por_cliente.get(id_cliente, {}).items():
+            evento = gerenciador.historico.evento(offset)
+            if evento[0] != id_filme or evento[2] != id_cliente or evento[4] is not None:
+                erros.append(f"Cliente {id_cliente}: offset {offset} não é o aluguel aberto do filme {id_filme}.")
+        for aluguel in gerenciador.historico.do_cliente(id_cliente):
+            if aluguel[3] is None:
+                abertos_por_filme[aluguel[0]] = abertos_por_filme.get(aluguel[0], 0) + 1
+    for id_filme, abertos in abertos_por_filme.items():
+        no_filme = gerenciador.filmes_por_id_idx.get(id_filme)
+        if no_filme is None or abertos != no_filme.data.copias_alugadas():
+            erros.append(f"Filme {id_filme} tem {abertos} aluguéis abertos no histórico.")
+
+    vencimentos = {entrada[1:] for entrada in gerenciador._vencimentos_heap if gerenciador._vencimento_valido(*entrada)}
+    if vencimentos != alugueis_esperados:
+        erros.append(f"{total_alugueis} cópia(s) alugada(s), mas {len(vencimentos)} vencimento(s) válido(s) no heap.")
+
+    for id_filme, fila in gerenciador.reservas_por_filme.items():
+        no_filme = gerenciador.filmes_por_id_idx.get(id_filme)
+        if not fila or no_filme is None:
+            erros.append(f"Fila de reservas do filme {id_filme} vazia ou de filme inexistente.")
+        elif no_filme.data['status'] != 'alugado':
+            erros.append(f"Filme {id_filme} tem cópia livre e {len(fila)} cliente(s) na fila de reservas.")
+        for no_reserva in fila:
+            id_cliente = no_reserva.data[0]
+            if gerenciador.reservas_por_cliente.get(id_cliente, {}).get(id_filme) is not no_reserva:
+                erros.append(f"Reserva do cliente {id_cliente} no filme {id_filme} fora do índice de clientes.")
+            if no_filme is not None and id_cliente in (no_filme.data['alugueis'] or ()):
+                erros.append(f"Cliente {id_cliente} está na fila do filme {id_filme} e com uma cópia dele.")
+    total_reservas = sum(len(reservas) for reservas in gerenciador.reservas_por_cliente.values())
+    if total_reservas != sum(len(fila) for fila in gerenciador.reservas_por_filme.values()):
+        erros.append(f"{total_reservas} reserva(s) no índice de clientes não batem com as filas.")
+
+    alugueis_por_cliente = {id_cliente: gerenciador.historico.quantidade_do_cliente(id_cliente)
+                            for id_cliente in gerenciador.clientes_cadastrados
+                            if gerenciador.historico.quantidade_do_cliente(id_cliente)}
+    if gerenciador.estatisticas.clientes.contagens != alugueis_por_cliente:
+        erros.append("Contadores de aluguéis por cliente divergem dos históricos.")
+    alugueis_por_filme = {}
+    for id_cliente in gerenciador.clientes_cadastrados:
+        for aluguel in gerenciador.historico.do_cliente(id_cliente):
+            if aluguel[0] in gerenciador.filmes_por_id_idx:
+                alugueis_por_filme[aluguel[0]] = alugueis_por_filme.get(aluguel[0], 0) + 1
+    if gerenciador.estatisticas.filmes.contagens != alugueis_por_filme:
+        erros.append("Contadores de aluguéis por filme divergem dos históricos.")
+
+    if alugueis - devolucoes != total_alugueis:
+        erros.append(f"{alugueis} aluguel(éis) - {devolucoes} devolução(ões) != {total_alugueis} cópia(s) alugada(s).")
+    return erros
+
+
+def comparar_com_disco(gerenciador, diretorio: str) -> list[str]:
+    """Recarrega o estado persistido e compara o status de cada filme com o da memória."""
+    restaurado = GerenciadorLocadora()
+    with open(os.devnull, "w") as descarte, contextlib.redirect_stdout(descarte):
+        persistencia = PersistenciaLocadora(diretorio)
+        persistencia.carregar(restaurado)
+        persistencia.fechar()
+    erros = []
+    for id_filme, no_filme in gerenciador.filmes_por_id_idx.items():
+        no_restaurado = restaurado.filmes_por_id_idx.get(id_filme)
+        if no_restaurado is None or any(no_restaurado.data[campo] != no_filme.data[campo]
+                                        for campo in ('status', 'copias', 'alugueis')):
+            erros.append(f"Filme {id_filme}: estado restaurado do disco difere da memória.")
+    filas = lambda g: {id_filme: [no.data for no in fila] for id_filme, fila in g.reservas_por_filme.items()}
+    if filas(restaurado) != filas(gerenciador):
+        erros.append("Filas de reservas restauradas do disco diferem da memória.")
+    # Aluguéis do mesmo dia feitos por threads diferentes podem chegar ao journal em outra ordem,
+    # então a ordem por data é comparada sem os empates; a de cada cliente tem de ser a mesma.
+    if sorted(restaurado.historico.entre(None, None), key=repr) != sorted(gerenciador.historico.entre(None, None), key=repr):
+        erros.append("Histórico de aluguéis restaurado do disco difere da memória.")
+    for id_cliente in gerenciador.clientes_cadastrados:
+        if list(restaurado.historico.do_cliente(id_cliente)) != list(gerenciador.historico.do_cliente(id_cliente)):
+            erros.append(f"Histórico do cliente {id_cliente} restaurado do disco difere da memória.")
+    return erros
+
+
+def obter_argumentos():
+    parser = argparse.ArgumentParser(description="Teste de estresse do modo concorrente da locadora")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=5000, help="operações por thread")
+    parser.add_argument("--filmes", type=int, default=200)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--copias", type=int, default=1, help="cópias de cada filme")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--com-persistencia", action="store_true",
+                        help="persiste em um diretório temporário com compactações frequentes")
+    parser.add_argument("--sem-travas", action="store_true",
+                        help="usa o GerenciadorLocadora comum, sem travas")
+    return parser.parse_args()
+
+
+def main() -> int:
+    argumentos = obter_argumentos()
+    # Trocas de thread mais frequentes aumentam a chance de expor condições de corrida.
+    sys.setswitchinterval(1e-5)
+
+    classe = GerenciadorLocadora if argumentos.sem_travas else GerenciadorLocadoraConcorrente
+    gerenciador = classe()
+    diretorio = tempfile.mkdtemp(prefix="locadora_estresse_") if argumentos.com_persistencia else None
+    persistencia = None
+    contadores = [None] * argumentos.threads
+
+    with open(os.devnull, "w") as descarte, contextlib.redirect_stdout(descarte):
+        if diretorio:
+            persistencia = PersistenciaLocadora(diretorio, tamanho_lote=16, limite_compactacao=500)
+            persistencia.carregar(gerenciador)
+        ids_filmes, ids_clientes = popular(gerenciador, argumentos.filmes, argumentos.clientes, argumentos.copias)
+        entregas = contar_entregas(gerenciador)
+
+        threads = [
+            threading.Thread(target=trabalhador, args=(gerenciador, ids_filmes, ids_clientes, argumentos.operacoes,
+                                                       argumentos.semente + indice, contadores, indice))
+            for indice in range(argumentos.threads)
+        ]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        segundos = time.perf_counter() - inicio
+        if persistencia:
+            persistencia.fechar()
+
+    alugueis = sum(contador[0] for contador in contadores)
+    devolucoes = sum(contador[1] for contador in contadores)
+    total = argumentos.threads * argumentos.operacoes
+    print(f"{classe.__name__}: {total} operações em {segundos:.2f}s "
+          f"({total / segundos:,.0f} op/s), {alugueis} aluguéis, {entregas[0]} reservas atendidas, "
+          f"{devolucoes} devoluções.")
+    alugueis += entregas[0]
+
+    erros = [f"thread {indice} interrompida por {falha}"
+             for indice, (_, _, falha) in enumerate(contadores) if falha is not None]
+    erros.extend(verificar_invariantes(gerenciador, alugueis, devolucoes))
+    if diretorio:
+        erros.extend(comparar_com_disco(gerenciador, diretorio))
+        shutil.rmtree(diretorio, ignore_errors=True)
+    if erros:
+        print(f"FALHA: {len(erros)} invariante(s) violada(s).")
+        for erro in erros[:20]:
+            print(f"  - {erro}")
+        return 1
+    print("OK: todas as invariantes foram mantidas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
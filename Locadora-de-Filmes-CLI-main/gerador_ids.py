@@ -0,0 +1,67 @@
+ALFABETO_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def codificar_base36(valor: int) -> str:
+    if valor == 0:
+        return "0"
+    digitos = []
+    while valor:
+        valor, resto = divmod(valor, 36)
+        digitos.append(ALFABETO_BASE36[resto])
+    return "".join(reversed(digitos))
+
+
+class GeradorIdsSequencial:
+    """
+    Gerador de IDs baseado em uma sequência monotônica.
+
+    Cada chamada a `proximo` consome o próximo valor da sequência e o codifica
+    como código curto (base 36 por padrão, ou decimal), com zeros à esquerda até
+    `largura_minima`. A unicidade é garantida pela sequência. Opcionalmente, o
+    ID também é conferido contra os índices vivos através de `existe`, o que
+    protege contra IDs já carregados de outra origem (dados legados, arquivos
+    importados). Com 10 milhões de registros, o código em base 36 ainda tem
+    5 caracteres.
+
+    Args:
+        prefixo (str): Texto prefixado a cada ID (ex.: "cliente_").
+        largura_minima (int): Quantidade mínima de caracteres do código.
+        codificacao (str): 'base36' ou 'decimal'.
+        existe (callable, opcional): Recebe um ID e retorna True se ele já está em uso.
+    """
+
+    def __init__(self, prefixo: str = "", largura_minima: int = 4, codificacao: str = "base36", existe=None):
+        if codificacao not in ("base36", "decimal"):
+            raise ValueError(f"Codificação de ID desconhecida: '{codificacao}'.")
+        self.prefixo = prefixo
+        self.largura_minima = largura_minima
+        self.codificacao = codificacao
+        self.existe = existe
+        self.proximo_valor = 1
+
+    def codificar(self, valor: int) -> str:
+        codigo = codificar_base36(valor) if self.codificacao == "base36" else str(valor)
+        return self.prefixo + codigo.rjust(self.largura_minima, "0")
+
+    def decodificar(self, id_gerado: str) -> int | None:
+        """Retorna o valor da sequência de um ID no formato deste gerador, ou None."""
+        if not isinstance(id_gerado, str) or not id_gerado.startswith(self.prefixo):
+            return None
+        codigo = id_gerado[len(self.prefixo):]
+        try:
+            return int(codigo, 36 if self.codificacao == "base36" else 10)
+        except ValueError:
+            return None
+
+    def proximo(self) -> str:
+        while True:
+            id_gerado = self.codificar(self.proximo_valor)
+            self.proximo_valor += 1
+            if self.existe is None or not self.existe(id_gerado):
+                return id_gerado
+
+    def observar(self, id_existente: str):
+        """Avança a sequência para depois de um ID já em uso (ex.: carregado do disco)."""
+        valor = self.decodificar(id_existente)
+        if valor is not None and valor >= self.proximo_valor:
+            self.proximo_valor = valor + 1
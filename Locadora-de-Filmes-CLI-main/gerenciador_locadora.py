@@ -1,64 +1,173 @@
+import time
 import uuid
+import heapq
+import bisect
 import datetime
+import itertools
 from linkedlist import DoublyLinkedList, Node
+from saida import SaidaBufferizada
+from indice_texto import IndiceTitulos, remover_acentos
+from registro_filme import RegistroFilme
+from gerador_ids import GeradorIdsSequencial
+from registro_acoes import RegistroAcoes
+from estatisticas import EstatisticasAlugueis
+from historico_alugueis import HistoricoAlugueis
+
+# Prazo de aluguel usado quando nem o filme nem seus gêneros têm prazo próprio.
+PRAZO_PADRAO_DIAS = 3
+MULTA_POR_DIA = 2.0
+
+# Peso de cada característica em comum em filmes_similares (coaluguel: por cliente que alugou os dois).
+PESOS_SIMILARIDADE = {'diretor': 3.0, 'ator': 2.0, 'genero': 1.0, 'coaluguel': 1.5}
+# Listas de postings maiores que isso (gêneros populares) só reforçam candidatos, não geram candidatos novos.
+MAX_POSTINGS_SIMILARES = 2000
+# Limites do sinal de coaluguel: clientes mais recentes do filme e aluguéis mais recentes de cada um.
+MAX_CLIENTES_COALUGUEL = 200
+MAX_HISTORICO_COALUGUEL = 50
+# Valores padrão dos payloads, que não indicam semelhança entre filmes.
+VALORES_NAO_INFORMADOS = {"não informado", "desconhecido"}
+
+def hoje_ordinal() -> int:
+    return datetime.date.today().toordinal()
+
+def formatar_data(ordinal: int | None) -> str:
+    """Converte uma data guardada como ordinal para exibição (AAAA-MM-DD)."""
+    return datetime.date.fromordinal(ordinal).strftime("%Y-%m-%d") if ordinal is not None else "N/A"
 
 def gerar_id_unico():
-    return str(uuid.uuid4().hex)[:4]
+    """ID aleatório usado quando o payload é criado fora de um GerenciadorLocadora."""
+    return uuid.uuid4().hex
+
+# ID provisório dos payloads criados pelo gerenciador: o ID definitivo só é consumido do gerador depois
+# da validação e da checagem de duplicidade, para que linhas rejeitadas não deixem buracos na sequência.
+ID_A_ATRIBUIR = "a_atribuir"
 
-def criar_payload_filme(titulo: str, ano: int, diretor: str, generos: set, atores: list) -> dict:
+def normalizar_titulo(titulo: str) -> str:
+    """Normaliza um título para comparação (espaços colapsados, sem distinção de caixa)."""
+    return " ".join(titulo.split()).casefold()
+
+def normalizar_nome(nome: str) -> str:
+    """Normaliza um nome para comparação (sem acentos, espaços colapsados, sem distinção de caixa)."""
+    return " ".join(remover_acentos(nome).split()).casefold()
+
+def paginar(iteravel, offset: int = 0, limite: int | None = None):
+    """Aplica offset/limite a um iterável sem materializá-lo."""
+    return itertools.islice(iteravel, offset, None if limite is None else offset + limite)
+
+def criar_payload_filme(titulo: str, ano: int, diretor: str, generos: set, atores: list, id_filme: str | None = None,
+                        copias: int = 1) -> dict:
     if not isinstance(titulo, str) or not titulo.strip():
         raise ValueError("O título do filme não pode ser vazio.")
     if not isinstance(ano, int) or not (1888 < ano < 2050):
         raise ValueError("Ano de lançamento inválido. O primeiro filme foi lançado em 1888.")
+    if not isinstance(copias, int) or copias < 1:
+        raise ValueError("A quantidade de cópias deve ser pelo menos 1.")
     if not isinstance(diretor, str) or not diretor.strip():
         diretor = "Desconhecido"
     if not isinstance(generos, set): generos = set(generos)
     if not isinstance(atores, list): atores = list(atores)
     return {
-        'id': gerar_id_unico(), 'titulo': titulo, 'ano': ano, 'diretor': diretor,
+        'id': id_filme or gerar_id_unico(), 'titulo': titulo, 'ano': ano, 'diretor': diretor,
         'generos': generos, 'atores': atores, 'status': 'disponivel',
-        'id_cliente_alugou': None, 'data_aluguel': None
+        'copias': copias, 'copias_livres': None, 'alugueis': None
     }
 
-def criar_payload_cliente(nome: str, contato: str) -> dict:
+def criar_payload_cliente(nome: str, contato: str, id_cliente: str | None = None) -> dict:
     if not isinstance(nome, str) or not nome.strip():
         raise ValueError("O nome do cliente não pode ser vazio.")
     if not isinstance(contato, str) or not contato.strip():
         contato = "Não informado"
     return {
-        'id_cliente': "cliente_" + gerar_id_unico(), 'nome': nome,
-        'contato': contato, 'historico_alugueis': []
+        'id_cliente': id_cliente or "cliente_" + gerar_id_unico(), 'nome': nome,
+        'contato': contato
     }
 
 class GerenciadorLocadora:
-    def __init__(self):
+    def __init__(self, gerador_ids_filmes=None, gerador_ids_clientes=None, registro_acoes=None):
+        """
+        Args:
+            gerador_ids_filmes, gerador_ids_clientes (opcional): Objetos com os métodos
+                proximo() e observar(id) (ver gerador_ids.py). Por padrão, sequências
+                em base 36 conferidas contra os índices de filmes e de clientes.
+            registro_acoes (RegistroAcoes, opcional): Log de ações; por padrão, um buffer
+                circular com as últimas 1000 ações.
+        """
+        self.gerador_ids_filmes = gerador_ids_filmes or GeradorIdsSequencial(
+            existe=lambda id_filme: id_filme in self.filmes_por_id_idx)
+        self.gerador_ids_clientes = gerador_ids_clientes or GeradorIdsSequencial(
+            prefixo="cliente_", existe=lambda id_cliente: id_cliente in self.clientes_cadastrados)
         self.catalogo_filmes_dll = DoublyLinkedList()
         self.filmes_por_id_idx = {}
+        self.filmes_por_titulo_ano_idx = {}
+        # Dicionários usados como conjuntos ordenados: status -> {id_filme: None}
+        self.filmes_por_status_idx = {'disponivel': {}, 'alugado': {}}
         self.generos_para_filmes_idx = {}
         self.atores_para_filmes_idx = {}
         self.diretores_para_filmes_idx = {}
+        # Lista de (ano, id_filme) mantida em ordem com bisect.
+        self._filmes_por_ano_ordenados = []
+        self.titulos_idx = IndiceTitulos()
         self.clientes_cadastrados = {}
-        self.pilha_acoes = [] 
+        self.clientes_por_nome_idx = {}
+        self._nomes_clientes_ordenados = []
+        # Histórico de todos os aluguéis em colunas (ver historico_alugueis.py); os aluguéis
+        # ativos guardam o offset do evento: id_cliente -> {id_filme: offset}.
+        self.historico = HistoricoAlugueis()
+        self.alugueis_ativos_por_cliente = {}
+        # Min-heap de (data_vencimento, id_filme, id_cliente) dos aluguéis ativos. Devoluções não
+        # removem a entrada: ela fica obsoleta e é descartada na leitura ou na compactação.
+        self._vencimentos_heap = []
+        self._vencimentos_obsoletos = 0
+        self.prazo_padrao_dias = PRAZO_PADRAO_DIAS
+        self.prazos_por_genero = {}
+        self.multa_por_dia = MULTA_POR_DIA
+        # Filas de reservas: id_filme -> DoublyLinkedList de nós (id_cliente, data_reserva), na ordem de chegada.
+        # O índice por cliente guarda o próprio nó, para cancelar em O(1): id_cliente -> {id_filme: Node}.
+        self.reservas_por_filme = {}
+        self.reservas_por_cliente = {}
+        # Contadores para os relatórios, atualizados a cada aluguel e devolução (ver estatisticas.py).
+        self.estatisticas = EstatisticasAlugueis()
+        # Cache opcional de vizinhos de filmes_similares (id_filme -> lista de (id, pontuação)); None = desativado.
+        self.cache_similares = None
+        self.cache_similares_k = 10
+        self.registro_acoes = registro_acoes or RegistroAcoes()
+        # Motor de persistência opcional (ver persistencia.py); recebe cada mutação aplicada.
+        self.persistencia = None
+        self.metricas = None
+
+    def _registrar_mutacao(self, operacao: str, dados: dict):
+        if self.persistencia is not None:
+            self.persistencia.registrar(operacao, dados)
 
     def registrar_acao(self, acao: str):
-        """Registra uma ação na pilha de ações."""
-        data_hora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.pilha_acoes.append(f"[{data_hora}] {acao}")
+        """Registra uma ação de texto livre no log de ações."""
+        self.registro_acoes.registrar('ACAO', texto=acao)
 
-    def ver_ultimas_acoes(self, quantidade: int = 10):
-        """Exibe as últimas ações realizadas no sistema."""
-        if not self.pilha_acoes:
+    def ver_ultimas_acoes(self, quantidade: int = 10, codigo: str | None = None, id_entidade: str | None = None):
+        """Exibe as últimas ações realizadas no sistema, opcionalmente filtradas por tipo ou por ID."""
+        if not len(self.registro_acoes):
             print("Nenhuma ação registrada no sistema.")
             return
 
-        print("\n--- Últimas Ações Realizadas ---")
-        ultimas_acoes = self.pilha_acoes[-quantidade:]
-        for i, acao in enumerate(reversed(ultimas_acoes), 1):
-            print(f"{i}. {acao}")
-        print("-" * 40)
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Últimas Ações Realizadas ---")
+            exibidas = 0
+            for i, registro in enumerate(self.registro_acoes.ultimos(quantidade, codigo, id_entidade), 1):
+                exibidas += 1
+                saida.linha(f"{i}. {self.registro_acoes.formatar(registro)}")
+            if exibidas == 0:
+                saida.linha("Nenhuma ação encontrada com os filtros informados.")
+            saida.linha("-" * 40)
 
-    def _adicionar_filme_aos_indices(self, dados_filme: dict):
+    def _adicionar_filme_aos_indices(self, dados_filme: dict, manter_ordem: bool = True):
         id_filme = dados_filme['id']
+        if manter_ordem:
+            bisect.insort(self._filmes_por_ano_ordenados, (dados_filme['ano'], id_filme))
+        else:
+            self._filmes_por_ano_ordenados.append((dados_filme['ano'], id_filme))
+        self.filmes_por_titulo_ano_idx[(normalizar_titulo(dados_filme['titulo']), dados_filme['ano'])] = id_filme
+        self.filmes_por_status_idx.setdefault(dados_filme['status'], {})[id_filme] = None
+        self.titulos_idx.adicionar(id_filme, dados_filme['titulo'])
         for genero in dados_filme.get('generos', set()):
             self.generos_para_filmes_idx.setdefault(genero.lower(), set()).add(id_filme)
         for ator in dados_filme.get('atores', []):
@@ -66,9 +175,25 @@ class GerenciadorLocadora:
         diretor = dados_filme.get('diretor')
         if diretor:
             self.diretores_para_filmes_idx.setdefault(diretor.lower(), set()).add(id_filme)
+        for id_cliente, (copia, data_aluguel, data_vencimento) in (dados_filme['alugueis'] or {}).items():
+            if data_vencimento is None and data_aluguel:
+                # Estado gravado antes do controle de vencimentos: usa o prazo atual.
+                data_vencimento = self._calcular_vencimento(dados_filme, data_aluguel)
+                dados_filme['alugueis'][id_cliente] = (copia, data_aluguel, data_vencimento)
+            if data_vencimento is not None:
+                self._agendar_vencimento(data_vencimento, id_filme, id_cliente)
 
     def _remover_filme_dos_indices(self, dados_filme: dict):
         id_filme = dados_filme['id']
+        chave_titulo_ano = (normalizar_titulo(dados_filme['titulo']), dados_filme['ano'])
+        if self.filmes_por_titulo_ano_idx.get(chave_titulo_ano) == id_filme:
+            del self.filmes_por_titulo_ano_idx[chave_titulo_ano]
+        self.filmes_por_status_idx.get(dados_filme['status'], {}).pop(id_filme, None)
+        chave_ano = (dados_filme['ano'], id_filme)
+        posicao = bisect.bisect_left(self._filmes_por_ano_ordenados, chave_ano)
+        if posicao < len(self._filmes_por_ano_ordenados) and self._filmes_por_ano_ordenados[posicao] == chave_ano:
+            del self._filmes_por_ano_ordenados[posicao]
+        self.titulos_idx.remover(id_filme, dados_filme['titulo'])
         for genero in dados_filme.get('generos', set()):
             chave_genero = genero.lower()
             if chave_genero in self.generos_para_filmes_idx and id_filme in self.generos_para_filmes_idx[chave_genero]:
@@ -87,97 +212,909 @@ class GerenciadorLocadora:
                 self.diretores_para_filmes_idx[chave_diretor].remove(id_filme)
                 if not self.diretores_para_filmes_idx[chave_diretor]: del self.diretores_para_filmes_idx[chave_diretor]
 
-    def adicionar_filme_catalogo(self, titulo: str, ano: int, diretor: str, generos: set, atores: list) -> dict | None:
+    def _alterar_status_filme(self, dados_filme: dict, novo_status: str):
+        id_filme = dados_filme['id']
+        self.filmes_por_status_idx.get(dados_filme['status'], {}).pop(id_filme, None)
+        self.filmes_por_status_idx.setdefault(novo_status, {})[id_filme] = None
+        dados_filme['status'] = novo_status
+
+    def contar_filmes_por_status(self, status: str) -> int:
+        return len(self.filmes_por_status_idx.get(status, {}))
+
+    def _inserir_filme(self, dados_filme: dict, manter_ordem: bool = True) -> Node:
+        """
+        Insere um filme já validado na DLL e nos índices, sem log nem saída.
+
+        O payload é convertido em um RegistroFilme compacto, que passa a ser o
+        dado do nó. Com manter_ordem=False os índices ordenados recebem o filme
+        no final; quem chama deve chamar _ordenar_indices ao terminar a carga em lote.
+        """
+        dados_filme = RegistroFilme.de_dict(dados_filme)
+        self.gerador_ids_filmes.observar(dados_filme['id'])
+        novo_no_filme_obj = Node(dados_filme)
+        self.catalogo_filmes_dll.add_last(novo_no_filme_obj)
+        self.filmes_por_id_idx[dados_filme['id']] = novo_no_filme_obj
+        self._adicionar_filme_aos_indices(dados_filme, manter_ordem)
+        self._invalidar_cache_similares()
+        return novo_no_filme_obj
+
+    def _excluir_filme(self, no_filme: Node):
+        """Retira um filme da DLL e dos índices, sem log nem saída."""
+        self.catalogo_filmes_dll.remove(no_filme)
+        del self.filmes_por_id_idx[no_filme.data['id']]
+        self._remover_filme_dos_indices(no_filme.data)
+        self.estatisticas.remover_filme(no_filme.data['id'], no_filme.data['generos'])
+        self._invalidar_cache_similares()
+        fila = self.reservas_por_filme.pop(no_filme.data['id'], None)
+        for no_reserva in fila or ():
+            id_cliente = no_reserva.data[0]
+            reservas = self.reservas_por_cliente[id_cliente]
+            del reservas[no_filme.data['id']]
+            if not reservas:
+                del self.reservas_por_cliente[id_cliente]
+
+    def _inserir_cliente(self, cliente: dict, manter_ordem: bool = True):
+        """
+        Cadastra um cliente já validado.
+
+        Payloads gravados antes do histórico em colunas trazem os aluguéis do
+        cliente em 'historico_alugueis'; eles são passados para o histórico.
+        Com manter_ordem=False o nome é apenas anexado à lista ordenada de nomes;
+        quem chama deve chamar _ordenar_indices ao final (usado nas cargas em lote).
+        """
+        historico = cliente.pop('historico_alugueis', None)
+        self.gerador_ids_clientes.observar(cliente['id_cliente'])
+        self.clientes_cadastrados[cliente['id_cliente']] = cliente
+        self._adicionar_cliente_aos_indices(cliente, manter_ordem)
+        for id_filme, titulo, data_aluguel, data_devolucao in historico or ():
+            self._inserir_aluguel_historico(id_filme, titulo, cliente['id_cliente'], data_aluguel, data_devolucao,
+                                            manter_ordem)
+
+    def _inserir_aluguel_historico(self, id_filme: str, titulo: str, id_cliente: str, data_aluguel: str,
+                                   data_devolucao: str | None, manter_ordem: bool = True):
+        """Restaura um aluguel já registrado (carga do snapshot), refazendo o aluguel ativo e as estatísticas."""
+        offset = self.historico.registrar_aluguel(id_filme, titulo, id_cliente, data_aluguel, data_devolucao, manter_ordem)
+        if data_devolucao is None:
+            self.alugueis_ativos_por_cliente.setdefault(id_cliente, {})[id_filme] = offset
+        self.estatisticas.registrar_historico(id_cliente, ((id_filme, titulo, data_aluguel, data_devolucao),),
+                                              self._generos_do_filme)
+
+    def _ordenar_indices(self):
+        """Reordena os índices ordenados depois de uma carga em lote (um único sort)."""
+        self._filmes_por_ano_ordenados.sort()
+        self._nomes_clientes_ordenados.sort()
+        self.historico.ordenar()
+
+    def _excluir_cliente(self, cliente: dict):
+        del self.clientes_cadastrados[cliente['id_cliente']]
+        self.alugueis_ativos_por_cliente.pop(cliente['id_cliente'], None)
+        self._remover_cliente_dos_indices(cliente)
+        self._contabilizar_historico(cliente, -1)
+        self.historico.remover_cliente(cliente['id_cliente'])
+        for id_filme in list(self.reservas_por_cliente.get(cliente['id_cliente'], ())):
+            self._remover_reserva(id_filme, cliente['id_cliente'])
+
+    def _retirar_copia_livre(self, dados_filme: dict, copia: int | None = None) -> int:
+        """Tira uma cópia da pilha de cópias livres em O(1) (a informada, na reaplicação do journal)."""
+        if dados_filme['copias_livres'] is None:
+            dados_filme['copias_livres'] = list(range(dados_filme['copias'], 0, -1))
+        copias_livres = dados_filme['copias_livres']
+        if copia is None or copias_livres[-1] == copia:
+            return copias_livres.pop()
+        copias_livres.remove(copia)
+        return copia
+
+    def _aplicar_aluguel(self, dados_filme: dict, cliente: dict, data_aluguel: str,
+                         data_vencimento: int | None = None, copia: int | None = None):
+        id_filme, id_cliente = dados_filme['id'], cliente['id_cliente']
+        copia = self._retirar_copia_livre(dados_filme, copia)
+        if not dados_filme['copias_livres']:
+            self._alterar_status_filme(dados_filme, 'alugado')
+        if data_vencimento is None:
+            data_vencimento = self._calcular_vencimento(dados_filme, data_aluguel)
+        if dados_filme['alugueis'] is None:
+            dados_filme['alugueis'] = {}
+        dados_filme['alugueis'][id_cliente] = (copia, data_aluguel, data_vencimento)
+        self._agendar_vencimento(data_vencimento, id_filme, id_cliente)
+        if id_filme in self.reservas_por_cliente.get(id_cliente, ()):
+            self._remover_reserva(id_filme, id_cliente)
+
+        offset = self._anotar_aluguel(dados_filme, id_cliente, data_aluguel)
+        self.alugueis_ativos_por_cliente.setdefault(id_cliente, {})[id_filme] = offset
+        self._contabilizar_aluguel(dados_filme, id_cliente, data_aluguel)
+
+    def _aplicar_devolucao(self, dados_filme: dict, cliente: dict, data_devolucao: str):
+        id_filme, id_cliente = dados_filme['id'], cliente['id_cliente']
+
+        # Atualizar o evento do aluguel no histórico
+        alugueis_ativos = self.alugueis_ativos_por_cliente.get(id_cliente, {})
+        offset = alugueis_ativos.pop(id_filme, None)
+        if not alugueis_ativos:
+            self.alugueis_ativos_por_cliente.pop(id_cliente, None)
+        if offset is not None:
+            data_aluguel = self._anotar_devolucao(offset, data_devolucao)
+            self._contabilizar_devolucao(id_filme, data_aluguel, data_devolucao)
+
+        # Devolver a cópia à pilha de cópias livres
+        copia = dados_filme['alugueis'].pop(id_cliente)[0]
+        if not dados_filme['alugueis']:
+            dados_filme['alugueis'] = None
+        dados_filme['copias_livres'].append(copia)
+        if dados_filme['status'] == 'alugado':
+            self._alterar_status_filme(dados_filme, 'disponivel')
+        self._descartar_vencimento()
+
+    def _anotar_aluguel(self, dados_filme: dict, id_cliente: str, data_aluguel: str) -> int:
+        return self.historico.registrar_aluguel(dados_filme['id'], dados_filme['titulo'], id_cliente, data_aluguel)
+
+    def _anotar_devolucao(self, offset: int, data_devolucao: str) -> str:
+        """Marca a devolução no evento e retorna a data do aluguel."""
+        self.historico.registrar_devolucao(offset, data_devolucao)
+        return self.historico.evento(offset)[3]
+
+    def _contabilizar_aluguel(self, dados_filme: dict, id_cliente: str, data_aluguel: str):
+        self.estatisticas.registrar_aluguel(dados_filme['id'], dados_filme['generos'], id_cliente, data_aluguel)
+
+    def _contabilizar_devolucao(self, id_filme: str, data_aluguel: str, data_devolucao: str):
+        self.estatisticas.registrar_devolucao(id_filme, data_aluguel, data_devolucao)
+
+    def _contabilizar_historico(self, cliente: dict, sinal: int):
+        """Soma (sinal=1) ou desconta (sinal=-1, na remoção do cliente) o histórico do cliente nas estatísticas."""
+        self.estatisticas.registrar_historico(cliente['id_cliente'], self.historico.do_cliente(cliente['id_cliente']),
+                                              self._generos_do_filme, sinal)
+        if sinal < 0:
+            self.estatisticas.remover_cliente(cliente['id_cliente'])
+
+    def _generos_do_filme(self, id_filme: str):
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        return no_filme.data['generos'] if no_filme is not None else None
+
+    def _cliente_unico(self, dados_filme: dict) -> str | None:
+        """ID do cliente quando o filme tem exatamente uma cópia alugada; senão None."""
+        clientes = list(dados_filme['alugueis'] or ())
+        return clientes[0] if len(clientes) == 1 else None
+
+    # --- Cópias ---
+
+    def adicionar_copias(self, id_filme: str, quantidade: int) -> bool:
+        """Acrescenta cópias físicas a um filme do catálogo."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return False
+        if not isinstance(quantidade, int) or quantidade < 1:
+            print("ERRO: A quantidade de cópias deve ser pelo menos 1.")
+            return False
+        dados_filme = no_filme.data
+        self._aplicar_copias(dados_filme, quantidade)
+        self._registrar_mutacao('copias_alteradas', {'id_filme': id_filme, 'quantidade': quantidade})
+        self.registro_acoes.registrar('COPIAS_ADICIONADAS', id_filme=id_filme, titulo=dados_filme['titulo'], quantidade=quantidade)
+        print(f"SUCESSO: {quantidade} cópia(s) de '{dados_filme['titulo']}' adicionada(s). "
+              f"Total: {dados_filme['copias']} ({dados_filme.copias_disponiveis()} disponível(is)).")
+        self._atender_fila(id_filme)
+        return True
+
+    def remover_copias(self, id_filme: str, quantidade: int) -> bool:
+        """Retira cópias livres de um filme; o filme mantém pelo menos uma cópia."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return False
+        if not isinstance(quantidade, int) or quantidade < 1:
+            print("ERRO: A quantidade de cópias deve ser pelo menos 1.")
+            return False
+        dados_filme = no_filme.data
+        if quantidade >= dados_filme['copias']:
+            print(f"ERRO: '{dados_filme['titulo']}' tem {dados_filme['copias']} cópia(s) e precisa manter pelo menos uma. "
+                  f"Para tirá-lo do catálogo, remova o filme.")
+            return False
+        if quantidade > dados_filme.copias_disponiveis():
+            print(f"ERRO: Só {dados_filme.copias_disponiveis()} cópia(s) de '{dados_filme['titulo']}' estão livres para remoção.")
+            return False
+        self._aplicar_copias(dados_filme, -quantidade)
+        self._registrar_mutacao('copias_alteradas', {'id_filme': id_filme, 'quantidade': -quantidade})
+        self.registro_acoes.registrar('COPIAS_REMOVIDAS', id_filme=id_filme, titulo=dados_filme['titulo'], quantidade=quantidade)
+        print(f"SUCESSO: {quantidade} cópia(s) de '{dados_filme['titulo']}' removida(s). "
+              f"Total: {dados_filme['copias']} ({dados_filme.copias_disponiveis()} disponível(is)).")
+        return True
+
+    def _aplicar_copias(self, dados_filme: dict, quantidade: int):
+        """Soma `quantidade` cópias (negativa para retirar cópias livres) e ajusta o status."""
+        copias_livres = dados_filme['copias_livres']
+        if copias_livres is not None:
+            if quantidade > 0:
+                # As cópias novas recebem números depois do maior em uso.
+                maior = max(itertools.chain(copias_livres, (aluguel[0] for aluguel in (dados_filme['alugueis'] or {}).values())),
+                            default=0)
+                copias_livres.extend(range(maior + quantidade, maior, -1))
+            else:
+                del copias_livres[quantidade:]
+        dados_filme['copias'] += quantidade
+        novo_status = 'disponivel' if dados_filme.copias_disponiveis() else 'alugado'
+        if dados_filme['status'] != novo_status:
+            self._alterar_status_filme(dados_filme, novo_status)
+
+    # --- Reservas ---
+
+    def reservar_filme(self, id_filme: str, id_cliente: str) -> bool:
+        """Coloca o cliente no fim da fila de reservas de um filme sem cópias livres."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        cliente = self.clientes_cadastrados.get(id_cliente)
+
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return False
+        if not cliente:
+            print(f"ERRO: Cliente com ID '{id_cliente}' não encontrado.")
+            return False
+
+        dados_filme = no_filme.data
+        if id_cliente in (dados_filme['alugueis'] or ()):
+            print(f"ERRO: Cliente '{cliente['nome']}' já está com uma cópia de '{dados_filme['titulo']}'.")
+            return False
+        if id_filme in self.reservas_por_cliente.get(id_cliente, ()):
+            print(f"ERRO: Cliente '{cliente['nome']}' já está na fila de reservas de '{dados_filme['titulo']}' "
+                  f"(posição {self._posicao_do_no(self.reservas_por_cliente[id_cliente][id_filme])}).")
+            return False
+        if dados_filme['status'] == 'disponivel' and id_filme not in self.reservas_por_filme:
+            print(f"ERRO: Filme '{dados_filme['titulo']}' tem cópia disponível; alugue-o diretamente.")
+            return False
+
+        data_reserva = datetime.date.today().strftime("%Y-%m-%d")
+        self._aplicar_reserva(id_filme, id_cliente, data_reserva)
+        self._registrar_mutacao('filme_reservado', {'id_filme': id_filme, 'id_cliente': id_cliente,
+                                                    'data_reserva': data_reserva})
+        self.registro_acoes.registrar('FILME_RESERVADO', id_filme=id_filme, id_cliente=id_cliente,
+                                      titulo=dados_filme['titulo'], nome=cliente['nome'])
+        print(f"SUCESSO: Reserva de '{dados_filme['titulo']}' registrada para '{cliente['nome']}'. "
+              f"Posição na fila: {self.tamanho_fila(id_filme)}.")
+        return True
+
+    def cancelar_reserva(self, id_filme: str, id_cliente: str) -> bool:
+        """Tira o cliente da fila de reservas do filme em O(1), em qualquer posição."""
+        if not self._remover_reserva(id_filme, id_cliente):
+            print(f"ERRO: Cliente '{id_cliente}' não tem reserva do filme '{id_filme}'.")
+            return False
+        self._registrar_mutacao('reserva_cancelada', {'id_filme': id_filme, 'id_cliente': id_cliente})
+        self.registro_acoes.registrar('RESERVA_CANCELADA', id_filme=id_filme, id_cliente=id_cliente)
+        titulo = self.filmes_por_id_idx[id_filme].data['titulo'] if id_filme in self.filmes_por_id_idx else id_filme
+        print(f"SUCESSO: Reserva de '{titulo}' para '{self._nome_cliente(id_cliente, id_cliente)}' cancelada.")
+        return True
+
+    def _aplicar_reserva(self, id_filme: str, id_cliente: str, data_reserva: str):
+        fila = self.reservas_por_filme.get(id_filme)
+        if fila is None:
+            fila = self.reservas_por_filme[id_filme] = DoublyLinkedList()
+        no_reserva = Node((id_cliente, data_reserva))
+        fila.add_last(no_reserva)
+        self.reservas_por_cliente.setdefault(id_cliente, {})[id_filme] = no_reserva
+
+    def _remover_reserva(self, id_filme: str, id_cliente: str) -> bool:
+        """Desfaz uma reserva pelo nó guardado no índice do cliente; False se ela não existe."""
+        reservas = self.reservas_por_cliente.get(id_cliente)
+        no_reserva = reservas.pop(id_filme, None) if reservas else None
+        if no_reserva is None:
+            return False
+        if not reservas:
+            del self.reservas_por_cliente[id_cliente]
+        fila = self.reservas_por_filme[id_filme]
+        fila.remove(no_reserva)
+        if fila.empty():
+            del self.reservas_por_filme[id_filme]
+        return True
+
+    def _atender_fila(self, id_filme: str):
+        """Entrega as cópias livres do filme aos primeiros clientes da fila de reservas."""
+        while self._entregar_reserva(id_filme):
+            pass
+
+    def _entregar_reserva(self, id_filme: str) -> bool:
+        """Aluga uma cópia livre ao primeiro da fila; False se não há fila ou cópia livre."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        fila = self.reservas_por_filme.get(id_filme)
+        if not no_filme or not fila or no_filme.data['status'] != 'disponivel':
+            return False
+        dados_filme = no_filme.data
+        id_cliente = fila.head.data[0]
+        if id_cliente in (dados_filme['alugueis'] or ()):
+            # Não deveria acontecer (reservar e alugar impedem), mas não pode travar a fila.
+            self._remover_reserva(id_filme, id_cliente)
+            self._registrar_mutacao('reserva_cancelada', {'id_filme': id_filme, 'id_cliente': id_cliente})
+            return True
+        cliente = self.clientes_cadastrados[id_cliente]
+        print(f"RESERVA: '{dados_filme['titulo']}' entregue a '{cliente['nome']}', primeiro(a) da fila de reservas.")
+        self._alugar(dados_filme, cliente)
+        return True
+
+    # --- Prazos e vencimentos ---
+
+    def prazo_do_filme(self, dados_filme: dict) -> int:
+        """Prazo em dias: o do próprio filme, senão o menor prazo entre seus gêneros, senão o padrão."""
+        prazo = dados_filme.get('prazo_dias')
+        if prazo is not None:
+            return prazo
+        prazos_generos = [self.prazos_por_genero[g.lower()] for g in dados_filme.get('generos', ())
+                          if g.lower() in self.prazos_por_genero]
+        return min(prazos_generos) if prazos_generos else self.prazo_padrao_dias
+
+    def _calcular_vencimento(self, dados_filme: dict, data_aluguel: str) -> int:
+        return datetime.date.fromisoformat(data_aluguel).toordinal() + self.prazo_do_filme(dados_filme)
+
+    def _agendar_vencimento(self, data_vencimento: int, id_filme: str, id_cliente: str):
+        heapq.heappush(self._vencimentos_heap, (data_vencimento, id_filme, id_cliente))
+
+    def _descartar_vencimento(self):
+        self._vencimentos_obsoletos += 1
+        if self._vencimentos_obsoletos > 64 and self._vencimentos_obsoletos * 2 > len(self._vencimentos_heap):
+            self._compactar_vencimentos()
+
+    def _vencimento_valido(self, data_vencimento: int, id_filme: str, id_cliente: str) -> bool:
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        aluguel = (no_filme.data['alugueis'] or {}).get(id_cliente) if no_filme is not None else None
+        return aluguel is not None and aluguel[2] == data_vencimento
+
+    def _compactar_vencimentos(self):
+        """Reconstrói o heap só com as entradas ainda válidas (O(n))."""
+        self._vencimentos_heap = [entrada for entrada in self._vencimentos_heap if self._vencimento_valido(*entrada)]
+        heapq.heapify(self._vencimentos_heap)
+        self._vencimentos_obsoletos = 0
+
+    def _vencimentos_em_ordem(self):
+        """
+        Gera (data_vencimento, filme, id_cliente) em ordem crescente de vencimento sem alterar o heap.
+
+        Percorre o heap como uma árvore usando um heap auxiliar de fronteira: obter
+        os k primeiros custa O(k log k), mais as entradas obsoletas encontradas.
+        """
+        heap = self._vencimentos_heap
+        if not heap:
+            return
+        fronteira = [(heap[0], 0)]
+        while fronteira:
+            (data_vencimento, id_filme, id_cliente), posicao = heapq.heappop(fronteira)
+            if self._vencimento_valido(data_vencimento, id_filme, id_cliente):
+                yield data_vencimento, self.filmes_por_id_idx[id_filme].data, id_cliente
+            for filho in (2 * posicao + 1, 2 * posicao + 2):
+                if filho < len(heap):
+                    heapq.heappush(fronteira, (heap[filho], filho))
+
+    def filmes_atrasados(self, hoje: int | None = None, limite: int | None = None):
+        """Gera (filme, id_cliente, dias_de_atraso) dos aluguéis vencidos, do mais antigo para o mais recente."""
+        hoje = hoje_ordinal() if hoje is None else hoje
+        atrasados = (
+            (filme, id_cliente, hoje - data_vencimento)
+            for data_vencimento, filme, id_cliente in itertools.takewhile(lambda item: item[0] < hoje, self._vencimentos_em_ordem())
+        )
+        return paginar(atrasados, 0, limite)
+
+    def filmes_vencendo(self, dias: int, hoje: int | None = None, limite: int | None = None):
+        """Gera (filme, id_cliente, dias_restantes) dos aluguéis que vencem entre hoje e hoje + dias."""
+        hoje = hoje_ordinal() if hoje is None else hoje
+        vencendo = (
+            (filme, id_cliente, data_vencimento - hoje)
+            for data_vencimento, filme, id_cliente in itertools.takewhile(lambda item: item[0] <= hoje + dias, self._vencimentos_em_ordem())
+            if data_vencimento >= hoje
+        )
+        return paginar(vencendo, 0, limite)
+
+    def calcular_multa(self, id_filme: str, hoje: int | None = None, id_cliente: str | None = None) -> float:
+        """Multa por atraso das cópias alugadas do filme (só a do cliente, se informado); 0.0 sem atraso."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        # Cópia feita de uma vez: aluguéis de outros clientes podem alterar o dicionário durante a consulta.
+        alugueis = dict(no_filme.data['alugueis'] or {}) if no_filme else {}
+        if not alugueis:
+            return 0.0
+        hoje = hoje_ordinal() if hoje is None else hoje
+        if id_cliente is not None:
+            considerados = (alugueis[id_cliente],) if id_cliente in alugueis else ()
+        else:
+            considerados = alugueis.values()
+        dias_atraso = sum(max(0, hoje - aluguel[2]) for aluguel in considerados if aluguel[2] is not None)
+        return dias_atraso * self.multa_por_dia
+
+    def definir_prazo_genero(self, genero: str, dias: int) -> bool:
+        """Define o prazo de aluguel dos filmes de um gênero (vale para os próximos aluguéis)."""
+        if not isinstance(dias, int) or dias < 1:
+            print("ERRO: O prazo deve ser de pelo menos 1 dia.")
+            return False
+        chave = genero.strip().lower()
+        if self.prazos_por_genero.get(chave) != dias:
+            self.prazos_por_genero[chave] = dias
+            self._registrar_mutacao('prazo_genero_definido', {'genero': chave, 'dias': dias})
+        return True
+
+    def definir_prazo_filme(self, id_filme: str, dias: int | None) -> bool:
+        """Define (ou remove, com None) o prazo de aluguel próprio de um filme."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return False
+        if dias is not None and (not isinstance(dias, int) or dias < 1):
+            print("ERRO: O prazo deve ser de pelo menos 1 dia.")
+            return False
+        self._aplicar_prazo_filme(no_filme.data, dias)
+        self._registrar_mutacao('prazo_filme_definido', {'id_filme': id_filme, 'dias': dias})
+        descricao = f"{dias} dia(s)" if dias is not None else f"o padrão ({self.prazo_do_filme(no_filme.data)} dia(s))"
+        print(f"SUCESSO: Prazo de aluguel de '{no_filme.data['titulo']}' definido para {descricao}.")
+        return True
+
+    def _aplicar_prazo_filme(self, dados_filme: dict, dias: int | None):
+        if dias is None:
+            if 'prazo_dias' in dados_filme:
+                del dados_filme['prazo_dias']
+        else:
+            dados_filme['prazo_dias'] = dias
+
+    def adicionar_filme_catalogo(self, titulo: str, ano: int, diretor: str, generos: set, atores: list,
+                                 copias: int = 1) -> dict | None:
         try:
-            for no_existente in self.catalogo_filmes_dll:
-                if no_existente.data['titulo'].lower() == titulo.lower() and no_existente.data['ano'] == ano:
-                    print(f"ERRO: Filme '{titulo}' ({ano}) já existe no catálogo.")
-                    return None
-            dados_filme = criar_payload_filme(titulo, ano, diretor, generos, atores)
+            dados_filme = criar_payload_filme(titulo, ano, diretor, generos, atores, ID_A_ATRIBUIR, copias)
         except ValueError as e:
             print(f"ERRO ao validar dados do filme: {e}")
             return None
+        id_existente = self.filmes_por_titulo_ano_idx.get((normalizar_titulo(titulo), ano))
+        if id_existente:
+            print(f"ERRO: Filme '{titulo}' ({ano}) já existe no catálogo com ID {id_existente}. "
+                  f"Para estocar mais exemplares, adicione cópias a ele.")
+            return None
         
-        novo_no_filme_obj = Node(dados_filme)
-        self.catalogo_filmes_dll.add_last(novo_no_filme_obj)
-        
-        no_filme_adicionado_na_dll = self.catalogo_filmes_dll.tail
-        self.filmes_por_id_idx[dados_filme['id']] = no_filme_adicionado_na_dll
-        
-        self._adicionar_filme_aos_indices(dados_filme)
-        self.registrar_acao(f"Filme '{dados_filme['titulo']}' adicionado ao catálogo (ID: {dados_filme['id']})")
-        print(f"SUCESSO: Filme '{dados_filme['titulo']}' adicionado ao catálogo com ID: {dados_filme['id']}")
+        dados_filme['id'] = self.gerador_ids_filmes.proximo()
+        dados_filme = self._inserir_filme(dados_filme).data
+        self._registrar_mutacao('filme_adicionado', {'filme': dados_filme})
+        self.registro_acoes.registrar('FILME_ADICIONADO', id_filme=dados_filme['id'], titulo=dados_filme['titulo'])
+        copias_str = f" ({copias} cópias)" if copias > 1 else ""
+        print(f"SUCESSO: Filme '{dados_filme['titulo']}' adicionado ao catálogo com ID: {dados_filme['id']}{copias_str}")
         return dados_filme
 
+    def importar_filmes(self, linhas) -> dict:
+        """
+        Importa filmes em lote a partir de um iterável de dicionários (ver importador.py).
+
+        Cada linha é validada com criar_payload_filme e inserida diretamente na DLL e
+        nos índices, sem mensagens por filme. Ao final, uma única ação é registrada e,
+        se houver persistência, o estado é gravado em um novo snapshot.
+
+        Returns:
+            dict: Resumo com as quantidades importadas, duplicadas, inválidas e a duração.
+        """
+        inicio = time.perf_counter()
+        importados = duplicados = invalidos = 0
+        persistencia, self.persistencia = self.persistencia, None
+        try:
+            for linha in linhas:
+                try:
+                    dados_filme = criar_payload_filme(
+                        linha.get('titulo'), linha.get('ano'), linha.get('diretor'),
+                        linha.get('generos') or {"Não informado"}, linha.get('atores') or ["Não informado"],
+                        ID_A_ATRIBUIR, 1 if linha.get('copias') is None else linha['copias']
+                    )
+                except (ValueError, TypeError):
+                    invalidos += 1
+                    continue
+                if (normalizar_titulo(dados_filme['titulo']), dados_filme['ano']) in self.filmes_por_titulo_ano_idx:
+                    duplicados += 1
+                    continue
+                dados_filme['id'] = self.gerador_ids_filmes.proximo()
+                self._inserir_filme(dados_filme, manter_ordem=False)
+                importados += 1
+        finally:
+            self._ordenar_indices()
+            self.persistencia = persistencia
+            # As linhas já inseridas não passaram pelo journal: o snapshot é gravado mesmo se a leitura falhar no meio.
+            if persistencia is not None and importados:
+                persistencia.compactar()
+
+        duracao = time.perf_counter() - inicio
+        self.registro_acoes.registrar('IMPORTACAO_FILMES', importados=importados, duplicados=duplicados, invalidos=invalidos)
+        return {'importados': importados, 'duplicados': duplicados, 'invalidos': invalidos, 'segundos': duracao}
+
+    def buscar_filme_por_titulo_ano(self, titulo: str, ano: int) -> dict | None:
+        id_filme = self.filmes_por_titulo_ano_idx.get((normalizar_titulo(titulo), ano))
+        return self.buscar_filme_por_id(id_filme) if id_filme else None
+
     def buscar_filme_por_id(self, id_filme: str) -> dict | None:
         no_filme = self.filmes_por_id_idx.get(id_filme)
         return no_filme.data if no_filme else None
 
-    def listar_todos_os_filmes(self):
+    # --- Consultas (geradores, sem saída) ---
+
+    def iterar_filmes(self, offset: int = 0, limite: int | None = None, apos_id: str | None = None):
+        """
+        Gera os filmes do catálogo na ordem da DLL.
+
+        Args:
+            offset (int): Quantidade de filmes a pular.
+            limite (int, opcional): Quantidade máxima de filmes gerados.
+            apos_id (str, opcional): Cursor; começa no filme seguinte a este ID, em O(1).
+        """
+        if apos_id is not None:
+            no_cursor = self.filmes_por_id_idx.get(apos_id)
+            no_inicial = no_cursor.next if no_cursor else None
+        else:
+            no_inicial = self.catalogo_filmes_dll.head
+
+        def percorrer(no):
+            while no is not None:
+                yield no.data
+                no = no.next
+
+        return paginar(percorrer(no_inicial), offset, limite)
+
+    def iterar_filmes_por_status(self, status: str, offset: int = 0, limite: int | None = None):
+        # Quem consome pode alugar ou devolver os filmes listados, o que altera o índice de status. Com limite,
+        # só a página é materializada (custo offset + limite); sem limite, o gerador continua preguiçoso e
+        # percorre uma cópia das chaves.
+        ids_filmes = self.filmes_por_status_idx.get(status, {})
+        if limite is None:
+            ids_filmes = list(ids_filmes)
+        filmes = (self.filmes_por_id_idx[id_filme].data for id_filme in ids_filmes if id_filme in self.filmes_por_id_idx)
+        return paginar(filmes, offset) if limite is None else iter(list(paginar(filmes, offset, limite)))
+
+    def iterar_filmes_por_genero(self, genero: str, offset: int = 0, limite: int | None = None):
+        ids_filmes = self.generos_para_filmes_idx.get(genero.strip().lower(), ())
+        filmes = (self.filmes_por_id_idx[id_filme].data for id_filme in ids_filmes if id_filme in self.filmes_por_id_idx)
+        return paginar(filmes, offset, limite)
+
+    def iterar_clientes(self, offset: int = 0, limite: int | None = None):
+        return paginar(iter(self.clientes_cadastrados.values()), offset, limite)
+
+    def iterar_historico_cliente(self, id_cliente: str, offset: int = 0, limite: int | None = None):
+        """Gera (id_filme, título, data_aluguel, data_devolucao ou None) dos aluguéis do cliente, do mais antigo ao mais recente."""
+        return self.historico.do_cliente(id_cliente, offset, limite)
+
+    def quantidade_alugueis_cliente(self, id_cliente: str) -> int:
+        return self.historico.quantidade_do_cliente(id_cliente)
+
+    def alugueis_entre(self, data_ini: str | None, data_fim: str | None, offset: int = 0, limite: int | None = None,
+                       decrescente: bool = False):
+        """
+        Gera (id_filme, título, id_cliente, data_aluguel, data_devolucao ou None) dos
+        aluguéis feitos entre data_ini e data_fim ('AAAA-MM-DD', inclusive; None = sem limite), em ordem de data.
+        """
+        return paginar(self.historico.entre(data_ini, data_fim, decrescente), offset, limite)
+
+    def _faixa_anos(self, ano_min: int | None, ano_max: int | None) -> tuple[int, int]:
+        """Retorna as posições [inicio, fim) do intervalo de anos na lista ordenada."""
+        inicio = 0 if ano_min is None else bisect.bisect_left(self._filmes_por_ano_ordenados, (ano_min,))
+        fim = len(self._filmes_por_ano_ordenados) if ano_max is None else bisect.bisect_left(self._filmes_por_ano_ordenados, (ano_max + 1,))
+        return inicio, max(inicio, fim)
+
+    def filmes_entre(self, ano_ini: int, ano_fim: int, offset: int = 0, limite: int | None = None):
+        """Gera os filmes lançados entre ano_ini e ano_fim (inclusive), em ordem de ano."""
+        return self.iterar_filmes_por_ano(offset, limite, ano_min=ano_ini, ano_max=ano_fim)
+
+    def iterar_filmes_por_ano(self, offset: int = 0, limite: int | None = None, decrescente: bool = False,
+                              ano_min: int | None = None, ano_max: int | None = None):
+        """
+        Gera os filmes em ordem de ano a partir do índice ordenado, sem ordenar o catálogo.
+
+        O offset é resolvido por posição na lista, sem percorrer os filmes pulados.
+        """
+        inicio, fim = self._faixa_anos(ano_min, ano_max)
+        if decrescente:
+            posicoes = range(fim - 1 - offset, inicio - 1, -1)
+        else:
+            posicoes = range(inicio + offset, fim)
+        if limite is not None:
+            posicoes = posicoes[:limite]
+        ordenados = self._filmes_por_ano_ordenados
+        return (self.filmes_por_id_idx[ordenados[posicao][1]].data for posicao in posicoes)
+
+    def buscar_filmes(self, generos=None, todos_generos: bool = True, ator: str | None = None,
+                      diretor: str | None = None, ano_min: int | None = None, ano_max: int | None = None,
+                      status: str | None = None, offset: int = 0, limite: int | None = None):
+        """
+        Gera os filmes que atendem a todos os critérios informados.
+
+        O plano de consulta reúne os conjuntos de IDs dos índices envolvidos
+        (gêneros, ator, diretor, status), percorre o menor deles e testa a
+        pertinência nos demais. O intervalo de anos vem do índice ordenado e só
+        é usado como fonte de candidatos quando é menor que os demais conjuntos.
+
+        Args:
+            generos (iterável, opcional): Gêneros procurados.
+            todos_generos (bool): True exige todos os gêneros (E); False aceita qualquer um (OU).
+            ator, diretor (str, opcional): Nome exato (sem distinção de caixa).
+            ano_min, ano_max (int, opcional): Intervalo inclusivo de anos.
+            status (str, opcional): 'disponivel' ou 'alugado'.
+        """
+        conjuntos = []
+        generos = [g.strip().lower() for g in (generos or []) if g and g.strip()]
+        if generos:
+            listas_generos = [self.generos_para_filmes_idx.get(g, set()) for g in generos]
+            if todos_generos:
+                conjuntos.extend(listas_generos)
+            else:
+                conjuntos.append(set().union(*listas_generos))
+        if ator:
+            conjuntos.append(self.atores_para_filmes_idx.get(ator.strip().lower(), set()))
+        if diretor:
+            conjuntos.append(self.diretores_para_filmes_idx.get(diretor.strip().lower(), set()))
+        if status:
+            conjuntos.append(self.filmes_por_status_idx.get(status, {}))
+
+        def no_intervalo(filme):
+            return (ano_min is None or filme['ano'] >= ano_min) and (ano_max is None or filme['ano'] <= ano_max)
+
+        conjuntos.sort(key=len)
+        usar_intervalo = ano_min is not None or ano_max is not None
+        if usar_intervalo:
+            inicio, fim = self._faixa_anos(ano_min, ano_max)
+            usar_intervalo = not conjuntos or fim - inicio < len(conjuntos[0])
+
+        if usar_intervalo:
+            candidatos = (
+                filme for filme in self.iterar_filmes_por_ano(ano_min=ano_min, ano_max=ano_max)
+                if all(filme['id'] in conjunto for conjunto in conjuntos)
+            )
+        elif not conjuntos:
+            candidatos = (no.data for no in self.catalogo_filmes_dll)
+        else:
+            # Sem limite, o menor conjunto (que pode ser o índice de status) é percorrido por uma cópia das chaves.
+            menor, demais = (conjuntos[0] if limite is not None else list(conjuntos[0])), conjuntos[1:]
+            candidatos = (
+                filme for filme in (
+                    self.filmes_por_id_idx[id_filme].data for id_filme in menor
+                    if id_filme in self.filmes_por_id_idx and all(id_filme in conjunto for conjunto in demais)
+                ) if no_intervalo(filme)
+            )
+        if limite is None:
+            return paginar(candidatos, offset)
+        # Com limite, a página é materializada antes de ser devolvida: o índice de status percorrido pode mudar
+        # se quem consome alugar ou devolver um dos filmes encontrados.
+        return iter(list(paginar(candidatos, offset, limite)))
+
+    def buscar_por_titulo(self, consulta: str, k: int = 10) -> list[dict]:
+        """Retorna os k filmes cujo título mais se parece com a consulta (sem acentos, tolerante a erros)."""
+        return [self.filmes_por_id_idx[id_filme].data for _, id_filme in self.titulos_idx.buscar(consulta, k)]
+
+    def tamanho_fila(self, id_filme: str) -> int:
+        """Quantidade de clientes esperando pelo filme."""
+        fila = self.reservas_por_filme.get(id_filme)
+        return len(fila) if fila else 0
+
+    def posicao_na_fila(self, id_filme: str, id_cliente: str) -> int | None:
+        """Posição (a partir de 1) do cliente na fila do filme, ou None; O(posição), voltando até o início."""
+        no_reserva = self.reservas_por_cliente.get(id_cliente, {}).get(id_filme)
+        return self._posicao_do_no(no_reserva) if no_reserva is not None else None
+
+    def _posicao_do_no(self, no_reserva: Node) -> int:
+        posicao = 1
+        while no_reserva.prev is not None:
+            no_reserva = no_reserva.prev
+            posicao += 1
+        return posicao
+
+    def iterar_fila(self, id_filme: str, offset: int = 0, limite: int | None = None):
+        """Gera (id_cliente, data_reserva) na ordem da fila de reservas do filme."""
+        fila = self.reservas_por_filme.get(id_filme)
+        return paginar((no_reserva.data for no_reserva in fila) if fila else iter(()), offset, limite)
+
+    def reservas_do_cliente(self, id_cliente: str) -> list[tuple[dict, int]]:
+        """Retorna (filme, posição na fila) de cada reserva do cliente."""
+        reservas = self.reservas_por_cliente.get(id_cliente, {})
+        return [(self.filmes_por_id_idx[id_filme].data, self._posicao_do_no(no_reserva))
+                for id_filme, no_reserva in list(reservas.items())]
+
+    def filmes_mais_alugados(self, k: int = 10, mes: str | None = None) -> list[tuple[dict, int]]:
+        """Retorna (filme, aluguéis) dos k filmes mais alugados, no geral ou no mês 'AAAA-MM'."""
+        return [(self.filmes_por_id_idx[id_filme].data, quantidade)
+                for id_filme, quantidade in self.estatisticas.top_filmes(k, mes)]
+
+    def clientes_que_mais_alugam(self, k: int = 10) -> list[tuple[dict, int]]:
+        """Retorna (cliente, aluguéis) dos k clientes com mais aluguéis."""
+        return [(self.clientes_cadastrados[id_cliente], quantidade)
+                for id_cliente, quantidade in self.estatisticas.top_clientes(k)]
+
+    def generos_mais_alugados(self, k: int = 10) -> list[tuple[str, int]]:
+        return self.estatisticas.top_generos(k)
+
+    def alugueis_por_mes(self, ultimos: int | None = 12) -> list[tuple[str, int, int]]:
+        """Retorna (mês, aluguéis, devoluções) dos últimos meses com movimento, em ordem cronológica."""
+        return self.estatisticas.alugueis_por_mes(ultimos)
+
+    def duracao_media_aluguel(self, id_filme: str) -> float | None:
+        """Média de dias que as cópias do filme ficaram alugadas, ou None se nunca foi devolvido."""
+        return self.estatisticas.duracao_media(id_filme)
+
+    # --- Recomendações ---
+
+    def filmes_similares(self, id_filme: str, k: int = 10) -> list[tuple[dict, float]]:
+        """
+        Retorna (filme, pontuação) dos k filmes mais parecidos com o informado.
+
+        Cada diretor, ator e gênero em comum soma o peso correspondente de
+        PESOS_SIMILARIDADE, e cada cliente que alugou os dois filmes soma o peso
+        de coaluguel. Só as listas de postings do próprio filme são percorridas;
+        as maiores que MAX_POSTINGS_SIMILARES apenas reforçam candidatos já
+        encontrados, e os k melhores saem de um heap limitado a k. Com o cache
+        ativado (ativar_cache_similares), o resultado é reaproveitado até a
+        próxima inclusão ou remoção de filme.
+        """
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme or k < 1:
+            return []
+        if self.cache_similares is not None and k <= self.cache_similares_k:
+            vizinhos = self.cache_similares.get(id_filme)
+            if vizinhos is None:
+                vizinhos = self.cache_similares[id_filme] = self._calcular_similares(no_filme.data, self.cache_similares_k)
+        else:
+            vizinhos = self._calcular_similares(no_filme.data, k)
+        return [(self.filmes_por_id_idx[id_vizinho].data, pontuacao) for id_vizinho, pontuacao in vizinhos[:k]
+                if id_vizinho in self.filmes_por_id_idx]
+
+    def _calcular_similares(self, dados_filme: dict, k: int) -> list[tuple[str, float]]:
+        pontuacoes = {}
+        reforcos = []
+        caracteristicas = [('diretor', self.diretores_para_filmes_idx, dados_filme.get('diretor'))]
+        caracteristicas += [('ator', self.atores_para_filmes_idx, ator) for ator in {a.lower() for a in dados_filme.get('atores', ())}]
+        caracteristicas += [('genero', self.generos_para_filmes_idx, genero) for genero in {g.lower() for g in dados_filme.get('generos', ())}]
+        for tipo, indice, valor in caracteristicas:
+            if not valor or valor.lower() in VALORES_NAO_INFORMADOS:
+                continue
+            postings = indice.get(valor.lower())
+            if not postings:
+                continue
+            if len(postings) > MAX_POSTINGS_SIMILARES:
+                reforcos.append((PESOS_SIMILARIDADE[tipo], postings))
+                continue
+            for id_candidato in postings:
+                pontuacoes[id_candidato] = pontuacoes.get(id_candidato, 0.0) + PESOS_SIMILARIDADE[tipo]
+
+        for id_candidato, vezes in self._coalugueis(dados_filme['id']).items():
+            pontuacoes[id_candidato] = pontuacoes.get(id_candidato, 0.0) + vezes * PESOS_SIMILARIDADE['coaluguel']
+
+        if reforcos and len(pontuacoes) <= k:
+            # Poucos candidatos: completa com uma amostra da menor lista grande.
+            peso, postings = min(reforcos, key=lambda reforco: len(reforco[1]))
+            for id_candidato in itertools.islice(postings, MAX_POSTINGS_SIMILARES):
+                pontuacoes.setdefault(id_candidato, 0.0)
+        pontuacoes.pop(dados_filme['id'], None)
+        for peso, postings in reforcos:
+            for id_candidato in pontuacoes:
+                if id_candidato in postings:
+                    pontuacoes[id_candidato] += peso
+        return heapq.nlargest(k, pontuacoes.items(), key=lambda item: (item[1], item[0]))
+
+    def _coalugueis(self, id_filme: str) -> dict:
+        """Conta, para cada outro filme, quantos clientes recentes deste filme também o alugaram."""
+        vezes = {}
+        for id_cliente in self._clientes_recentes_do_filme(id_filme, MAX_CLIENTES_COALUGUEL):
+            cliente = self.clientes_cadastrados.get(id_cliente)
+            if cliente is None:
+                continue
+            for id_outro in self._filmes_recentes_do_cliente(id_cliente, MAX_HISTORICO_COALUGUEL):
+                if id_outro != id_filme and id_outro in self.filmes_por_id_idx:
+                    vezes[id_outro] = vezes.get(id_outro, 0) + 1
+        return vezes
+
+    def _clientes_recentes_do_filme(self, id_filme: str, limite: int) -> list[str]:
+        return self.estatisticas.clientes_recentes(id_filme, limite)
+
+    def _filmes_recentes_do_cliente(self, id_cliente: str, quantidade: int) -> set[str]:
+        return self.historico.filmes_recentes_do_cliente(id_cliente, quantidade)
+
+    def ativar_cache_similares(self, k: int = 10):
+        """Passa a guardar os k vizinhos de cada filme consultado em filmes_similares."""
+        self.cache_similares = {}
+        self.cache_similares_k = k
+
+    def precomputar_similares(self, ids_filmes=None) -> int:
+        """Preenche o cache com os vizinhos dos filmes informados (por padrão, todos); retorna quantos."""
+        if self.cache_similares is None:
+            self.ativar_cache_similares()
+        calculados = 0
+        for id_filme in list(ids_filmes if ids_filmes is not None else self.filmes_por_id_idx):
+            no_filme = self.filmes_por_id_idx.get(id_filme)
+            if no_filme is not None:
+                self.cache_similares[id_filme] = self._calcular_similares(no_filme.data, self.cache_similares_k)
+                calculados += 1
+        return calculados
+
+    def _invalidar_cache_similares(self):
+        if self.cache_similares:
+            self.cache_similares.clear()
+
+    # --- Listagens (consomem as consultas e escrevem em uma saída bufferizada) ---
+
+    def _escrever_resumo_filme(self, saida: SaidaBufferizada, numero: int, filme: dict):
+        saida.escrever(
+            f"\n{numero}. {filme['titulo']} ({filme['ano']})\n"
+            f"   ID: {filme['id']}\n"
+            f"   Diretor: {filme.get('diretor', 'N/A')}\n"
+            f"   {self._texto_status(filme)}\n"
+        )
+        texto_alugueis = self._texto_alugueis(filme, 'Desconhecido')
+        if texto_alugueis:
+            saida.linha(f"   {texto_alugueis}")
+        saida.linha("-" * 40)
+
+    def _nome_cliente(self, id_cliente: str, padrao: str) -> str:
+        return self.clientes_cadastrados.get(id_cliente, {}).get('nome', padrao)
+
+    def _texto_status(self, filme: dict) -> str:
+        texto = f"Status: {filme['status'].upper()}"
+        if filme['copias'] > 1:
+            texto += f" ({filme.copias_disponiveis()} de {filme['copias']} cópias disponíveis)"
+        return texto
+
+    def _alugueis_do_filme(self, filme: dict) -> list[tuple[str, tuple]]:
+        """Cópia dos aluguéis ativos do filme, (id_cliente, (cópia, data_aluguel, vencimento)), para exibição."""
+        return list((filme['alugueis'] or {}).items())
+
+    def _texto_alugueis(self, filme: dict, padrao: str, maximo: int = 3) -> str:
+        """Descreve quem está com as cópias alugadas (até `maximo` clientes); vazio se não há cópia alugada."""
+        alugueis = self._alugueis_do_filme(filme)
+        if not alugueis:
+            return ""
+        texto = "Alugado por: " + "; ".join(
+            f"{self._nome_cliente(id_cliente, padrao)} em {data_aluguel}" for id_cliente, (_, data_aluguel, _) in alugueis[:maximo])
+        restantes = len(alugueis) - maximo
+        return texto + (f" e mais {restantes} cliente(s)" if restantes > 0 else "")
+
+    def listar_todos_os_filmes(self, offset: int = 0, limite: int | None = None):
         if self.catalogo_filmes_dll.empty():
             print("Catálogo de filmes vazio.")
             return
-        print("\n--- Catálogo de Filmes ---")
-        total_filmes = 0
-        for i, no_filme in enumerate(self.catalogo_filmes_dll):
-            filme = no_filme.data
-            total_filmes += 1
-            print(f"\n{total_filmes}. {filme['titulo']} ({filme['ano']})")
-            print(f"   ID: {filme['id']}")
-            print(f"   Diretor: {filme.get('diretor', 'N/A')}")
-            print(f"   Gêneros: {', '.join(filme.get('generos', ['N/A']))}")
-            print(f"   Atores: {', '.join(filme.get('atores', ['N/A']))}")
-            status_str = f"Status: {filme['status'].upper()}"
-            if filme['status'] == 'alugado':
-                cliente_alugou = self.clientes_cadastrados.get(filme['id_cliente_alugou'], {})
-                cliente_nome = cliente_alugou.get('nome', 'Desconhecido')
-                status_str += f" (Alugado por: {cliente_nome} em {filme['data_aluguel']})"
-            print(f"   {status_str}")
-            print("-" * 40)
-        print(f"\nTotal de filmes no catálogo: {total_filmes}")
-
-    def listar_filmes_por_status(self, status_desejado: str):
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Catálogo de Filmes ---")
+            for numero, filme in enumerate(self.iterar_filmes(offset, limite), offset + 1):
+                status_str = self._texto_status(filme)
+                texto_alugueis = self._texto_alugueis(filme, 'Desconhecido')
+                if texto_alugueis:
+                    status_str += f" ({texto_alugueis})"
+                saida.escrever(
+                    f"\n{numero}. {filme['titulo']} ({filme['ano']})\n"
+                    f"   ID: {filme['id']}\n"
+                    f"   Diretor: {filme.get('diretor', 'N/A')}\n"
+                    f"   Gêneros: {', '.join(filme.get('generos', ['N/A']))}\n"
+                    f"   Atores: {', '.join(filme.get('atores', ['N/A']))}\n"
+                    f"   {status_str}\n"
+                    f"{'-' * 40}\n"
+                )
+            saida.linha(f"\nTotal de filmes no catálogo: {len(self.catalogo_filmes_dll)}")
+
+    def listar_filmes_por_status(self, status_desejado: str, offset: int = 0, limite: int | None = None):
         if self.catalogo_filmes_dll.empty():
             print(f"Nenhum filme no catálogo para listar como '{status_desejado}'.")
             return
-        print(f"\n--- Filmes com Status: {status_desejado.upper()} ---")
-        encontrados = 0
-        for i, no_filme in enumerate(self.catalogo_filmes_dll):
-            filme = no_filme.data
-            if filme['status'] == status_desejado:
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Filmes com Status: {status_desejado.upper()} ---")
+            encontrados = 0
+            for numero, filme in enumerate(self.iterar_filmes_por_status(status_desejado, offset, limite), offset + 1):
                 encontrados += 1
-                print(f"\n{encontrados}. {filme['titulo']} ({filme['ano']})")
-                print(f"   ID: {filme['id']}")
-                print(f"   Diretor: {filme.get('diretor', 'N/A')}")
-                print(f"   Gêneros: {', '.join(filme.get('generos', ['N/A']))}")
-                print(f"   Atores: {', '.join(filme.get('atores', ['N/A']))}")
                 info_aluguel = ""
-                if status_desejado == 'alugado' and filme['id_cliente_alugou']:
-                    cliente_alugou = self.clientes_cadastrados.get(filme['id_cliente_alugou'], {})
-                    cliente_nome = cliente_alugou.get('nome', 'Cliente Desconhecido')
-                    info_aluguel = f" (Alugado por: {cliente_nome} em {filme['data_aluguel']})"
-                print(f"   Status: {filme['status'].upper()}{info_aluguel}")
-                print("-" * 40)
-        if encontrados == 0:
-            print(f"Nenhum filme encontrado com status '{status_desejado}'.")
-        else:
-            print(f"\nTotal de filmes encontrados: {encontrados}")
+                texto_alugueis = self._texto_alugueis(filme, 'Cliente Desconhecido') if status_desejado == 'alugado' else ""
+                if texto_alugueis:
+                    info_aluguel = f" ({texto_alugueis})"
+                saida.escrever(
+                    f"\n{numero}. {filme['titulo']} ({filme['ano']})\n"
+                    f"   ID: {filme['id']}\n"
+                    f"   Diretor: {filme.get('diretor', 'N/A')}\n"
+                    f"   Gêneros: {', '.join(filme.get('generos', ['N/A']))}\n"
+                    f"   Atores: {', '.join(filme.get('atores', ['N/A']))}\n"
+                    f"   {self._texto_status(filme)}{info_aluguel}\n"
+                    f"{'-' * 40}\n"
+                )
+            if encontrados == 0:
+                saida.linha(f"Nenhum filme encontrado com status '{status_desejado}'.")
+            else:
+                saida.linha(f"\nTotal de filmes encontrados: {encontrados}")
 
     def remover_filme_catalogo(self, id_filme: str) -> bool:
         no_a_remover_ref = self.filmes_por_id_idx.get(id_filme)
         if not no_a_remover_ref:
             print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
             return False
-        if no_a_remover_ref.data['status'] == 'alugado':
+        if no_a_remover_ref.data['alugueis']:
             print(f"ERRO: Filme '{no_a_remover_ref.data['titulo']}' está atualmente alugado e não pode ser removido.")
             return False
 
         dados_filme_removido = no_a_remover_ref.data
         try:
-            self.catalogo_filmes_dll.remove(no_a_remover_ref)
-            del self.filmes_por_id_idx[id_filme]
-            self._remover_filme_dos_indices(dados_filme_removido)
-            self.registrar_acao(f"Filme '{dados_filme_removido['titulo']}' removido do catálogo (ID: {id_filme})")
+            self._excluir_filme(no_a_remover_ref)
+            self._registrar_mutacao('filme_removido', {'id': id_filme})
+            self.registro_acoes.registrar('FILME_REMOVIDO', id_filme=id_filme, titulo=dados_filme_removido['titulo'])
             print(f"SUCESSO: Filme '{dados_filme_removido['titulo']}' removido do catálogo.")
             return True
         except ValueError as e:
@@ -187,38 +1124,110 @@ class GerenciadorLocadora:
             print(f"ERRO: Ocorreu um problema ao tentar remover o filme. {str(e)}")
             return False
 
+    def importar_clientes(self, linhas) -> dict:
+        """Importa clientes em lote a partir de um iterável de dicionários; análogo a importar_filmes."""
+        inicio = time.perf_counter()
+        importados = duplicados = invalidos = 0
+        persistencia, self.persistencia = self.persistencia, None
+        try:
+            for linha in linhas:
+                try:
+                    payload_cliente = criar_payload_cliente(linha.get('nome'), linha.get('contato'), ID_A_ATRIBUIR)
+                except ValueError:
+                    invalidos += 1
+                    continue
+                if normalizar_nome(payload_cliente['nome']) in self.clientes_por_nome_idx:
+                    duplicados += 1
+                    continue
+                payload_cliente['id_cliente'] = self.gerador_ids_clientes.proximo()
+                self._inserir_cliente(payload_cliente, manter_ordem=False)
+                importados += 1
+        finally:
+            self._ordenar_indices()
+            self.persistencia = persistencia
+            # As linhas já inseridas não passaram pelo journal: o snapshot é gravado mesmo se a leitura falhar no meio.
+            if persistencia is not None and importados:
+                persistencia.compactar()
+
+        duracao = time.perf_counter() - inicio
+        self.registro_acoes.registrar('IMPORTACAO_CLIENTES', importados=importados, duplicados=duplicados, invalidos=invalidos)
+        return {'importados': importados, 'duplicados': duplicados, 'invalidos': invalidos, 'segundos': duracao}
+
     def adicionar_cliente(self, nome: str, contato: str) -> dict | None:
         try:
-            for cliente_existente in self.clientes_cadastrados.values():
-                if cliente_existente['nome'].lower() == nome.lower():
-                    print(f"ERRO: Cliente '{nome}' já cadastrado com ID {cliente_existente['id_cliente']}.")
-                    return None
-            payload_cliente = criar_payload_cliente(nome, contato)
+            payload_cliente = criar_payload_cliente(nome, contato, ID_A_ATRIBUIR)
         except ValueError as e:
             print(f"ERRO ao validar dados do cliente: {e}")
             return None
-        self.clientes_cadastrados[payload_cliente['id_cliente']] = payload_cliente
-        self.registrar_acao(f"Cliente '{payload_cliente['nome']}' adicionado (ID: {payload_cliente['id_cliente']})")
+        nome_normalizado = normalizar_nome(nome)
+        id_existente = self.clientes_por_nome_idx.get(nome_normalizado)
+        if id_existente:
+            print(f"ERRO: Cliente '{nome}' já cadastrado com ID {id_existente}.")
+            return None
+        payload_cliente['id_cliente'] = self.gerador_ids_clientes.proximo()
+        self._inserir_cliente(payload_cliente)
+        self._registrar_mutacao('cliente_adicionado', {'cliente': payload_cliente})
+        self.registro_acoes.registrar('CLIENTE_ADICIONADO', id_cliente=payload_cliente['id_cliente'], nome=payload_cliente['nome'])
         print(f"SUCESSO: Cliente '{payload_cliente['nome']}' adicionado com ID: {payload_cliente['id_cliente']}")
         return payload_cliente
 
+    def _adicionar_cliente_aos_indices(self, cliente: dict, manter_ordem: bool = True):
+        nome_normalizado = normalizar_nome(cliente['nome'])
+        self.clientes_por_nome_idx[nome_normalizado] = cliente['id_cliente']
+        if manter_ordem:
+            bisect.insort(self._nomes_clientes_ordenados, nome_normalizado)
+        else:
+            self._nomes_clientes_ordenados.append(nome_normalizado)
+
+    def _remover_cliente_dos_indices(self, cliente: dict):
+        nome_normalizado = normalizar_nome(cliente['nome'])
+        if self.clientes_por_nome_idx.get(nome_normalizado) != cliente['id_cliente']:
+            return
+        del self.clientes_por_nome_idx[nome_normalizado]
+        posicao = bisect.bisect_left(self._nomes_clientes_ordenados, nome_normalizado)
+        if posicao < len(self._nomes_clientes_ordenados) and self._nomes_clientes_ordenados[posicao] == nome_normalizado:
+            del self._nomes_clientes_ordenados[posicao]
+
+    def buscar_cliente_por_nome(self, nome: str) -> dict | None:
+        id_cliente = self.clientes_por_nome_idx.get(normalizar_nome(nome))
+        return self.clientes_cadastrados.get(id_cliente) if id_cliente else None
+
+    def buscar_clientes_por_prefixo(self, prefixo: str, limite: int | None = None) -> list[dict]:
+        """Retorna os clientes cujo nome normalizado começa com o prefixo, em ordem alfabética."""
+        prefixo_normalizado = normalizar_nome(prefixo)
+        if not prefixo_normalizado:
+            return []
+        encontrados = []
+        posicao = bisect.bisect_left(self._nomes_clientes_ordenados, prefixo_normalizado)
+        while posicao < len(self._nomes_clientes_ordenados):
+            nome_normalizado = self._nomes_clientes_ordenados[posicao]
+            if not nome_normalizado.startswith(prefixo_normalizado):
+                break
+            if limite is not None and len(encontrados) >= limite:
+                break
+            encontrados.append(self.clientes_cadastrados[self.clientes_por_nome_idx[nome_normalizado]])
+            posicao += 1
+        return encontrados
+
     def buscar_cliente_por_id(self, id_cliente: str) -> dict | None:
         cliente = self.clientes_cadastrados.get(id_cliente)
         if not cliente:
             print(f"AVISO: Cliente com ID '{id_cliente}' não encontrado.")
         return cliente
         
-    def listar_clientes(self):
+    def listar_clientes(self, offset: int = 0, limite: int | None = None):
         if not self.clientes_cadastrados:
             print("Nenhum cliente cadastrado.")
             return
-        print("\n--- Lista de Clientes Cadastrados ---")
-        for i, (id_cliente, cliente) in enumerate(self.clientes_cadastrados.items()):
-            print(f"{i+1}. Nome: {cliente['nome']} (ID: {id_cliente}, Contato: {cliente['contato']})")
-            if cliente['historico_alugueis']:
-                print(f"   Histórico: {len(cliente['historico_alugueis'])} aluguel(éis)")
-            else:
-                print("   Histórico: Nenhum aluguel registrado.")
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Lista de Clientes Cadastrados ---")
+            for numero, cliente in enumerate(self.iterar_clientes(offset, limite), offset + 1):
+                saida.linha(f"{numero}. Nome: {cliente['nome']} (ID: {cliente['id_cliente']}, Contato: {cliente['contato']})")
+                quantidade_alugueis = self.quantidade_alugueis_cliente(cliente['id_cliente'])
+                if quantidade_alugueis:
+                    saida.linha(f"   Histórico: {quantidade_alugueis} aluguel(éis)")
+                else:
+                    saida.linha("   Histórico: Nenhum aluguel registrado.")
 
     def alugar_filme(self, id_filme: str, id_cliente: str) -> bool:
         no_filme = self.filmes_por_id_idx.get(id_filme)
@@ -233,71 +1242,247 @@ class GerenciadorLocadora:
 
         dados_filme = no_filme.data
         if dados_filme['status'] == 'alugado':
-            print(f"ERRO: Filme '{dados_filme['titulo']}' já está alugado.")
+            if dados_filme['copias'] > 1:
+                print(f"ERRO: Todas as {dados_filme['copias']} cópias de '{dados_filme['titulo']}' estão alugadas.")
+            else:
+                print(f"ERRO: Filme '{dados_filme['titulo']}' já está alugado.")
+            return False
+        if id_cliente in (dados_filme['alugueis'] or ()):
+            print(f"ERRO: Cliente '{cliente['nome']}' já está com uma cópia de '{dados_filme['titulo']}'.")
+            return False
+        fila = self.reservas_por_filme.get(id_filme)
+        if fila and fila.head.data[0] != id_cliente:
+            print(f"ERRO: Filme '{dados_filme['titulo']}' tem {len(fila)} cliente(s) na fila de reservas. "
+                  f"Faça uma reserva para entrar na fila.")
             return False
 
-        dados_filme['status'] = 'alugado'
-        dados_filme['id_cliente_alugou'] = id_cliente
-        dados_filme['data_aluguel'] = datetime.date.today().strftime("%Y-%m-%d")
-        
-        registro_aluguel = (
-            id_filme, dados_filme['titulo'],
-            dados_filme['data_aluguel'], None
-        )
+        self._alugar(dados_filme, cliente)
+        return True
+
+    def _alugar(self, dados_filme: dict, cliente: dict):
+        """Aluga uma cópia livre já validada: aplica, registra no journal e no log e informa."""
+        id_filme, id_cliente = dados_filme['id'], cliente['id_cliente']
+        data_aluguel = datetime.date.today().strftime("%Y-%m-%d")
+        self._aplicar_aluguel(dados_filme, cliente, data_aluguel)
+        copia, _, data_vencimento = dados_filme['alugueis'][id_cliente]
+        self._registrar_mutacao('filme_alugado', {'id_filme': id_filme, 'id_cliente': id_cliente, 'data_aluguel': data_aluguel,
+                                                  'data_vencimento': data_vencimento, 'copia': copia})
+        self.registro_acoes.registrar('FILME_ALUGADO', id_filme=id_filme, id_cliente=id_cliente,
+                                      titulo=dados_filme['titulo'], nome=cliente['nome'])
+        copia_str = f" (cópia {copia})" if dados_filme['copias'] > 1 else ""
+        print(f"SUCESSO: Filme '{dados_filme['titulo']}'{copia_str} alugado para '{cliente['nome']}' em {data_aluguel}. "
+              f"Devolução prevista: {formatar_data(data_vencimento)}.")
 
-        cliente['historico_alugueis'].append(registro_aluguel)
-        self.registrar_acao(f"Filme '{dados_filme['titulo']}' alugado para '{cliente['nome']}' (ID Cliente: {id_cliente})")
-        print(f"SUCESSO: Filme '{dados_filme['titulo']}' alugado para '{cliente['nome']}' em {dados_filme['data_aluguel']}.")
+    def devolver_filme(self, id_filme: str, id_cliente: str | None = None) -> bool:
+        """
+        Devolve a cópia do filme que está com o cliente.
+
+        Sem `id_cliente`, o filme precisa ter uma única cópia alugada. A cópia
+        devolvida vai para o primeiro cliente da fila de reservas, se houver.
+        """
+        if not self._devolver_copia(id_filme, id_cliente):
+            return False
+        self._atender_fila(id_filme)
         return True
 
-    def devolver_filme(self, id_filme: str) -> bool:
+    def _devolver_copia(self, id_filme: str, id_cliente: str | None) -> bool:
         no_filme = self.filmes_por_id_idx.get(id_filme)
         if not no_filme:
             print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
             return False
 
         dados_filme = no_filme.data
-        if dados_filme['status'] != 'alugado':
+        alugueis = dados_filme['alugueis']
+        if not alugueis:
             print(f"ERRO: Filme '{dados_filme['titulo']}' não está alugado.")
             return False
+        if id_cliente is None:
+            id_cliente = self._cliente_unico(dados_filme)
+            if id_cliente is None:
+                print(f"ERRO: {len(alugueis)} cópias de '{dados_filme['titulo']}' estão alugadas. "
+                      f"Informe o ID do cliente que está devolvendo.")
+                return False
+        elif id_cliente not in alugueis:
+            print(f"ERRO: Filme '{dados_filme['titulo']}' não está alugado para o cliente '{id_cliente}'.")
+            return False
 
-        id_cliente = dados_filme['id_cliente_alugou']
         cliente = self.clientes_cadastrados.get(id_cliente)
         if not cliente:
             print(f"ERRO: Cliente que alugou o filme não encontrado.")
             return False
 
-        data_devolucao = datetime.date.today().strftime("%Y-%m-%d")
-        
-        # Atualizar o registro de aluguel no histórico do cliente
-        for i, aluguel in enumerate(cliente['historico_alugueis']):
-            if aluguel[0] == id_filme and not aluguel[3]:  # Se é o filme e não tem data de devolução
-                cliente['historico_alugueis'][i] = (aluguel[0], aluguel[1], aluguel[2], data_devolucao)
-                break
+        multa = self.calcular_multa(id_filme, id_cliente=id_cliente)
+        if multa:
+            dias_atraso = hoje_ordinal() - alugueis[id_cliente][2]
+            print(f"AVISO: Devolução com {dias_atraso} dia(s) de atraso. Multa: R$ {multa:.2f}")
 
-        # Resetar os dados do filme
-        dados_filme['status'] = 'disponivel'
-        dados_filme['id_cliente_alugou'] = None
-        dados_filme['data_aluguel'] = None
+        data_devolucao = datetime.date.today().strftime("%Y-%m-%d")
+        self._aplicar_devolucao(dados_filme, cliente, data_devolucao)
+        self._registrar_mutacao('filme_devolvido', {'id_filme': id_filme, 'id_cliente': id_cliente,
+                                                    'data_devolucao': data_devolucao})
 
-        self.registrar_acao(f"Filme '{dados_filme['titulo']}' devolvido por '{cliente['nome']}' (ID Cliente: {id_cliente})")
+        self.registro_acoes.registrar('FILME_DEVOLVIDO', id_filme=id_filme, id_cliente=id_cliente,
+                                      titulo=dados_filme['titulo'], nome=cliente['nome'])
         print(f"SUCESSO: Filme '{dados_filme['titulo']}' devolvido com sucesso.")
         return True
 
-    def ver_historico_cliente(self, id_cliente: str):
+    def listar_alugueis_ativos(self, id_cliente: str) -> list[dict]:
+        """Retorna os filmes atualmente alugados pelo cliente."""
+        alugueis_ativos = list(self.alugueis_ativos_por_cliente.get(id_cliente, {}))
+        return [self.filmes_por_id_idx[id_filme].data for id_filme in alugueis_ativos if id_filme in self.filmes_por_id_idx]
+
+    def listar_atrasados(self, limite: int | None = None) -> int:
+        """Exibe os aluguéis vencidos com o atraso e a multa de cada um; retorna a quantidade exibida."""
+        hoje = hoje_ordinal()
+        total_multas = 0.0
+        exibidos = 0
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Aluguéis Atrasados ---")
+            for filme, id_cliente, dias_atraso in self.filmes_atrasados(hoje, limite):
+                exibidos += 1
+                multa = dias_atraso * self.multa_por_dia
+                total_multas += multa
+                saida.linha(f"{exibidos}. {filme['titulo']} (ID: {filme['id']}) - "
+                            f"{self._nome_cliente(id_cliente, 'Cliente Desconhecido')} (ID: {id_cliente})")
+                saida.linha(f"   Venceu em {formatar_data(hoje - dias_atraso)}: {dias_atraso} dia(s) de atraso, multa R$ {multa:.2f}")
+            if exibidos == 0:
+                saida.linha("Nenhum aluguel atrasado.")
+            else:
+                saida.linha(f"\nTotal de multas dos aluguéis exibidos: R$ {total_multas:.2f}")
+        return exibidos
+
+    def listar_vencimentos(self, dias: int, limite: int | None = None) -> int:
+        """Exibe os aluguéis que vencem nos próximos `dias` dias; retorna a quantidade exibida."""
+        hoje = hoje_ordinal()
+        exibidos = 0
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Aluguéis que Vencem nos Próximos {dias} Dia(s) ---")
+            for filme, id_cliente, dias_restantes in self.filmes_vencendo(dias, hoje, limite):
+                exibidos += 1
+                prazo = "vence hoje" if dias_restantes == 0 else f"vence em {dias_restantes} dia(s)"
+                saida.linha(f"{exibidos}. {filme['titulo']} (ID: {filme['id']}) - "
+                            f"{self._nome_cliente(id_cliente, 'Cliente Desconhecido')}: "
+                            f"{prazo} ({formatar_data(hoje + dias_restantes)})")
+            if exibidos == 0:
+                saida.linha("Nenhum aluguel vence nesse período.")
+        return exibidos
+
+    def listar_fila_reservas(self, id_filme: str, offset: int = 0, limite: int | None = None) -> bool:
+        """Exibe a fila de reservas de um filme na ordem de atendimento."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return False
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Fila de Reservas: {no_filme.data['titulo']} (ID: {id_filme}) ---")
+            exibidos = 0
+            for posicao, (id_cliente, data_reserva) in enumerate(self.iterar_fila(id_filme, offset, limite), offset + 1):
+                exibidos += 1
+                saida.linha(f"{posicao}. {self._nome_cliente(id_cliente, 'Cliente Desconhecido')} "
+                            f"(ID: {id_cliente}) - reservado em {data_reserva}")
+            if exibidos == 0:
+                saida.linha("Nenhum cliente na fila de reservas.")
+            else:
+                saida.linha(f"\nTotal na fila: {self.tamanho_fila(id_filme)}")
+        return True
+
+    def listar_reservas_cliente(self, id_cliente: str) -> bool:
+        """Exibe os filmes reservados pelo cliente com a posição em cada fila."""
+        cliente = self.buscar_cliente_por_id(id_cliente)
+        if not cliente:
+            return False
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Reservas do Cliente: {cliente['nome']} (ID: {id_cliente}) ---")
+            reservas = self.reservas_do_cliente(id_cliente)
+            for numero, (filme, posicao) in enumerate(reservas, 1):
+                saida.linha(f"{numero}. {filme['titulo']} (ID: {filme['id']}) - "
+                            f"posição {posicao} de {self.tamanho_fila(filme['id'])}")
+            if not reservas:
+                saida.linha("Nenhuma reserva ativa.")
+        return True
+
+    # --- Relatórios ---
+
+    def exibir_filmes_mais_alugados(self, k: int = 10, mes: str | None = None) -> int:
+        """Exibe o ranking de filmes (do mês 'AAAA-MM', se informado); retorna a quantidade exibida."""
+        ranking = self.filmes_mais_alugados(k, mes)
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Filmes Mais Alugados {'em ' + mes if mes else '(Geral)'} ---")
+            for posicao, (filme, quantidade) in enumerate(ranking, 1):
+                duracao = self.duracao_media_aluguel(filme['id'])
+                duracao_str = f", média de {duracao:.1f} dia(s) por aluguel" if duracao is not None else ""
+                saida.linha(f"{posicao}. {filme['titulo']} ({filme['ano']}) - {quantidade} aluguel(éis){duracao_str}")
+            if not ranking:
+                saida.linha("Nenhum aluguel registrado no período.")
+        return len(ranking)
+
+    def exibir_clientes_que_mais_alugam(self, k: int = 10) -> int:
+        ranking = self.clientes_que_mais_alugam(k)
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Clientes que Mais Alugam ---")
+            for posicao, (cliente, quantidade) in enumerate(ranking, 1):
+                saida.linha(f"{posicao}. {cliente['nome']} (ID: {cliente['id_cliente']}) - {quantidade} aluguel(éis)")
+            if not ranking:
+                saida.linha("Nenhum aluguel registrado.")
+        return len(ranking)
+
+    def exibir_generos_mais_alugados(self, k: int = 10) -> int:
+        ranking = self.generos_mais_alugados(k)
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Gêneros Mais Procurados ---")
+            for posicao, (genero, quantidade) in enumerate(ranking, 1):
+                saida.linha(f"{posicao}. {genero.capitalize()} - {quantidade} aluguel(éis)")
+            if not ranking:
+                saida.linha("Nenhum aluguel registrado.")
+        return len(ranking)
+
+    def exibir_alugueis_por_mes(self, ultimos: int | None = 12) -> int:
+        meses = self.alugueis_por_mes(ultimos)
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Aluguéis e Devoluções por Mês ---")
+            for mes, alugueis, devolucoes in meses:
+                saida.linha(f"{mes}: {alugueis} aluguel(éis), {devolucoes} devolução(ões)")
+            if not meses:
+                saida.linha("Nenhum aluguel registrado.")
+        return len(meses)
+
+    def exibir_alugueis_entre(self, data_ini: str, data_fim: str, offset: int = 0, limite: int | None = None) -> int | None:
+        """Exibe os aluguéis feitos entre duas datas ('AAAA-MM-DD', inclusive); retorna a quantidade exibida."""
+        try:
+            if datetime.date.fromisoformat(data_ini) > datetime.date.fromisoformat(data_fim):
+                print("ERRO: A data inicial deve ser anterior ou igual à data final.")
+                return None
+        except ValueError:
+            print("ERRO: Datas inválidas. Use o formato AAAA-MM-DD.")
+            return None
+        exibidos = 0
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Aluguéis entre {data_ini} e {data_fim} ---")
+            for numero, (id_filme, titulo, id_cliente, data_aluguel, data_devolucao) in enumerate(
+                    self.alugueis_entre(data_ini, data_fim, offset, limite), offset + 1):
+                exibidos += 1
+                saida.linha(f"{numero}. {data_aluguel} - {titulo} (ID: {id_filme}) - "
+                            f"{self._nome_cliente(id_cliente, 'Cliente Desconhecido')} (ID: {id_cliente}), "
+                            f"devolvido em: {data_devolucao or 'Pendente'}")
+            if exibidos == 0:
+                saida.linha("Nenhum aluguel registrado no período.")
+        return exibidos
+
+    def ver_historico_cliente(self, id_cliente: str, offset: int = 0, limite: int | None = None):
         cliente = self.buscar_cliente_por_id(id_cliente)
         if not cliente: return
-        print(f"\n--- Histórico de Aluguéis do Cliente: {cliente['nome']} (ID: {id_cliente}) ---")
-        if not cliente['historico_alugueis']:
-            print("Nenhum aluguel registrado para este cliente.")
-            return
-        
-        for aluguel_tupla in cliente['historico_alugueis']:
-            id_filme, titulo_filme, data_aluguel, data_devolucao = aluguel_tupla
-            devolucao_str = data_devolucao if data_devolucao else "Pendente"
-            print(f"- Filme: {titulo_filme} (ID: {id_filme})")
-            print(f"  Alugado em: {data_aluguel}, Devolvido em: {devolucao_str}")
-            print("-" * 15)
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Histórico de Aluguéis do Cliente: {cliente['nome']} (ID: {id_cliente}) ---")
+            if not self.quantidade_alugueis_cliente(id_cliente):
+                saida.linha("Nenhum aluguel registrado para este cliente.")
+                return
+            for id_filme, titulo_filme, data_aluguel, data_devolucao in self.iterar_historico_cliente(id_cliente, offset, limite):
+                devolucao_str = data_devolucao if data_devolucao else "Pendente"
+                saida.escrever(
+                    f"- Filme: {titulo_filme} (ID: {id_filme})\n"
+                    f"  Alugado em: {data_aluguel}, Devolvido em: {devolucao_str}\n"
+                    f"{'-' * 15}\n"
+                )
 
     def remover_cliente(self, id_cliente: str) -> bool:
         cliente = self.clientes_cadastrados.get(id_cliente)
@@ -306,15 +1491,15 @@ class GerenciadorLocadora:
             return False
 
         # Verificar se o cliente tem filmes alugados
-        for no_filme in self.catalogo_filmes_dll:
-            if no_filme.data['id_cliente_alugou'] == id_cliente:
-                print(f"ERRO: Cliente '{cliente['nome']}' tem filmes alugados e não pode ser removido.")
-                return False
+        if self.alugueis_ativos_por_cliente.get(id_cliente):
+            print(f"ERRO: Cliente '{cliente['nome']}' tem filmes alugados e não pode ser removido.")
+            return False
 
         # Remover o cliente
         nome_cliente = cliente['nome']
-        del self.clientes_cadastrados[id_cliente]
-        self.registrar_acao(f"Cliente '{nome_cliente}' removido do sistema (ID: {id_cliente})")
+        self._excluir_cliente(cliente)
+        self._registrar_mutacao('cliente_removido', {'id_cliente': id_cliente})
+        self.registro_acoes.registrar('CLIENTE_REMOVIDO', id_cliente=id_cliente, nome=nome_cliente)
         print(f"SUCESSO: Cliente '{nome_cliente}' removido do sistema.")
         return True
 
@@ -328,33 +1513,78 @@ class GerenciadorLocadora:
         for genero in generos_ordenados:
             print(f"- {genero.capitalize()}")
 
-    def buscar_por_genero(self, genero: str) -> bool:
+    def buscar_por_genero(self, genero: str, offset: int = 0, limite: int | None = None) -> bool:
         if not genero or not genero.strip():
             print("ERRO: Gênero não pode ser vazio.")
             return False
 
-        genero_normalizado = genero.strip().lower()
-        ids_filmes = self.generos_para_filmes_idx.get(genero_normalizado)
-
-        if not ids_filmes:
+        if not self.generos_para_filmes_idx.get(genero.strip().lower()):
             print(f"Nenhum filme encontrado para o gênero '{genero.capitalize()}'.")
             return False
 
-        print(f"\n--- Filmes do gênero: {genero.capitalize()} ---")
-        total_encontrados = 0
-        for id_filme in ids_filmes:
-            no_filme = self.filmes_por_id_idx.get(id_filme)
-            if no_filme:
-                filme = no_filme.data
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Filmes do gênero: {genero.capitalize()} ---")
+            total_encontrados = 0
+            for numero, filme in enumerate(self.iterar_filmes_por_genero(genero, offset, limite), offset + 1):
+                total_encontrados += 1
+                self._escrever_resumo_filme(saida, numero, filme)
+
+            saida.linha(f"\nTotal de filmes encontrados: {total_encontrados}")
+        return True
+
+    def listar_filmes_por_ano(self, ano_ini: int | None = None, ano_fim: int | None = None,
+                              offset: int = 0, limite: int | None = None):
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Filmes por Ano de Lançamento ---")
+            total_encontrados = 0
+            filmes = self.iterar_filmes_por_ano(offset, limite, ano_min=ano_ini, ano_max=ano_fim)
+            for numero, filme in enumerate(filmes, offset + 1):
+                total_encontrados += 1
+                self._escrever_resumo_filme(saida, numero, filme)
+            if total_encontrados == 0:
+                saida.linha("Nenhum filme encontrado no intervalo informado.")
+            else:
+                saida.linha(f"\nTotal de filmes encontrados: {total_encontrados}")
+
+    def exibir_busca_filmes(self, offset: int = 0, limite: int | None = None, **criterios) -> int:
+        """Exibe o resultado de buscar_filmes e retorna a quantidade de filmes exibidos."""
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Resultado da Busca ---")
+            total_encontrados = 0
+            for numero, filme in enumerate(self.buscar_filmes(offset=offset, limite=limite, **criterios), offset + 1):
                 total_encontrados += 1
-                print(f"\n{total_encontrados}. {filme['titulo']} ({filme['ano']})")
-                print(f"   ID: {filme['id']}")
-                print(f"   Diretor: {filme.get('diretor', 'N/A')}")
-                print(f"   Status: {filme['status'].upper()}")
-                if filme['status'] == 'alugado':
-                    cliente = self.clientes_cadastrados.get(filme['id_cliente_alugou'], {})
-                    print(f"   Alugado por: {cliente.get('nome', 'Desconhecido')} em {filme['data_aluguel']}")
-                print("-" * 40)
-
-        print(f"\nTotal de filmes encontrados: {total_encontrados}")
-        return True
\ No newline at end of file
+                self._escrever_resumo_filme(saida, numero, filme)
+            if total_encontrados == 0:
+                saida.linha("Nenhum filme encontrado com os critérios informados.")
+            else:
+                saida.linha(f"\nTotal de filmes encontrados: {total_encontrados}")
+        return total_encontrados
+
+    def exibir_filmes_similares(self, id_filme: str, k: int = 10) -> int:
+        """Exibe os filmes mais parecidos com o informado; retorna a quantidade exibida."""
+        no_filme = self.filmes_por_id_idx.get(id_filme)
+        if not no_filme:
+            print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+            return 0
+        similares = self.filmes_similares(id_filme, k)
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Filmes Similares a '{no_filme.data['titulo']}' ---")
+            for numero, (filme, pontuacao) in enumerate(similares, 1):
+                saida.linha(f"{numero}. {filme['titulo']} ({filme['ano']}) - ID: {filme['id']}, "
+                            f"{self._texto_status(filme)}, afinidade {pontuacao:.1f}")
+            if not similares:
+                saida.linha("Nenhum filme similar encontrado.")
+        return len(similares)
+
+    def exibir_busca_titulo(self, consulta: str, k: int = 10) -> int:
+        if not consulta or not consulta.strip():
+            print("ERRO: A busca não pode ser vazia.")
+            return 0
+        filmes = self.buscar_por_titulo(consulta, k)
+        with SaidaBufferizada() as saida:
+            saida.linha(f"\n--- Filmes encontrados para '{consulta}' ---")
+            for numero, filme in enumerate(filmes, 1):
+                self._escrever_resumo_filme(saida, numero, filme)
+            if not filmes:
+                saida.linha("Nenhum filme encontrado para a busca informada.")
+        return len(filmes)
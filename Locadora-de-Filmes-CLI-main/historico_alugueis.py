@@ -0,0 +1,182 @@
+import array
+import bisect
+import datetime
+import functools
+
+# Valor da coluna de devolução para aluguéis ainda não devolvidos (os ordinais começam em 1).
+PENDENTE = 0
+
+
+@functools.lru_cache(maxsize=4096)
+def _ordinal(data: str) -> int:
+    return datetime.date.fromisoformat(data).toordinal()
+
+
+@functools.lru_cache(maxsize=4096)
+def _data(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+class HistoricoAlugueis:
+    """
+    Registro append-only de todos os aluguéis, guardado em colunas.
+
+    Cada aluguel é um evento com posição fixa (o offset) em quatro arrays de
+    inteiros: filme, cliente, data do aluguel e data da devolução (datas como
+    ordinais; PENDENTE enquanto não há devolução). IDs e títulos de filmes e
+    IDs de clientes são guardados uma única vez, em tabelas internadas, e as
+    tuplas só são montadas na leitura. Dois índices apontam para os offsets: a
+    lista de cada cliente, na ordem dos aluguéis, e a ordem pela data do
+    aluguel, consultada com bisect.
+
+    Os eventos de um cliente removido saem dos índices (da ordem por data de
+    forma preguiçosa, como no heap de vencimentos), mas continuam ocupando as
+    colunas até a próxima carga do snapshot, que só grava eventos vivos.
+    """
+
+    def __init__(self):
+        self._filme = array.array('i')
+        self._cliente = array.array('i')
+        self._dia_aluguel = array.array('i')
+        self._dia_devolucao = array.array('i')
+        # Tabelas internadas: índice -> id_filme/título e índice -> id_cliente, com os dicionários inversos.
+        self._ids_filmes = []
+        self._titulos = []
+        self._indice_filmes = {}
+        self._ids_clientes = []
+        self._indice_clientes = {}
+        # id_cliente -> array de offsets, na ordem dos aluguéis.
+        self._por_cliente = {}
+        # Offsets em ordem de data do aluguel, com as datas em paralelo para o bisect.
+        self._dias_ordenados = array.array('i')
+        self._ordem_por_data = array.array('i')
+        self._clientes_removidos = set()
+        # Eventos de clientes removidos: no total (para __len__) e ainda presentes na ordem por data.
+        self._mortos = 0
+        self._mortos_na_ordem = 0
+
+    def __len__(self) -> int:
+        """Quantidade de eventos vivos (sem os de clientes removidos)."""
+        return len(self._filme) - self._mortos
+
+    def _internar_filme(self, id_filme: str, titulo: str) -> int:
+        chave = (id_filme, titulo)
+        indice = self._indice_filmes.get(chave)
+        if indice is None:
+            indice = self._indice_filmes[chave] = len(self._ids_filmes)
+            self._ids_filmes.append(id_filme)
+            self._titulos.append(titulo)
+        return indice
+
+    def _internar_cliente(self, id_cliente: str) -> int:
+        indice = self._indice_clientes.get(id_cliente)
+        if indice is None:
+            indice = self._indice_clientes[id_cliente] = len(self._ids_clientes)
+            self._ids_clientes.append(id_cliente)
+        return indice
+
+    def registrar_aluguel(self, id_filme: str, titulo: str, id_cliente: str, data_aluguel: str,
+                          data_devolucao: str | None = None, manter_ordem: bool = True) -> int:
+        """
+        Anexa um aluguel e retorna seu offset.
+
+        Com manter_ordem=False o evento vai para o fim da ordem por data; quem
+        chama deve chamar ordenar() ao terminar a carga em lote.
+        """
+        offset = len(self._filme)
+        dia = _ordinal(data_aluguel)
+        self._filme.append(self._internar_filme(id_filme, titulo))
+        self._cliente.append(self._internar_cliente(id_cliente))
+        self._dia_aluguel.append(dia)
+        self._dia_devolucao.append(_ordinal(data_devolucao) if data_devolucao else PENDENTE)
+        offsets = self._por_cliente.get(id_cliente)
+        if offsets is None:
+            offsets = self._por_cliente[id_cliente] = array.array('i')
+        offsets.append(offset)
+        if manter_ordem and self._dias_ordenados and dia < self._dias_ordenados[-1]:
+            # Datas fora de ordem só aparecem na reaplicação de dados antigos; o caso comum é anexar.
+            posicao = bisect.bisect_right(self._dias_ordenados, dia)
+            self._dias_ordenados.insert(posicao, dia)
+            self._ordem_por_data.insert(posicao, offset)
+        else:
+            self._dias_ordenados.append(dia)
+            self._ordem_por_data.append(offset)
+        return offset
+
+    def registrar_devolucao(self, offset: int, data_devolucao: str):
+        self._dia_devolucao[offset] = _ordinal(data_devolucao)
+
+    def ordenar(self):
+        """Reordena o índice por data depois de uma carga em lote (um único sort)."""
+        pares = sorted(zip(self._dias_ordenados, self._ordem_por_data))
+        self._dias_ordenados = array.array('i', (dia for dia, _ in pares))
+        self._ordem_por_data = array.array('i', (offset for _, offset in pares))
+
+    def remover_cliente(self, id_cliente: str):
+        """Tira os eventos do cliente das consultas; o ID volta a ser um cliente novo se for reutilizado."""
+        offsets = self._por_cliente.pop(id_cliente, None)
+        indice = self._indice_clientes.pop(id_cliente, None)
+        if indice is None:
+            return
+        self._clientes_removidos.add(indice)
+        self._mortos += len(offsets or ())
+        self._mortos_na_ordem += len(offsets or ())
+        if self._mortos_na_ordem > 64 and self._mortos_na_ordem * 2 > len(self._ordem_por_data):
+            self._compactar_ordem()
+
+    def _compactar_ordem(self):
+        vivos = [(dia, offset) for dia, offset in zip(self._dias_ordenados, self._ordem_por_data)
+                 if self._cliente[offset] not in self._clientes_removidos]
+        self._dias_ordenados = array.array('i', (dia for dia, _ in vivos))
+        self._ordem_por_data = array.array('i', (offset for _, offset in vivos))
+        self._mortos_na_ordem = 0
+
+    def evento(self, offset: int) -> tuple[str, str, str, str, str | None]:
+        """(id_filme, título, id_cliente, data_aluguel, data_devolucao ou None) do evento."""
+        filme = self._filme[offset]
+        devolucao = self._dia_devolucao[offset]
+        return (self._ids_filmes[filme], self._titulos[filme], self._ids_clientes[self._cliente[offset]],
+                _data(self._dia_aluguel[offset]), _data(devolucao) if devolucao != PENDENTE else None)
+
+    def _registro_cliente(self, offset: int) -> tuple[str, str, str, str | None]:
+        filme = self._filme[offset]
+        devolucao = self._dia_devolucao[offset]
+        return (self._ids_filmes[filme], self._titulos[filme], _data(self._dia_aluguel[offset]),
+                _data(devolucao) if devolucao != PENDENTE else None)
+
+    def quantidade_do_cliente(self, id_cliente: str) -> int:
+        return len(self._por_cliente.get(id_cliente, ()))
+
+    def do_cliente(self, id_cliente: str, offset: int = 0, limite: int | None = None):
+        """Gera (id_filme, título, data_aluguel, data_devolucao ou None) dos aluguéis do cliente, do mais antigo ao mais recente."""
+        offsets = self._por_cliente.get(id_cliente)
+        if not offsets:
+            return iter(())
+        fim = len(offsets) if limite is None else offset + limite
+        return (self._registro_cliente(posicao) for posicao in offsets[offset:fim])
+
+    def filmes_recentes_do_cliente(self, id_cliente: str, quantidade: int) -> set[str]:
+        """IDs dos filmes dos últimos `quantidade` aluguéis do cliente."""
+        offsets = self._por_cliente.get(id_cliente, ())
+        return {self._ids_filmes[self._filme[posicao]] for posicao in offsets[-quantidade:]}
+
+    def eventos(self):
+        """Gera todos os eventos vivos (como em `evento`) na ordem em que foram registrados."""
+        for offset in range(len(self._filme)):
+            if self._cliente[offset] not in self._clientes_removidos:
+                yield self.evento(offset)
+
+    def _faixa_dias(self, data_ini: str | None, data_fim: str | None) -> tuple[int, int]:
+        inicio = 0 if data_ini is None else bisect.bisect_left(self._dias_ordenados, _ordinal(data_ini))
+        fim = len(self._dias_ordenados) if data_fim is None else bisect.bisect_right(self._dias_ordenados, _ordinal(data_fim))
+        return inicio, max(inicio, fim)
+
+    def entre(self, data_ini: str | None, data_fim: str | None, decrescente: bool = False):
+        """Gera os eventos com data de aluguel entre data_ini e data_fim (inclusive, 'AAAA-MM-DD'), em ordem de data."""
+        inicio, fim = self._faixa_dias(data_ini, data_fim)
+        posicoes = range(fim - 1, inicio - 1, -1) if decrescente else range(inicio, fim)
+        ordem = self._ordem_por_data
+        for posicao in posicoes:
+            offset = ordem[posicao]
+            if self._cliente[offset] not in self._clientes_removidos:
+                yield self.evento(offset)
@@ -0,0 +1,85 @@
+import os
+import csv
+import json
+
+SEPARADOR_LISTAS = "|"
+
+
+def _lista_de_campo(valor) -> list:
+    """Aceita listas (JSONL) ou strings separadas por '|' (CSV)."""
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        return [item.strip() for item in valor.split(SEPARADOR_LISTAS) if item.strip()]
+    return [str(item).strip() for item in valor if str(item).strip()]
+
+
+def _inteiro_de_campo(valor):
+    if isinstance(valor, str) and valor.strip().isdigit():
+        return int(valor)
+    return valor
+
+
+def _campo_ausente(valor) -> bool:
+    """Campo que não veio no registro (ou coluna em branco no CSV)."""
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def ler_registros(caminho: str):
+    """
+    Lê um arquivo CSV (com cabeçalho) ou JSON lines, gerando um dicionário por linha.
+
+    O formato é decidido pela extensão: '.jsonl'/'.ndjson' para JSON lines,
+    qualquer outra para CSV. Uma linha JSON malformada (ou que não seja um
+    objeto) gera um dicionário vazio, que a importação conta como inválido.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+        if extensao in (".jsonl", ".ndjson"):
+            for linha in arquivo:
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    registro = {}
+                yield registro if isinstance(registro, dict) else {}
+        else:
+            yield from csv.DictReader(arquivo)
+
+
+def ler_filmes(caminho: str):
+    """
+    Gera os filmes de um arquivo no formato esperado por GerenciadorLocadora.importar_filmes.
+
+    Colunas: titulo, ano, diretor, generos e atores (listas separadas por '|' no CSV)
+    e, opcionalmente, copias (padrão: 1 quando o campo falta; 0, negativos ou texto tornam a linha inválida).
+    """
+    for registro in ler_registros(caminho):
+        copias = registro.get('copias')
+        yield {
+            'titulo': (registro.get('titulo') or "").strip(),
+            'ano': _inteiro_de_campo(registro.get('ano')),
+            'diretor': (registro.get('diretor') or "").strip(),
+            'generos': set(genero.capitalize() for genero in _lista_de_campo(registro.get('generos'))),
+            'atores': _lista_de_campo(registro.get('atores')),
+            'copias': 1 if _campo_ausente(copias) else _inteiro_de_campo(copias),
+        }
+
+
+def ler_clientes(caminho: str):
+    """Gera os clientes de um arquivo com as colunas nome e contato."""
+    for registro in ler_registros(caminho):
+        yield {
+            'nome': (registro.get('nome') or "").strip(),
+            'contato': (registro.get('contato') or "").strip(),
+        }
+
+
+def exibir_resumo_importacao(descricao: str, resumo: dict):
+    segundos = resumo['segundos']
+    linhas = resumo['importados'] + resumo['duplicados'] + resumo['invalidos']
+    taxa = linhas / segundos if segundos > 0 else float(linhas)
+    print(f"Importação de {descricao} concluída: {resumo['importados']} adicionado(s), "
+          f"{resumo['duplicados']} duplicado(s), {resumo['invalidos']} inválido(s).")
+    print(f"{linhas} linha(s) em {segundos:.2f}s ({taxa:,.0f} linhas/s).")
@@ -0,0 +1,104 @@
+import re
+import heapq
+import itertools
+import unicodedata
+
+PADRAO_PALAVRA = re.compile(r"\w+")
+
+
+def remover_acentos(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> list[str]:
+    """Quebra o texto em palavras sem acentos e sem distinção de caixa."""
+    return PADRAO_PALAVRA.findall(remover_acentos(texto).casefold())
+
+
+def trigramas(palavra: str) -> set[str]:
+    """Trigramas da palavra com bordas marcadas ('  ab' conta como início)."""
+    marcada = f"  {palavra} "
+    return {marcada[i:i + 3] for i in range(len(marcada) - 2)}
+
+
+class IndiceTitulos:
+    """
+    Índice invertido de títulos para busca textual.
+
+    Mantém dois mapas de postings: palavra -> IDs e trigrama -> IDs. Palavras
+    da consulta encontradas no índice pontuam 1.0; as demais (erros de
+    digitação, palavras incompletas) são comparadas por trigramas e pontuam a
+    fração de trigramas em comum. Trigramas muito frequentes são ignorados para
+    que o custo da consulta não cresça com o catálogo. Palavras muito frequentes
+    ("o", "de", "dos") também não têm os postings percorridos: só somam pontos
+    aos candidatos trazidos pelas demais palavras.
+    """
+
+    def __init__(self, max_postings_trigrama: int = 5000, similaridade_minima: float = 0.4,
+                 max_postings_palavra: int = 5000):
+        self.palavras = {}
+        self.trigramas = {}
+        self.max_postings_trigrama = max_postings_trigrama
+        self.max_postings_palavra = max_postings_palavra
+        self.similaridade_minima = similaridade_minima
+
+    def adicionar(self, id_filme: str, titulo: str):
+        for palavra in set(tokenizar(titulo)):
+            self.palavras.setdefault(palavra, set()).add(id_filme)
+            for trigrama in trigramas(palavra):
+                self.trigramas.setdefault(trigrama, set()).add(id_filme)
+
+    def remover(self, id_filme: str, titulo: str):
+        for palavra in set(tokenizar(titulo)):
+            self._descartar(self.palavras, palavra, id_filme)
+            for trigrama in trigramas(palavra):
+                self._descartar(self.trigramas, trigrama, id_filme)
+
+    @staticmethod
+    def _descartar(postings: dict, chave: str, id_filme: str):
+        ids = postings.get(chave)
+        if ids is not None:
+            ids.discard(id_filme)
+            if not ids:
+                del postings[chave]
+
+    def buscar(self, consulta: str, k: int = 10) -> list[tuple[float, str]]:
+        """Retorna até k pares (pontuação, id_filme), do mais relevante para o menos."""
+        pontuacoes = {}
+        frequentes = []
+        for palavra in set(tokenizar(consulta)):
+            ids_exatos = self.palavras.get(palavra)
+            if ids_exatos and len(ids_exatos) > self.max_postings_palavra:
+                frequentes.append(ids_exatos)
+                continue
+            if ids_exatos:
+                for id_filme in ids_exatos:
+                    pontuacoes[id_filme] = pontuacoes.get(id_filme, 0.0) + 1.0
+                continue
+
+            trigramas_consulta = trigramas(palavra)
+            coincidencias = {}
+            for trigrama in trigramas_consulta:
+                ids = self.trigramas.get(trigrama)
+                if not ids or len(ids) > self.max_postings_trigrama:
+                    continue
+                for id_filme in ids:
+                    coincidencias[id_filme] = coincidencias.get(id_filme, 0) + 1
+            for id_filme, quantidade in coincidencias.items():
+                similaridade = quantidade / len(trigramas_consulta)
+                if similaridade >= self.similaridade_minima:
+                    pontuacoes[id_filme] = pontuacoes.get(id_filme, 0.0) + similaridade
+
+        if frequentes and pontuacoes:
+            # As palavras frequentes só pontuam quem já é candidato: um teste de pertinência por candidato.
+            for id_filme in pontuacoes:
+                pontuacoes[id_filme] += sum(1.0 for ids in frequentes if id_filme in ids)
+        elif frequentes:
+            # Consulta só com palavras frequentes: no máximo max_postings_palavra IDs do menor posting.
+            frequentes.sort(key=len)
+            for id_filme in itertools.islice(frequentes[0], self.max_postings_palavra):
+                pontuacoes[id_filme] = float(sum(1 for ids in frequentes if id_filme in ids))
+
+        return [(pontuacao, id_filme) for id_filme, pontuacao in
+                heapq.nlargest(k, pontuacoes.items(), key=lambda item: item[1])]
@@ -1,4 +1,6 @@
 class Node:
+    __slots__ = ('data', 'next', 'prev', 'owner')
+
     def __init__(self, data, prev = None, next = None):
         """
         Inicializa um nó da lista encadeada.
@@ -9,6 +11,8 @@ class Node:
         self.data = data
         self.next = next
         self.prev = prev
+        # Lista à qual o nó pertence; permite verificar a posse sem percorrer a lista.
+        self.owner = None
 
     def __repr__(self):
         """
@@ -54,6 +58,7 @@ class DoublyLinkedList:
             nodes_copy = nodes.copy()
             # Cria o primeiro nó com o primeiro elemento da lista.
             node = Node(data=nodes_copy.pop(0))
+            node.owner = self
 
             # Atribui o primeiro nó como head da lista.
             self.head = node
@@ -63,6 +68,7 @@ class DoublyLinkedList:
             for element in nodes_copy:
                 node.next = Node(data=element, prev=node)
                 node = node.next
+                node.owner = self
                 self.length += 1
             
             self.tail = node
@@ -120,7 +126,17 @@ class DoublyLinkedList:
         """Verifica se a lista está vazia."""
         return self.length == 0
     
+    def owns(self, node: Node) -> bool:
+        """Verifica em O(1) se o nó pertence a esta lista."""
+        return node is not None and node.owner is self
+
+    def _check_new_node(self, node: Node):
+        if node.owner is not None:
+            raise Exception(f"O nó {node} já pertence a uma lista.")
+
     def add_first(self, node: Node):
+        self._check_new_node(node)
+        node.owner = self
         node.prev = None
         node.next = self.head
         
@@ -135,8 +151,13 @@ class DoublyLinkedList:
         self.length += 1
 
     def add_last(self, node: Node):
+        self._check_new_node(node)
+        node.owner = self
+        node.next = None
+
         # Se a lista estiver vazia, o nó se torna o head e tail.
         if self.head is None and self.tail is None:
+            node.prev = None
             self.head = self.tail = node
             self.length = 1
             return
@@ -148,7 +169,7 @@ class DoublyLinkedList:
 
     def add_after(self, node: Node, new_node: Node):
         """
-        Adiciona um nó após um nó específico na lista encadeada.
+        Adiciona um nó após um nó específico na lista encadeada em O(1).
 
         Args:
             node (Node): O nó após o qual o novo nó será adicionado.
@@ -161,27 +182,27 @@ class DoublyLinkedList:
         # Se o nó atual for None, não há onde adicionar o novo nó.
         if node is None:
             return
-        
-        if self.tail == node:
+
+        # Se o nó não pertencer à lista, levanta uma exceção.
+        if not self.owns(node):
+            raise Exception(f"O nó {node} não foi encontrado na lista.")
+
+        if self.tail is node:
             return self.add_last(new_node)
-        
-        for current_node in self:
-            if current_node == node:
-                new_node.prev = current_node
-                new_node.next = current_node.next
 
-                current_node.next.prev = new_node
-                current_node.next = new_node
+        self._check_new_node(new_node)
+        new_node.owner = self
+        new_node.prev = node
+        new_node.next = node.next
 
-                self.length += 1
-                return
+        node.next.prev = new_node
+        node.next = new_node
 
-        # Se o nó não for encontrado na lista, levanta uma exceção.
-        raise Exception(f"O nó {node} não foi encontrado na lista.")
+        self.length += 1
 
     def add_before(self, node: Node, new_node: Node):
         """
-        Adiciona um nó antes de um nó específico na lista encadeada.
+        Adiciona um nó antes de um nó específico na lista encadeada em O(1).
 
         Args:
             node (Node): O nó antes do qual o novo nó será adicionado.
@@ -195,27 +216,29 @@ class DoublyLinkedList:
         if node is None:
             return
 
-        # Se o nó a ser adicionado for o head, adiciona-o no início da lista.
-        if self.head == node:
+        # Se o nó não pertencer à lista, levanta uma exceção.
+        if not self.owns(node):
+            raise Exception(f"O nó {node} não foi encontrado na lista.")
+
+        # Se o nó de referência for o head, adiciona o novo nó no início da lista.
+        if self.head is node:
             return self.add_first(new_node)
-        
-        # Percorre a lista encadeada para encontrar o nó antes do qual queremos adicionar o novo nó.
-        for current_node in reversed(self):
-            if current_node == node:
-                new_node.next = current_node
-                new_node.prev = current_node.prev
-
-                current_node.prev.next = new_node
-                current_node.prev = new_node
-                self.length += 1
-                return
 
-        # Se o nó não for encontrado na lista, levanta uma exceção.
-        raise Exception(f"O nó {node} não foi encontrado na lista.")
+        self._check_new_node(new_node)
+        new_node.owner = self
+        new_node.next = node
+        new_node.prev = node.prev
+
+        node.prev.next = new_node
+        node.prev = new_node
+        self.length += 1
 
     def remove(self, node: Node):
         """
-        Remove um nó específico da lista encadeada.
+        Remove um nó específico da lista encadeada em O(1).
+
+        A posse é verificada pela identidade do nó (atributo owner), sem
+        percorrer a lista nem comparar os dados armazenados.
 
         Args:
             node (Node): O nó a ser removido.
@@ -223,43 +246,26 @@ class DoublyLinkedList:
         # Se o head da lista for None, não há onde remover o nó.
         if self.head is None:
             raise Exception("A lista está vazia.")
-        
-        removido = False
-        
-        if self.head == node:
-            if self.head == self.tail:
-                self.head = None
-                self.tail = None
-            else:
-                self.head = self.head.next
-                self.head.prev = None
-            removido = True
-        elif self.tail == node:
-            new_tail = self.tail.prev
-            new_tail.next = None
-            self.tail = new_tail
-            removido = True
+
+        if not self.owns(node):
+            raise ValueError(f"O nó {node} não foi encontrado na lista.")
+
+        # Religa os vizinhos do nó removido.
+        if node.prev is not None:
+            node.prev.next = node.next
         else:
-            for current_node in self:
-                if current_node.next == node:
-                    node_remove = current_node.next
-                    current_node.next = node_remove.next
-
-                    if node_remove.next is not None:
-                        node_remove.next.prev = current_node
-                    else:
-                        self.tail = current_node
-                    
-                    removido = True
-                    break
-
-        if removido:
-            # Limpa as referências do nó removido
-            node.prev = None
-            node.next = None
-            self.length -= 1
+            self.head = node.next
+
+        if node.next is not None:
+            node.next.prev = node.prev
         else:
-            raise ValueError(f"O nó {node} não foi encontrado na lista.")
+            self.tail = node.prev
+
+        # Limpa as referências do nó removido
+        node.prev = None
+        node.next = None
+        node.owner = None
+        self.length -= 1
 
     def popleft(self):
         if self.head is None:
@@ -274,4 +280,4 @@ class DoublyLinkedList:
 
         data = self.tail.data
         self.remove(self.tail)
-        return data
\ No newline at end of file
+        return data
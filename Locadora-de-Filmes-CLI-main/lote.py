@@ -0,0 +1,193 @@
+import sys
+import time
+import shlex
+import contextlib
+import importador
+from saida import SaidaBufferizada
+
+
+def _lista(valor: str) -> list[str]:
+    return [item.strip() for item in valor.split(importador.SEPARADOR_LISTAS) if item.strip()]
+
+
+def _inteiro(valor: str, nome: str) -> int:
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"'{nome}' deve ser um número inteiro.") from None
+
+
+def _importar_filmes(gerenciador, caminho):
+    resumo = gerenciador.importar_filmes(importador.ler_filmes(caminho))
+    importador.exibir_resumo_importacao("filmes", resumo)
+    return resumo['invalidos'] == 0
+
+
+def _importar_clientes(gerenciador, caminho):
+    resumo = gerenciador.importar_clientes(importador.ler_clientes(caminho))
+    importador.exibir_resumo_importacao("clientes", resumo)
+    return resumo['invalidos'] == 0
+
+
+def _buscar_titulo(gerenciador, *palavras):
+    gerenciador.exibir_busca_titulo(" ".join(palavras))
+
+
+def _copias(gerenciador, id_filme, quantidade):
+    quantidade = _inteiro(quantidade, "quantidade")
+    if quantidade < 0:
+        return gerenciador.remover_copias(id_filme, -quantidade)
+    return gerenciador.adicionar_copias(id_filme, quantidade)
+
+
+def _similares(gerenciador, id_filme, k="10"):
+    if gerenciador.buscar_filme_por_id(id_filme) is None:
+        print(f"ERRO: Filme com ID '{id_filme}' não encontrado.")
+        return False
+    gerenciador.exibir_filmes_similares(id_filme, _inteiro(k, "k"))
+
+
+def _atrasados(gerenciador, limite=None):
+    gerenciador.listar_atrasados(_inteiro(limite, "limite") if limite else None)
+
+
+def _vencendo(gerenciador, dias="3"):
+    gerenciador.listar_vencimentos(_inteiro(dias, "dias"))
+
+
+def _relatorio(gerenciador, tipo, quantidade="10", mes=None):
+    quantidade = _inteiro(quantidade, "quantidade")
+    if tipo == "filmes":
+        gerenciador.exibir_filmes_mais_alugados(quantidade, mes)
+    elif tipo == "clientes":
+        gerenciador.exibir_clientes_que_mais_alugam(quantidade)
+    elif tipo == "generos":
+        gerenciador.exibir_generos_mais_alugados(quantidade)
+    elif tipo == "meses":
+        gerenciador.exibir_alugueis_por_mes(quantidade)
+    else:
+        raise ValueError(f"Relatório desconhecido: '{tipo}' (use filmes, clientes, generos ou meses).")
+
+
+def _alugueis_entre(gerenciador, data_ini, data_fim, limite=None):
+    if gerenciador.exibir_alugueis_entre(data_ini, data_fim, limite=_inteiro(limite, "limite") if limite else None) is None:
+        return False
+
+
+# comando -> (função(gerenciador, *args) -> resultado, mínimo de argumentos, máximo de argumentos, sintaxe)
+# Comandos de consulta retornam None; os demais retornam um valor falso em caso de erro.
+COMANDOS = {
+    'alugar': (lambda g, id_filme, id_cliente: g.alugar_filme(id_filme, id_cliente), 2, 2, "alugar <id_filme> <id_cliente>"),
+    'devolver': (lambda g, id_filme, id_cliente=None: g.devolver_filme(id_filme, id_cliente), 1, 2,
+                 "devolver <id_filme> [id_cliente]"),
+    'adicionar_filme': (
+        lambda g, titulo, ano, diretor, generos="", atores="", copias="1": g.adicionar_filme_catalogo(
+            titulo, _inteiro(ano, "ano"), diretor, set(_lista(generos)), _lista(atores), _inteiro(copias, "copias")),
+        3, 6, 'adicionar_filme "<título>" <ano> "<diretor>" ["<gênero|gênero>"] ["<ator|ator>"] [cópias]'),
+    'copias': (_copias, 2, 2, "copias <id_filme> <quantidade (negativa para remover)>"),
+    'remover_filme': (lambda g, id_filme: g.remover_filme_catalogo(id_filme), 1, 1, "remover_filme <id_filme>"),
+    'adicionar_cliente': (lambda g, nome, contato="": g.adicionar_cliente(nome, contato), 1, 2,
+                          'adicionar_cliente "<nome>" ["<contato>"]'),
+    'remover_cliente': (lambda g, id_cliente: g.remover_cliente(id_cliente), 1, 1, "remover_cliente <id_cliente>"),
+    'importar_filmes': (_importar_filmes, 1, 1, "importar_filmes <arquivo>"),
+    'importar_clientes': (_importar_clientes, 1, 1, "importar_clientes <arquivo>"),
+    'listar_filmes': (lambda g, offset="0", limite=None: g.listar_todos_os_filmes(
+        _inteiro(offset, "offset"), _inteiro(limite, "limite") if limite else None), 0, 2, "listar_filmes [offset] [limite]"),
+    'listar_clientes': (lambda g, offset="0", limite=None: g.listar_clientes(
+        _inteiro(offset, "offset"), _inteiro(limite, "limite") if limite else None), 0, 2, "listar_clientes [offset] [limite]"),
+    'historico': (lambda g, id_cliente: g.ver_historico_cliente(id_cliente), 1, 1, "historico <id_cliente>"),
+    'buscar_titulo': (_buscar_titulo, 1, 99, "buscar_titulo <consulta>"),
+    'similares': (_similares, 1, 2, "similares <id_filme> [k]"),
+    'atrasados': (_atrasados, 0, 1, "atrasados [limite]"),
+    'vencendo': (_vencendo, 0, 1, "vencendo [dias]"),
+    'prazo_filme': (lambda g, id_filme, dias=None: g.definir_prazo_filme(id_filme, _inteiro(dias, "dias") if dias else None),
+                    1, 2, "prazo_filme <id_filme> [dias]"),
+    'reservar': (lambda g, id_filme, id_cliente: g.reservar_filme(id_filme, id_cliente), 2, 2,
+                 "reservar <id_filme> <id_cliente>"),
+    'cancelar_reserva': (lambda g, id_filme, id_cliente: g.cancelar_reserva(id_filme, id_cliente), 2, 2,
+                         "cancelar_reserva <id_filme> <id_cliente>"),
+    'fila': (lambda g, id_filme: g.listar_fila_reservas(id_filme), 1, 1, "fila <id_filme>"),
+    'relatorio': (_relatorio, 1, 3, "relatorio <filmes|clientes|generos|meses> [quantidade] [AAAA-MM]"),
+    'alugueis_entre': (_alugueis_entre, 2, 3, "alugueis_entre <AAAA-MM-DD> <AAAA-MM-DD> [limite]"),
+    'acoes': (lambda g, quantidade="10": g.ver_ultimas_acoes(_inteiro(quantidade, "quantidade")), 0, 1,
+              "acoes [quantidade]"),
+}
+
+
+def executar_script(gerenciador, linhas, persistencia=None, comandos_por_sincronizacao: int | None = None,
+                    parar_no_erro: bool = False, destino=None) -> dict:
+    """
+    Executa comandos de texto em sequência, sem menu e sem prompts.
+
+    Cada linha é um comando (ex.: `alugar 0001 cliente_0001`); linhas vazias e
+    iniciadas por '#' são ignoradas e argumentos com espaços vão entre aspas.
+    Toda a saída passa por uma SaidaBufferizada. Com `comandos_por_sincronizacao`,
+    o journal deixa de ser gravado a cada `tamanho_lote` mutações e passa a ser
+    gravado (com um único fsync) a cada N comandos e ao final do script.
+
+    Returns:
+        dict: {'executados', 'sucessos', 'falhas', 'segundos'}
+    """
+    resumo = {'executados': 0, 'sucessos': 0, 'falhas': 0, 'segundos': 0.0}
+    agrupar = persistencia is not None and comandos_por_sincronizacao
+    tamanho_lote_original = persistencia.tamanho_lote if persistencia is not None else None
+    if agrupar:
+        persistencia.tamanho_lote = sys.maxsize
+
+    inicio = time.perf_counter()
+    saida = SaidaBufferizada(destino)
+    try:
+        with contextlib.redirect_stdout(saida):
+            for numero_linha, linha in enumerate(linhas, 1):
+                linha = linha.strip()
+                if not linha or linha.startswith("#"):
+                    continue
+                sucesso = _executar_linha(gerenciador, numero_linha, linha)
+                resumo['executados'] += 1
+                resumo['sucessos' if sucesso else 'falhas'] += 1
+                if agrupar and resumo['executados'] % comandos_por_sincronizacao == 0:
+                    persistencia.sincronizar()
+                if not sucesso and parar_no_erro:
+                    print(f"Execução interrompida na linha {numero_linha}.")
+                    break
+    finally:
+        saida.descarregar()
+        if agrupar:
+            persistencia.tamanho_lote = tamanho_lote_original
+            persistencia.sincronizar()
+    resumo['segundos'] = time.perf_counter() - inicio
+    return resumo
+
+
+def _executar_linha(gerenciador, numero_linha: int, linha: str) -> bool:
+    try:
+        partes = shlex.split(linha)
+    except ValueError as e:
+        print(f"ERRO: Linha {numero_linha}: {e}.")
+        return False
+    nome, argumentos = partes[0].lower(), partes[1:]
+    comando = COMANDOS.get(nome)
+    if comando is None:
+        print(f"ERRO: Linha {numero_linha}: comando desconhecido '{nome}'.")
+        return False
+    funcao, minimo, maximo, sintaxe = comando
+    if not minimo <= len(argumentos) <= maximo:
+        print(f"ERRO: Linha {numero_linha}: uso: {sintaxe}")
+        return False
+    try:
+        resultado = funcao(gerenciador, *argumentos)
+    except ValueError as e:
+        print(f"ERRO: Linha {numero_linha}: {e}")
+        return False
+    except OSError as e:
+        print(f"ERRO: Linha {numero_linha}: não foi possível ler o arquivo. {e}")
+        return False
+    return resultado is None or bool(resultado)
+
+
+def exibir_resumo_lote(resumo: dict):
+    segundos = resumo['segundos']
+    taxa = resumo['executados'] / segundos if segundos > 0 else float(resumo['executados'])
+    print(f"\nScript concluído: {resumo['executados']} comando(s), {resumo['sucessos']} com sucesso, "
+          f"{resumo['falhas']} com erro.")
+    print(f"{resumo['executados']} comando(s) em {segundos:.2f}s ({taxa:,.0f} comandos/s).")
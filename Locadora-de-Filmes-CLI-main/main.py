@@ -1,5 +1,13 @@
-from gerenciador_locadora import GerenciadorLocadora
+from gerenciador_locadora import GerenciadorLocadora, PRAZO_PADRAO_DIAS, MULTA_POR_DIA
+from persistencia import PersistenciaLocadora
+from registro_acoes import RegistroAcoes
+from concorrencia import GerenciadorLocadoraConcorrente
+from metricas import MetricasLocadora
 from cli import iniciar_interface
+from servidor import executar_servidor
+import lote
+import importador
+import argparse
 import sys
 
 def popular_dados_exemplo_locadora(gerenciador: GerenciadorLocadora):
@@ -18,22 +26,134 @@ def popular_dados_exemplo_locadora(gerenciador: GerenciadorLocadora):
     print("Dados de exemplo da locadora populados.")
     print("-" * 30)
 
+def obter_argumentos():
+    parser = argparse.ArgumentParser(description="Locadora de Filmes CLI")
+    parser.add_argument("--sem-dados", action="store_true", help="inicia o sistema sem dados de exemplo")
+    parser.add_argument("--dados", metavar="DIRETORIO", help="diretório onde o estado da locadora é persistido")
+    parser.add_argument("--lote-journal", type=int, default=64, metavar="N",
+                        help="quantidade de mutações agrupadas em cada fsync do journal (padrão: 64)")
+    parser.add_argument("--log-acoes", metavar="ARQUIVO",
+                        help="grava em um arquivo com rotação as ações que saem do buffer em memória")
+    parser.add_argument("--capacidade-log", type=int, default=1000, metavar="N",
+                        help="quantidade de ações mantidas em memória (padrão: 1000)")
+    parser.add_argument("--importar", metavar="ARQUIVO",
+                        help="importa filmes de um arquivo CSV/JSONL e encerra")
+    parser.add_argument("--importar-clientes", metavar="ARQUIVO",
+                        help="importa clientes de um arquivo CSV/JSONL e encerra")
+    parser.add_argument("--concorrente", action="store_true",
+                        help="usa o gerenciador com travas, seguro para vários terminais/threads")
+    parser.add_argument("--script", metavar="ARQUIVO",
+                        help="executa os comandos do arquivo ('-' para a entrada padrão) e encerra")
+    parser.add_argument("--sincronizar-a-cada", type=int, metavar="N",
+                        help="no modo script, grava o journal uma vez a cada N comandos")
+    parser.add_argument("--parar-no-erro", action="store_true",
+                        help="no modo script, interrompe a execução no primeiro comando com erro")
+    parser.add_argument("--metricas", action="store_true",
+                        help="mede chamadas e latência das operações (menu Sistema)")
+    parser.add_argument("--arquivo-metricas", metavar="ARQUIVO",
+                        help="exporta as métricas no formato Prometheus para este arquivo ao encerrar")
+    parser.add_argument("--perfil", metavar="ARQUIVO",
+                        help="grava também as estatísticas completas das operações perfiladas neste arquivo")
+    parser.add_argument("--servidor", type=int, metavar="PORTA",
+                        help="atende requisições JSON por TCP nesta porta em vez de abrir o menu")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço do servidor (padrão: 127.0.0.1)")
+    parser.add_argument("--unix", metavar="CAMINHO", help="atende por socket Unix em vez de TCP")
+    parser.add_argument("--prazo-dias", type=int, default=PRAZO_PADRAO_DIAS, metavar="N",
+                        help=f"prazo padrão de aluguel em dias (padrão: {PRAZO_PADRAO_DIAS})")
+    parser.add_argument("--prazo-genero", action="append", default=[], metavar="GENERO=DIAS",
+                        help="prazo de aluguel de um gênero (pode ser repetido)")
+    parser.add_argument("--multa-diaria", type=float, default=MULTA_POR_DIA, metavar="VALOR",
+                        help=f"multa por dia de atraso em R$ (padrão: {MULTA_POR_DIA:.2f})")
+    parser.add_argument("--cache-similares", type=int, metavar="K",
+                        help="guarda os K vizinhos de cada filme consultado em 'filmes similares'")
+    argumentos = parser.parse_args()
+    if argumentos.prazo_dias < 1:
+        parser.error("--prazo-dias deve ser pelo menos 1.")
+    if argumentos.multa_diaria < 0:
+        parser.error("--multa-diaria não pode ser negativa.")
+    prazos_por_genero = {}
+    for item in argumentos.prazo_genero:
+        genero, _, dias = item.rpartition("=")
+        if not genero.strip() or not dias.strip().isdigit() or int(dias) < 1:
+            parser.error(f"--prazo-genero inválido: '{item}' (use GENERO=DIAS, com DIAS >= 1).")
+        prazos_por_genero[genero.strip()] = int(dias)
+    argumentos.prazo_genero = prazos_por_genero
+    return argumentos
+
+def configurar_prazos(gerenciador: GerenciadorLocadora, argumentos):
+    gerenciador.prazo_padrao_dias = argumentos.prazo_dias
+    gerenciador.multa_por_dia = argumentos.multa_diaria
+    for genero, dias in argumentos.prazo_genero.items():
+        gerenciador.definir_prazo_genero(genero, dias)
+
+def executar_importacoes(gerenciador: GerenciadorLocadora, argumentos):
+    if argumentos.importar_clientes:
+        resumo = gerenciador.importar_clientes(importador.ler_clientes(argumentos.importar_clientes))
+        importador.exibir_resumo_importacao("clientes", resumo)
+    if argumentos.importar:
+        resumo = gerenciador.importar_filmes(importador.ler_filmes(argumentos.importar))
+        importador.exibir_resumo_importacao("filmes", resumo)
+
+def executar_script(gerenciador: GerenciadorLocadora, persistencia, argumentos):
+    if argumentos.script == "-":
+        resumo = lote.executar_script(gerenciador, sys.stdin, persistencia,
+                                      argumentos.sincronizar_a_cada, argumentos.parar_no_erro)
+    else:
+        with open(argumentos.script, "r", encoding="utf-8") as arquivo:
+            resumo = lote.executar_script(gerenciador, arquivo, persistencia,
+                                          argumentos.sincronizar_a_cada, argumentos.parar_no_erro)
+    lote.exibir_resumo_lote(resumo)
+    return resumo
+
 def iniciar_sistema():
-    meu_gerenciador_locadora = GerenciadorLocadora()
-    
-    # Verifica se foi passado o argumento --sem-dados
-    if len(sys.argv) > 1 and sys.argv[1] == "--sem-dados":
+    argumentos = obter_argumentos()
+    registro_acoes = RegistroAcoes(argumentos.capacidade_log, arquivo_descarte=argumentos.log_acoes)
+    classe_gerenciador = GerenciadorLocadoraConcorrente if argumentos.concorrente else GerenciadorLocadora
+    meu_gerenciador_locadora = classe_gerenciador(registro_acoes=registro_acoes)
+    if argumentos.cache_similares:
+        meu_gerenciador_locadora.ativar_cache_similares(argumentos.cache_similares)
+
+    metricas = None
+    if argumentos.metricas or argumentos.arquivo_metricas:
+        metricas = MetricasLocadora()
+        metricas.arquivo_perfil = argumentos.perfil
+        metricas.instrumentar(meu_gerenciador_locadora)
+
+    persistencia = None
+    estado_restaurado = False
+    if argumentos.dados:
+        persistencia = PersistenciaLocadora(argumentos.dados, tamanho_lote=argumentos.lote_journal)
+        estado_restaurado = persistencia.carregar(meu_gerenciador_locadora)
+        if estado_restaurado:
+            print(f"Estado da locadora restaurado de '{argumentos.dados}'.")
+    # Depois da carga: os prazos por gênero gravados valem, mas os passados na linha de comando prevalecem.
+    configurar_prazos(meu_gerenciador_locadora, argumentos)
+
+    modo_importacao = bool(argumentos.importar or argumentos.importar_clientes)
+    if argumentos.sem_dados:
         print("Iniciando sistema sem dados de exemplo...")
-    else:
+    elif not estado_restaurado and not modo_importacao and not argumentos.script:
         popular_dados_exemplo_locadora(meu_gerenciador_locadora)
 
     try:
-        iniciar_interface(meu_gerenciador_locadora)
+        if modo_importacao:
+            executar_importacoes(meu_gerenciador_locadora, argumentos)
+        elif argumentos.script:
+            executar_script(meu_gerenciador_locadora, persistencia, argumentos)
+        elif argumentos.servidor is not None or argumentos.unix:
+            executar_servidor(meu_gerenciador_locadora, argumentos.host, argumentos.servidor, argumentos.unix)
+        else:
+            iniciar_interface(meu_gerenciador_locadora)
     except Exception as e:
         print(f"\nERRO CRÍTICO NO PROGRAMA: {e}")
         import traceback
         traceback.print_exc()
     finally:
+        if persistencia:
+            persistencia.fechar()
+        if metricas and argumentos.arquivo_metricas:
+            metricas.exportar_prometheus(argumentos.arquivo_metricas)
+            print(f"Métricas exportadas para '{argumentos.arquivo_metricas}'.")
         print("\nPrograma da locadora finalizado.")
 
 if __name__ == "__main__":
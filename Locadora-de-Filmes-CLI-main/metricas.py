@@ -0,0 +1,231 @@
+import io
+import os
+import time
+import bisect
+import pstats
+import cProfile
+import threading
+import functools
+import collections
+from saida import SaidaBufferizada
+
+# Limites superiores (em segundos) das faixas do histograma de latência.
+FAIXAS_LATENCIA = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Operações instrumentadas. Métodos que retornam geradores (iterar_*, buscar_filmes)
+# ficam de fora: o tempo medido seria só o da criação do gerador.
+METODOS_INSTRUMENTADOS = (
+    'adicionar_filme_catalogo', 'remover_filme_catalogo', 'importar_filmes', 'importar_clientes',
+    'buscar_filme_por_id', 'buscar_filme_por_titulo_ano', 'buscar_por_titulo', 'buscar_por_genero',
+    'adicionar_cliente', 'remover_cliente', 'buscar_cliente_por_id', 'buscar_cliente_por_nome',
+    'buscar_clientes_por_prefixo', 'alugar_filme', 'devolver_filme', 'listar_alugueis_ativos',
+    'listar_todos_os_filmes', 'listar_filmes_por_status', 'listar_clientes', 'listar_filmes_por_ano',
+    'ver_historico_cliente', 'exibir_busca_filmes', 'exibir_busca_titulo',
+    'adicionar_copias', 'remover_copias', 'reservar_filme', 'cancelar_reserva',
+    'filmes_similares', 'exibir_alugueis_entre',
+)
+
+
+def perfilar(funcao, *args, linhas: int = 20, arquivo: str | None = None, **kwargs):
+    """
+    Executa a função sob o cProfile e exibe as funções com maior tempo acumulado.
+
+    Com `arquivo`, as estatísticas completas também são gravadas (formato do
+    pstats, para abrir com snakeviz ou `python -m pstats`). Retorna o resultado da função.
+    """
+    perfil = cProfile.Profile()
+    try:
+        return perfil.runcall(funcao, *args, **kwargs)
+    finally:
+        if arquivo:
+            perfil.dump_stats(arquivo)
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(linhas)
+        print(f"\n--- Perfil de {getattr(funcao, '__name__', 'operação')} (cProfile) ---")
+        print(texto.getvalue().rstrip())
+
+
+class MetricasLocadora:
+    """
+    Contadores e histogramas de latência das operações do GerenciadorLocadora.
+
+    A instrumentação é opcional: `instrumentar` substitui os métodos da
+    instância por versões que medem cada chamada; sem ela, o gerenciador não
+    paga nenhum custo. Os tamanhos dos índices não são acompanhados a cada
+    operação, e sim lidos do gerenciador no momento da exibição ou exportação.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.chamadas = collections.Counter()
+        self.falhas = collections.Counter()
+        self.soma_segundos = collections.Counter()
+        self.faixas = {}
+        self._alugueis_recentes = collections.deque()
+        self.perfilar_proxima = False
+        self.arquivo_perfil = None
+        self.gerenciador = None
+
+    def registrar(self, metodo: str, segundos: float, resultado):
+        with self._trava:
+            self.chamadas[metodo] += 1
+            self.soma_segundos[metodo] += segundos
+            contagens = self.faixas.get(metodo)
+            if contagens is None:
+                contagens = self.faixas[metodo] = [0] * (len(FAIXAS_LATENCIA) + 1)
+            contagens[bisect.bisect_left(FAIXAS_LATENCIA, segundos)] += 1
+            if resultado is False:
+                self.falhas[metodo] += 1
+            elif metodo == 'alugar_filme' and resultado:
+                self._registrar_aluguel()
+
+    def _registrar_aluguel(self):
+        agora = time.monotonic()
+        self._alugueis_recentes.append(agora)
+        self._descartar_alugueis_antigos(agora)
+
+    def _descartar_alugueis_antigos(self, agora: float):
+        while self._alugueis_recentes and self._alugueis_recentes[0] < agora - 60:
+            self._alugueis_recentes.popleft()
+
+    def alugueis_por_minuto(self) -> int:
+        """Aluguéis concluídos nos últimos 60 segundos."""
+        with self._trava:
+            self._descartar_alugueis_antigos(time.monotonic())
+            return len(self._alugueis_recentes)
+
+    def percentil_estimado(self, metodo: str, p: float) -> float | None:
+        """Limite superior da faixa do histograma que contém o percentil p."""
+        contagens = self.faixas.get(metodo)
+        if not contagens:
+            return None
+        alvo = p / 100 * sum(contagens)
+        acumulado = 0
+        for indice, quantidade in enumerate(contagens):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return FAIXAS_LATENCIA[indice] if indice < len(FAIXAS_LATENCIA) else float("inf")
+        return float("inf")
+
+    # --- Instrumentação ---
+
+    def _envolver(self, nome: str, metodo):
+        @functools.wraps(metodo)
+        def medido(*args, **kwargs):
+            if self.perfilar_proxima:
+                self.perfilar_proxima = False
+                inicio = time.perf_counter()
+                resultado = perfilar(metodo, *args, arquivo=self.arquivo_perfil, **kwargs)
+            else:
+                inicio = time.perf_counter()
+                resultado = metodo(*args, **kwargs)
+            self.registrar(nome, time.perf_counter() - inicio, resultado)
+            return resultado
+        return medido
+
+    def instrumentar(self, gerenciador, metodos=METODOS_INSTRUMENTADOS):
+        """Passa a medir os métodos informados desta instância do gerenciador."""
+        for nome in metodos:
+            setattr(gerenciador, nome, self._envolver(nome, getattr(gerenciador, nome)))
+        gerenciador.metricas = self
+        self.gerenciador = gerenciador
+
+    def desinstrumentar(self):
+        """Remove os envoltórios; o gerenciador volta a chamar os métodos originais."""
+        if self.gerenciador is None:
+            return
+        for nome in METODOS_INSTRUMENTADOS:
+            self.gerenciador.__dict__.pop(nome, None)
+        self.gerenciador.metricas = None
+        self.gerenciador = None
+
+    # --- Leitura do estado do gerenciador ---
+
+    def tamanhos_indices(self) -> dict:
+        g = self.gerenciador
+        return {
+            'filmes_por_id': len(g.filmes_por_id_idx),
+            'filmes_por_titulo_ano': len(g.filmes_por_titulo_ano_idx),
+            'generos': len(g.generos_para_filmes_idx),
+            'atores': len(g.atores_para_filmes_idx),
+            'diretores': len(g.diretores_para_filmes_idx),
+            'anos': len(g._filmes_por_ano_ordenados),
+            'titulos_palavras': len(g.titulos_idx.palavras),
+            'titulos_trigramas': len(g.titulos_idx.trigramas),
+            'clientes_por_nome': len(g.clientes_por_nome_idx),
+            'historico_alugueis': len(g.historico),
+        }
+
+    # --- Exibição e exportação ---
+
+    def exibir(self):
+        g = self.gerenciador
+        with SaidaBufferizada() as saida:
+            saida.linha("\n--- Métricas de Desempenho ---")
+            saida.linha(f"Filmes no catálogo (DLL): {len(g.catalogo_filmes_dll)}  |  "
+                        f"Disponíveis: {g.contar_filmes_por_status('disponivel')}  |  "
+                        f"Alugados: {g.contar_filmes_por_status('alugado')}")
+            saida.linha(f"Clientes: {len(g.clientes_cadastrados)}  |  "
+                        f"Aluguéis no último minuto: {self.alugueis_por_minuto()}")
+            saida.linha("Índices: " + ", ".join(f"{nome}={tamanho}" for nome, tamanho in self.tamanhos_indices().items()))
+            if not self.chamadas:
+                saida.linha("Nenhuma operação medida ainda.")
+                return
+            saida.linha(f"\n{'operação':<30}{'chamadas':>10}{'falhas':>8}{'média (ms)':>12}{'p99 ≤ (ms)':>12}")
+            for metodo, quantidade in self.chamadas.most_common():
+                media = self.soma_segundos[metodo] / quantidade * 1000
+                p99 = self.percentil_estimado(metodo, 99) * 1000
+                saida.linha(f"{metodo:<30}{quantidade:>10}{self.falhas[metodo]:>8}{media:>12.3f}{p99:>12.3f}")
+            saida.linha("-" * 72)
+
+    def texto_prometheus(self) -> str:
+        """Monta as métricas no formato de texto do Prometheus."""
+        g = self.gerenciador
+        linhas = []
+
+        def metrica(nome, tipo, ajuda, amostras):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for rotulos, valor in amostras:
+                linhas.append(f"{nome}{rotulos} {valor}")
+
+        with self._trava:
+            chamadas = dict(self.chamadas)
+            falhas = dict(self.falhas)
+            somas = dict(self.soma_segundos)
+            faixas = {metodo: list(contagens) for metodo, contagens in self.faixas.items()}
+
+        metrica("locadora_chamadas_total", "counter", "Chamadas por operação.",
+                [(f'{{metodo="{m}"}}', n) for m, n in sorted(chamadas.items())])
+        metrica("locadora_falhas_total", "counter", "Chamadas que retornaram False.",
+                [(f'{{metodo="{m}"}}', n) for m, n in sorted(falhas.items())])
+
+        linhas.append("# HELP locadora_latencia_segundos Latência das operações.")
+        linhas.append("# TYPE locadora_latencia_segundos histogram")
+        for metodo in sorted(faixas):
+            acumulado = 0
+            for limite, quantidade in zip(FAIXAS_LATENCIA + (float("inf"),), faixas[metodo]):
+                acumulado += quantidade
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f'locadora_latencia_segundos_bucket{{metodo="{metodo}",le="{le}"}} {acumulado}')
+            linhas.append(f'locadora_latencia_segundos_sum{{metodo="{metodo}"}} {somas.get(metodo, 0.0):.9f}')
+            linhas.append(f'locadora_latencia_segundos_count{{metodo="{metodo}"}} {acumulado}')
+
+        metrica("locadora_filmes_catalogo", "gauge", "Filmes na lista encadeada do catálogo.",
+                [("", len(g.catalogo_filmes_dll))])
+        metrica("locadora_filmes_por_status", "gauge", "Filmes por status.",
+                [(f'{{status="{status}"}}', len(ids)) for status, ids in sorted(g.filmes_por_status_idx.items())])
+        metrica("locadora_clientes_cadastrados", "gauge", "Clientes cadastrados.",
+                [("", len(g.clientes_cadastrados))])
+        metrica("locadora_indice_entradas", "gauge", "Entradas em cada índice.",
+                [(f'{{indice="{nome}"}}', tamanho) for nome, tamanho in self.tamanhos_indices().items()])
+        metrica("locadora_alugueis_por_minuto", "gauge", "Aluguéis concluídos nos últimos 60 segundos.",
+                [("", self.alugueis_por_minuto())])
+        return "\n".join(linhas) + "\n"
+
+    def exportar_prometheus(self, caminho: str):
+        """Grava as métricas no arquivo (substituição atômica, para coleta por node_exporter/textfile)."""
+        caminho_temporario = caminho + ".tmp"
+        with open(caminho_temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto_prometheus())
+        os.replace(caminho_temporario, caminho)
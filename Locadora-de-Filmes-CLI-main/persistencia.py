@@ -0,0 +1,294 @@
+import os
+import json
+import threading
+from registro_filme import RegistroFilme
+
+VERSAO_FORMATO = 2
+
+
+def _serializar(obj):
+    """Converte os tipos que o JSON não suporta nativamente (registros de filme, conjuntos de gêneros)."""
+    if isinstance(obj, RegistroFilme):
+        return obj.para_dict()
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável.")
+
+
+def _filme_de_json(dados: dict) -> dict:
+    dados['generos'] = set(dados.get('generos', []))
+    return dados
+
+
+def _cliente_de_json(dados: dict) -> dict:
+    # Snapshots da versão 1 trazem o histórico dentro de cada cliente.
+    if 'historico_alugueis' in dados:
+        dados['historico_alugueis'] = [tuple(aluguel) for aluguel in dados['historico_alugueis']]
+    return dados
+
+
+def aplicar_mutacao(gerenciador, operacao: str, dados: dict):
+    """Reaplica uma mutação do journal diretamente no estado do gerenciador."""
+    if operacao == 'filme_adicionado':
+        gerenciador._inserir_filme(_filme_de_json(dados['filme']))
+    elif operacao == 'filme_removido':
+        no_filme = gerenciador.filmes_por_id_idx.get(dados['id'])
+        if no_filme:
+            gerenciador._excluir_filme(no_filme)
+    elif operacao == 'cliente_adicionado':
+        gerenciador._inserir_cliente(_cliente_de_json(dados['cliente']))
+    elif operacao == 'cliente_removido':
+        cliente = gerenciador.clientes_cadastrados.get(dados['id_cliente'])
+        if cliente:
+            gerenciador._excluir_cliente(cliente)
+    elif operacao == 'filme_alugado':
+        no_filme = gerenciador.filmes_por_id_idx[dados['id_filme']]
+        cliente = gerenciador.clientes_cadastrados[dados['id_cliente']]
+        gerenciador._aplicar_aluguel(no_filme.data, cliente, dados['data_aluguel'], dados.get('data_vencimento'),
+                                     dados.get('copia'))
+    elif operacao == 'filme_devolvido':
+        dados_filme = gerenciador.filmes_por_id_idx[dados['id_filme']].data
+        # Entradas gravadas antes das cópias múltiplas não trazem o cliente.
+        id_cliente = dados.get('id_cliente') or gerenciador._cliente_unico(dados_filme)
+        cliente = gerenciador.clientes_cadastrados[id_cliente]
+        gerenciador._aplicar_devolucao(dados_filme, cliente, dados['data_devolucao'])
+    elif operacao == 'copias_alteradas':
+        no_filme = gerenciador.filmes_por_id_idx.get(dados['id_filme'])
+        if no_filme:
+            gerenciador._aplicar_copias(no_filme.data, dados['quantidade'])
+    elif operacao == 'filme_reservado':
+        gerenciador._aplicar_reserva(dados['id_filme'], dados['id_cliente'], dados['data_reserva'])
+    elif operacao == 'reserva_cancelada':
+        gerenciador._remover_reserva(dados['id_filme'], dados['id_cliente'])
+    elif operacao == 'prazo_filme_definido':
+        no_filme = gerenciador.filmes_por_id_idx.get(dados['id_filme'])
+        if no_filme:
+            gerenciador._aplicar_prazo_filme(no_filme.data, dados['dias'])
+    elif operacao == 'prazo_genero_definido':
+        gerenciador.prazos_por_genero[dados['genero']] = dados['dias']
+    else:
+        raise ValueError(f"Operação de journal desconhecida: '{operacao}'.")
+
+
+class PersistenciaLocadora:
+    """
+    Persiste o estado do GerenciadorLocadora em um diretório.
+
+    O estado é formado por um snapshot em JSON lines (filmes, clientes, o
+    histórico de aluguéis e as filas de reservas) e por um journal append-only com cada mutação aplicada
+    depois do snapshot. As entradas do journal são gravadas em lotes: um único
+    write + fsync a cada `tamanho_lote` mutações (ou em `sincronizar`). Quando
+    o journal passa de `limite_compactacao` entradas, ele é incorporado a um
+    novo snapshot e truncado.
+
+    Snapshot e journal carregam um número de geração: cada compactação grava o
+    snapshot com a geração seguinte e só depois recomeça o journal com ela. Se
+    o processo cair entre as duas etapas, o journal antigo (de geração menor
+    que a do snapshot) já está incorporado e é descartado na carga, em vez de
+    ser reaplicado por cima do snapshot.
+
+    As operações de escrita são protegidas por uma trava interna. Com
+    `adiar_compactacao=True`, a compactação não é feita dentro de `sincronizar`:
+    apenas `compactacao_pendente` é marcada, para que o dono do estado a execute
+    quando puder garantir um snapshot consistente (ver concorrencia.py).
+    """
+
+    ARQUIVO_SNAPSHOT = "snapshot.jsonl"
+    ARQUIVO_JOURNAL = "journal.jsonl"
+
+    def __init__(self, diretorio: str, tamanho_lote: int = 64, limite_compactacao: int = 10000):
+        if tamanho_lote < 1:
+            raise ValueError("O tamanho do lote deve ser pelo menos 1.")
+        self.diretorio = diretorio
+        self.tamanho_lote = tamanho_lote
+        self.limite_compactacao = limite_compactacao
+        self.caminho_snapshot = os.path.join(diretorio, self.ARQUIVO_SNAPSHOT)
+        self.caminho_journal = os.path.join(diretorio, self.ARQUIVO_JOURNAL)
+        self.gerenciador = None
+        self._pendentes = []
+        self._entradas_journal = 0
+        self._arquivo_journal = None
+        self.geracao = 0
+        self._trava = threading.RLock()
+        self.adiar_compactacao = False
+        self.compactacao_pendente = False
+
+    def carregar(self, gerenciador) -> bool:
+        """
+        Restaura o snapshot e reaplica o journal no gerenciador, passando a
+        registrar as mutações seguintes.
+
+        Returns:
+            bool: True se algum estado persistido foi encontrado.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.gerenciador = gerenciador
+        encontrou_estado = self._carregar_snapshot()
+        self._entradas_journal = self._reaplicar_journal()
+        encontrou_estado = encontrou_estado or self._entradas_journal > 0
+
+        self._arquivo_journal = open(self.caminho_journal, "ab")
+        if self._arquivo_journal.tell() == 0:
+            self._escrever_cabecalho_journal()
+        gerenciador.persistencia = self
+        return encontrou_estado
+
+    def _carregar_snapshot(self) -> bool:
+        if not os.path.exists(self.caminho_snapshot):
+            return False
+        with open(self.caminho_snapshot, "r", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                registro = json.loads(linha)
+                if registro['tipo'] == 'cabecalho':
+                    self.geracao = registro.get('geracao', 0)
+                    self._restaurar_sequencias(registro.get('sequencias_ids', {}))
+                    self.gerenciador.prazos_por_genero.update(registro.get('prazos_por_genero', {}))
+                elif registro['tipo'] == 'filme':
+                    self.gerenciador._inserir_filme(_filme_de_json(registro['dados']), manter_ordem=False)
+                elif registro['tipo'] == 'cliente':
+                    self.gerenciador._inserir_cliente(_cliente_de_json(registro['dados']), manter_ordem=False)
+                elif registro['tipo'] == 'aluguel':
+                    dados = registro['dados']
+                    self.gerenciador._inserir_aluguel_historico(dados['id_filme'], dados['titulo'], dados['id_cliente'],
+                                                                dados['data_aluguel'], dados['data_devolucao'],
+                                                                manter_ordem=False)
+                elif registro['tipo'] == 'reserva':
+                    dados = registro['dados']
+                    self.gerenciador._aplicar_reserva(dados['id_filme'], dados['id_cliente'], dados['data_reserva'])
+        self.gerenciador._ordenar_indices()
+        return True
+
+    def _restaurar_sequencias(self, sequencias: dict):
+        # Garante que IDs de registros já removidos não sejam reaproveitados após reiniciar.
+        for chave, gerador in (('filmes', self.gerador_filmes), ('clientes', self.gerador_clientes)):
+            if gerador is not None and hasattr(gerador, 'proximo_valor'):
+                gerador.proximo_valor = max(gerador.proximo_valor, sequencias.get(chave, 0))
+
+    @property
+    def gerador_filmes(self):
+        return getattr(self.gerenciador, 'gerador_ids_filmes', None)
+
+    @property
+    def gerador_clientes(self):
+        return getattr(self.gerenciador, 'gerador_ids_clientes', None)
+
+    def _reaplicar_journal(self) -> int:
+        if not os.path.exists(self.caminho_journal):
+            return 0
+        aplicadas = 0
+        posicao_valida = 0
+        geracao_journal = None
+        with open(self.caminho_journal, "rb") as arquivo:
+            for linha in arquivo:
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    # Última linha incompleta (gravação interrompida): descarta o restante.
+                    print(f"AVISO: Journal truncado após {aplicadas} entradas válidas.")
+                    break
+                if geracao_journal is None:
+                    # Journals sem cabeçalho são anteriores às gerações (geração 0).
+                    geracao_journal = entrada.get('geracao', 0)
+                    if geracao_journal < self.geracao:
+                        # Compactação interrompida depois do novo snapshot: o journal já está nele.
+                        print("AVISO: Journal anterior ao snapshot atual descartado.")
+                        break
+                    if 'geracao' in entrada:
+                        posicao_valida += len(linha)
+                        continue
+                aplicar_mutacao(self.gerenciador, entrada['op'], entrada['dados'])
+                aplicadas += 1
+                posicao_valida += len(linha)
+        if posicao_valida < os.path.getsize(self.caminho_journal):
+            with open(self.caminho_journal, "r+b") as arquivo:
+                arquivo.truncate(posicao_valida)
+        return aplicadas
+
+    def registrar(self, operacao: str, dados: dict):
+        """Enfileira uma mutação; o lote é gravado quando atinge `tamanho_lote`."""
+        linha = json.dumps({'op': operacao, 'dados': dados}, ensure_ascii=False, default=_serializar)
+        with self._trava:
+            self._pendentes.append(linha)
+            if len(self._pendentes) >= self.tamanho_lote:
+                self.sincronizar()
+
+    def sincronizar(self):
+        """Grava as mutações pendentes no journal com um único fsync."""
+        with self._trava:
+            if not self._pendentes or self._arquivo_journal is None:
+                return
+            bloco = ("\n".join(self._pendentes) + "\n").encode("utf-8")
+            self._arquivo_journal.write(bloco)
+            self._arquivo_journal.flush()
+            os.fsync(self._arquivo_journal.fileno())
+            self._entradas_journal += len(self._pendentes)
+            self._pendentes.clear()
+            if self._entradas_journal >= self.limite_compactacao:
+                if self.adiar_compactacao:
+                    self.compactacao_pendente = True
+                else:
+                    self.compactar()
+
+    def compactar(self):
+        """Grava um novo snapshot com o estado atual e esvazia o journal."""
+        with self._trava:
+            self._gravar_snapshot()
+            self.compactacao_pendente = False
+
+    def _gravar_snapshot(self):
+        if self.gerenciador is None:
+            return
+        if self._pendentes:
+            # O snapshot já contém essas mutações; basta descartá-las.
+            self._pendentes.clear()
+
+        caminho_temporario = self.caminho_snapshot + ".tmp"
+        with open(caminho_temporario, "w", encoding="utf-8") as arquivo:
+            sequencias = {
+                chave: gerador.proximo_valor
+                for chave, gerador in (('filmes', self.gerador_filmes), ('clientes', self.gerador_clientes))
+                if gerador is not None and hasattr(gerador, 'proximo_valor')
+            }
+            cabecalho = {'tipo': 'cabecalho', 'versao': VERSAO_FORMATO, 'geracao': self.geracao + 1, 'sequencias_ids': sequencias,
+                         'prazos_por_genero': dict(self.gerenciador.prazos_por_genero)}
+            arquivo.write(json.dumps(cabecalho) + "\n")
+            for no_filme in self.gerenciador.catalogo_filmes_dll:
+                arquivo.write(json.dumps({'tipo': 'filme', 'dados': no_filme.data}, ensure_ascii=False, default=_serializar) + "\n")
+            for cliente in self.gerenciador.clientes_cadastrados.values():
+                arquivo.write(json.dumps({'tipo': 'cliente', 'dados': cliente}, ensure_ascii=False, default=_serializar) + "\n")
+            # O histórico vem depois de filmes e clientes, na ordem em que os aluguéis foram registrados.
+            for id_filme, titulo, id_cliente, data_aluguel, data_devolucao in self.gerenciador.historico.eventos():
+                aluguel = {'id_filme': id_filme, 'titulo': titulo, 'id_cliente': id_cliente,
+                           'data_aluguel': data_aluguel, 'data_devolucao': data_devolucao}
+                arquivo.write(json.dumps({'tipo': 'aluguel', 'dados': aluguel}, ensure_ascii=False) + "\n")
+            # As reservas vêm depois de filmes e clientes, cada fila na ordem de atendimento.
+            for id_filme, fila in self.gerenciador.reservas_por_filme.items():
+                for no_reserva in fila:
+                    id_cliente, data_reserva = no_reserva.data
+                    reserva = {'id_filme': id_filme, 'id_cliente': id_cliente, 'data_reserva': data_reserva}
+                    arquivo.write(json.dumps({'tipo': 'reserva', 'dados': reserva}, ensure_ascii=False) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(caminho_temporario, self.caminho_snapshot)
+        self.geracao += 1
+
+        # Só trunca o journal depois que o novo snapshot está no disco.
+        if self._arquivo_journal is not None:
+            self._arquivo_journal.truncate(0)
+            self._escrever_cabecalho_journal()
+        self._entradas_journal = 0
+
+    def _escrever_cabecalho_journal(self):
+        self._arquivo_journal.write((json.dumps({'geracao': self.geracao}) + "\n").encode("utf-8"))
+        self._arquivo_journal.flush()
+        os.fsync(self._arquivo_journal.fileno())
+
+    def fechar(self):
+        """Grava as mutações pendentes e fecha o journal."""
+        with self._trava:
+            self.sincronizar()
+            if self._arquivo_journal is not None:
+                self._arquivo_journal.close()
+                self._arquivo_journal = None
+        if self.gerenciador is not None and self.gerenciador.persistencia is self:
+            self.gerenciador.persistencia = None
@@ -0,0 +1,97 @@
+import time
+import logging
+import threading
+import datetime
+import collections
+from logging.handlers import RotatingFileHandler
+
+# Códigos de ação e o texto exibido para cada um (formatado só na leitura).
+MODELOS_ACOES = {
+    'ACAO': "{texto}",
+    'FILME_ADICIONADO': "Filme '{titulo}' adicionado ao catálogo (ID: {id_filme})",
+    'FILME_REMOVIDO': "Filme '{titulo}' removido do catálogo (ID: {id_filme})",
+    'CLIENTE_ADICIONADO': "Cliente '{nome}' adicionado (ID: {id_cliente})",
+    'CLIENTE_REMOVIDO': "Cliente '{nome}' removido do sistema (ID: {id_cliente})",
+    'FILME_ALUGADO': "Filme '{titulo}' alugado para '{nome}' (ID Cliente: {id_cliente})",
+    'FILME_DEVOLVIDO': "Filme '{titulo}' devolvido por '{nome}' (ID Cliente: {id_cliente})",
+    'COPIAS_ADICIONADAS': "{quantidade} cópia(s) de '{titulo}' adicionada(s) (ID: {id_filme})",
+    'COPIAS_REMOVIDAS': "{quantidade} cópia(s) de '{titulo}' removida(s) (ID: {id_filme})",
+    'FILME_RESERVADO': "Filme '{titulo}' reservado para '{nome}' (ID Cliente: {id_cliente})",
+    'RESERVA_CANCELADA': "Reserva do filme {id_filme} cancelada (ID Cliente: {id_cliente})",
+    'IMPORTACAO_FILMES': "Importação em lote: {importados} filme(s) adicionados, {duplicados} duplicado(s), {invalidos} inválido(s)",
+    'IMPORTACAO_CLIENTES': "Importação em lote: {importados} cliente(s) adicionados, {duplicados} duplicado(s), {invalidos} inválido(s)",
+}
+
+RegistroAcao = collections.namedtuple('RegistroAcao', 'instante codigo id_filme id_cliente detalhes')
+
+
+class RegistroAcoes:
+    """
+    Log de ações em um buffer circular de capacidade fixa.
+
+    Cada ação é guardada como um registro estruturado (instante monotônico,
+    código, IDs envolvidos e os detalhes usados no texto). Nenhuma string é
+    formatada ao registrar: o texto só é montado quando as ações são lidas.
+    Quando o buffer está cheio, o registro mais antigo é descartado ou, se
+    `arquivo_descarte` for informado, gravado em um arquivo com rotação.
+
+    Args:
+        capacidade (int): Quantidade máxima de ações mantidas em memória.
+        arquivo_descarte (str, opcional): Arquivo que recebe as ações descartadas.
+        tamanho_max_arquivo (int): Tamanho em bytes que dispara a rotação do arquivo.
+        arquivos_rotacao (int): Quantidade de arquivos antigos mantidos na rotação.
+    """
+
+    def __init__(self, capacidade: int = 1000, arquivo_descarte: str | None = None,
+                 tamanho_max_arquivo: int = 1 << 20, arquivos_rotacao: int = 3):
+        if capacidade < 1:
+            raise ValueError("A capacidade do log de ações deve ser pelo menos 1.")
+        self.capacidade = capacidade
+        self._registros = collections.deque(maxlen=capacidade)
+        # Referência para converter o relógio monotônico em data e hora na exibição.
+        self._base_monotonica = time.monotonic()
+        self._base_epoch = time.time()
+        self._logger_descarte = None
+        # Protege o buffer: registrar e ultimos podem ser chamados de threads diferentes ao mesmo tempo.
+        self._trava = threading.Lock()
+        if arquivo_descarte:
+            self._logger_descarte = logging.getLogger(f"locadora.acoes.{id(self)}")
+            self._logger_descarte.propagate = False
+            self._logger_descarte.setLevel(logging.INFO)
+            self._logger_descarte.addHandler(
+                RotatingFileHandler(arquivo_descarte, maxBytes=tamanho_max_arquivo,
+                                    backupCount=arquivos_rotacao, encoding="utf-8"))
+
+    def registrar(self, codigo: str, id_filme: str | None = None, id_cliente: str | None = None, **detalhes):
+        registro = RegistroAcao(time.monotonic(), codigo, id_filme, id_cliente, detalhes)
+        with self._trava:
+            if self._logger_descarte is not None and len(self._registros) == self.capacidade:
+                self._logger_descarte.info(self.formatar(self._registros[0]))
+            self._registros.append(registro)
+
+    def formatar(self, registro: RegistroAcao) -> str:
+        instante = self._base_epoch + (registro.instante - self._base_monotonica)
+        data_hora = datetime.datetime.fromtimestamp(instante).strftime("%Y-%m-%d %H:%M:%S")
+        modelo = MODELOS_ACOES.get(registro.codigo, registro.codigo)
+        texto = modelo.format(id_filme=registro.id_filme, id_cliente=registro.id_cliente, **registro.detalhes)
+        return f"[{data_hora}] {texto}"
+
+    def ultimos(self, quantidade: int = 10, codigo: str | None = None,
+                id_entidade: str | None = None) -> list[RegistroAcao]:
+        """Retorna os registros mais recentes primeiro, opcionalmente filtrados por código ou por ID."""
+        # Uma cópia tirada sob a trava: o filtro não percorre o deque enquanto outra thread registra.
+        with self._trava:
+            registros = list(self._registros)
+        encontrados = []
+        for registro in reversed(registros):
+            if len(encontrados) >= quantidade:
+                break
+            if codigo is not None and registro.codigo != codigo:
+                continue
+            if id_entidade is not None and id_entidade not in (registro.id_filme, registro.id_cliente):
+                continue
+            encontrados.append(registro)
+        return encontrados
+
+    def __len__(self):
+        return len(self._registros)
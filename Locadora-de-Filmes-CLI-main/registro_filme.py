@@ -0,0 +1,144 @@
+import sys
+
+
+class RegistroFilme:
+    """
+    Representação compacta de um filme do catálogo.
+
+    Usa __slots__ em vez de um dicionário por filme e guarda gêneros e atores
+    em tuplas de strings internadas (sys.intern): cada nome de gênero, ator ou
+    diretor existe uma única vez na memória, não importa quantos filmes o
+    referenciem. Oferece a mesma interface de leitura e escrita de um dict
+    (filme['titulo'], filme.get('diretor', 'N/A'), filme['status'] = ...)
+    para que o código que recebia o payload em dicionário continue funcionando.
+    """
+
+    CAMPOS = ('id', 'titulo', 'ano', 'diretor', 'generos', 'atores',
+              'status', 'copias', 'copias_livres', 'alugueis')
+    _CAMPOS_CONJUNTO = frozenset(CAMPOS)
+    # Campos do formato antigo (uma única cópia por filme), convertidos em de_dict.
+    _CAMPOS_ALUGUEL_UNICO = ('id_cliente_alugou', 'data_aluguel', 'data_vencimento')
+
+    __slots__ = CAMPOS + ('extras',)
+
+    def __init__(self, id, titulo, ano, diretor, generos, atores,
+                 status='disponivel', copias=1, copias_livres=None, alugueis=None):
+        self.id = id
+        self.titulo = titulo
+        self.ano = ano
+        self.diretor = sys.intern(diretor) if diretor else diretor
+        self.generos = tuple(sorted(sys.intern(genero) for genero in generos))
+        self.atores = tuple(sys.intern(ator) for ator in atores)
+        # 'alugado' quando não sobra nenhuma cópia livre.
+        self.status = status
+        self.copias = copias
+        # Pilha com os números das cópias livres; None enquanto nenhuma foi alugada
+        # (todas as cópias de 1 a `copias` livres), para não alocar uma lista por filme.
+        self.copias_livres = copias_livres
+        # id_cliente -> (número da cópia, data do aluguel, vencimento como ordinal); None se vazio.
+        self.alugueis = alugueis
+        # Campos fora do esquema fixo (criado só quando necessário).
+        self.extras = None
+
+    @classmethod
+    def de_dict(cls, dados) -> "RegistroFilme":
+        if isinstance(dados, cls):
+            return dados
+        alugueis = dados.get('alugueis')
+        copias_livres = dados.get('copias_livres')
+        if alugueis:
+            alugueis = {id_cliente: tuple(aluguel) for id_cliente, aluguel in alugueis.items()}
+        elif dados.get('id_cliente_alugou'):
+            alugueis = {dados['id_cliente_alugou']: (1, dados.get('data_aluguel'), dados.get('data_vencimento'))}
+            copias_livres = []
+        registro = cls(
+            dados['id'], dados['titulo'], dados['ano'], dados.get('diretor'),
+            dados.get('generos', ()), dados.get('atores', ()), dados.get('status', 'disponivel'),
+            dados.get('copias', 1), copias_livres, alugueis or None
+        )
+        for chave, valor in dados.items():
+            if chave not in cls._CAMPOS_CONJUNTO and chave not in cls._CAMPOS_ALUGUEL_UNICO:
+                registro[chave] = valor
+        return registro
+
+    def copias_alugadas(self) -> int:
+        alugueis = self.alugueis
+        return len(alugueis) if alugueis else 0
+
+    def copias_disponiveis(self) -> int:
+        return self.copias - self.copias_alugadas()
+
+    def para_dict(self) -> dict:
+        dados = {campo: getattr(self, campo) for campo in self.CAMPOS}
+        dados['generos'] = list(self.generos)
+        dados['atores'] = list(self.atores)
+        # Lidos uma única vez: no modo concorrente, o aluguel pode trocar o campo por None entre o teste e a cópia.
+        copias_livres, alugueis = self.copias_livres, self.alugueis
+        if copias_livres is not None:
+            dados['copias_livres'] = list(copias_livres)
+        if alugueis is not None:
+            dados['alugueis'] = dict(alugueis)
+        if self.extras:
+            dados.update(self.extras)
+        return dados
+
+    def __getitem__(self, chave):
+        if chave in self._CAMPOS_CONJUNTO:
+            return getattr(self, chave)
+        if self.extras is not None and chave in self.extras:
+            return self.extras[chave]
+        raise KeyError(chave)
+
+    def __setitem__(self, chave, valor):
+        if chave == 'generos':
+            valor = tuple(sorted(sys.intern(genero) for genero in valor))
+        elif chave == 'atores':
+            valor = tuple(sys.intern(ator) for ator in valor)
+        if chave in self._CAMPOS_CONJUNTO:
+            setattr(self, chave, valor)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[chave] = valor
+
+    def __delitem__(self, chave):
+        if chave in self._CAMPOS_CONJUNTO or self.extras is None:
+            raise KeyError(chave)
+        del self.extras[chave]
+
+    def __contains__(self, chave):
+        return chave in self._CAMPOS_CONJUNTO or (self.extras is not None and chave in self.extras)
+
+    def get(self, chave, padrao=None):
+        if chave in self._CAMPOS_CONJUNTO:
+            return getattr(self, chave)
+        if self.extras is not None:
+            return self.extras.get(chave, padrao)
+        return padrao
+
+    def keys(self):
+        return list(self.CAMPOS) + (list(self.extras) if self.extras else [])
+
+    def items(self):
+        return [(chave, self[chave]) for chave in self.keys()]
+
+    def values(self):
+        return [self[chave] for chave in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.CAMPOS) + (len(self.extras) if self.extras else 0)
+
+    def __eq__(self, other):
+        if isinstance(other, RegistroFilme):
+            return self.para_dict() == other.para_dict()
+        if isinstance(other, dict):
+            return self.para_dict() == RegistroFilme.de_dict(other).para_dict()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.para_dict())
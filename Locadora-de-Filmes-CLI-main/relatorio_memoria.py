@@ -0,0 +1,61 @@
+"""
+Relatório de memória por filme: payload em dicionário vs. RegistroFilme compacto.
+
+Uso:
+    python relatorio_memoria.py [quantidade_de_filmes]
+"""
+import sys
+import tracemalloc
+from linkedlist import Node
+from registro_filme import RegistroFilme
+
+GENEROS = ["Ação", "Aventura", "Drama", "Comédia", "Fantasia", "Ficção Científica", "Terror", "Animação"]
+
+
+class NoSemSlots:
+    """Réplica do nó original (sem __slots__), usada como referência."""
+    def __init__(self, data, prev=None, next=None):
+        self.data = data
+        self.next = next
+        self.prev = prev
+
+
+def _payload(i: int) -> dict:
+    # Os nomes são montados a cada linha, como acontece ao ler um arquivo:
+    # strings iguais chegam como objetos distintos.
+    generos = {GENEROS[(i + j) % len(GENEROS)].encode().decode() for j in range(2)}
+    atores = [f"Ator {(i * 7 + j) % 5000}" for j in range(3)]
+    return {
+        'id': f"{i:08x}", 'titulo': f"Filme número {i}", 'ano': 1950 + i % 70,
+        'diretor': f"Diretor {i % 2000}", 'generos': generos, 'atores': atores,
+        'status': 'disponivel', 'copias': 1, 'copias_livres': None, 'alugueis': None
+    }
+
+
+def medir_bytes_por_filme(quantidade: int, compacto: bool) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    nos = []
+    for i in range(quantidade):
+        payload = _payload(i)
+        if compacto:
+            nos.append(Node(RegistroFilme.de_dict(payload)))
+        else:
+            nos.append(NoSemSlots(payload))
+    usado = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return usado / quantidade
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    antes = medir_bytes_por_filme(quantidade, compacto=False)
+    depois = medir_bytes_por_filme(quantidade, compacto=True)
+    print(f"Filmes medidos: {quantidade}")
+    print(f"Antes  (dict + set + list, nó sem __slots__): {antes:8.1f} bytes/filme")
+    print(f"Depois (RegistroFilme + nó com __slots__):    {depois:8.1f} bytes/filme")
+    print(f"Redução: {100 * (1 - depois / antes):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import sys
+
+
+class SaidaBufferizada:
+    """
+    Acumula o texto das listagens e o escreve no destino em blocos grandes.
+
+    Substitui uma sequência de chamadas a print por poucas chamadas a write,
+    o que importa quando uma listagem tem centenas de milhares de linhas.
+    Pode ser usada como gerenciador de contexto: o restante é descarregado ao sair.
+    """
+
+    def __init__(self, destino=None, tamanho_bloco: int = 1 << 16):
+        self.destino = destino if destino is not None else sys.stdout
+        self.tamanho_bloco = tamanho_bloco
+        self._partes = []
+        self._tamanho = 0
+
+    def escrever(self, texto: str):
+        self._partes.append(texto)
+        self._tamanho += len(texto)
+        if self._tamanho >= self.tamanho_bloco:
+            self.descarregar()
+
+    def linha(self, texto: str = ""):
+        self.escrever(texto + "\n")
+
+    def descarregar(self):
+        aninhada = isinstance(self.destino, SaidaBufferizada)
+        if self._partes:
+            texto = "".join(self._partes)
+            self._partes.clear()
+            self._tamanho = 0
+            # Dentro de outra SaidaBufferizada (um script redirecionado, por exemplo), o texto entra no
+            # buffer externo sem forçar sua descarga: quem decide quando escrever é o buffer de fora.
+            if aninhada:
+                self.destino.escrever(texto)
+            else:
+                self.destino.write(texto)
+        if not aninhada:
+            self.destino.flush()
+
+    # Interface de arquivo, para uso com contextlib.redirect_stdout.
+    def write(self, texto: str) -> int:
+        self.escrever(texto)
+        return len(texto)
+
+    def flush(self):
+        self.descarregar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.descarregar()
+        return False
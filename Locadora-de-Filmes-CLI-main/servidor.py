@@ -0,0 +1,340 @@
+import io
+import json
+import asyncio
+import contextlib
+from registro_filme import RegistroFilme
+
+# Maior página aceita nas listagens, para que uma única requisição não monopolize o loop.
+LIMITE_MAXIMO_PAGINA = 500
+# Tamanho máximo de uma linha de requisição (também limita o buffer de leitura por conexão).
+TAMANHO_MAXIMO_LINHA = 1 << 16
+
+
+class ErroRequisicao(Exception):
+    """Requisição malformada ou com argumentos inválidos."""
+
+
+def _para_json(obj):
+    if isinstance(obj, RegistroFilme):
+        return obj.para_dict()
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável.")
+
+
+def _limite_pagina(args: dict) -> int:
+    limite = args.get('limite', 50)
+    if not isinstance(limite, int) or isinstance(limite, bool) or limite < 1:
+        raise ErroRequisicao("'limite' deve ser um inteiro positivo.")
+    return min(limite, LIMITE_MAXIMO_PAGINA)
+
+
+def _offset_pagina(args: dict) -> int:
+    offset = args.get('offset', 0)
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ErroRequisicao("'offset' deve ser um inteiro não negativo.")
+    return offset
+
+
+def _obrigatorio(args: dict, chave: str):
+    if chave not in args:
+        raise ErroRequisicao(f"Argumento obrigatório ausente: '{chave}'.")
+    return args[chave]
+
+
+def _texto(args: dict, chave: str, padrao=None, opcional: bool = False) -> str | None:
+    """Argumento de texto; obrigatório quando não há padrão (com opcional=True, pode faltar ou ser null)."""
+    if opcional or padrao is not None:
+        valor = args.get(chave, padrao)
+        if valor is None:
+            return None
+    else:
+        valor = _obrigatorio(args, chave)
+    if not isinstance(valor, str):
+        raise ErroRequisicao(f"'{chave}' deve ser um texto.")
+    return valor
+
+
+def _inteiro(args: dict, chave: str, padrao: int | None = None) -> int:
+    """Argumento inteiro (booleanos não valem); obrigatório quando não há padrão."""
+    valor = _obrigatorio(args, chave) if padrao is None else args.get(chave, padrao)
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise ErroRequisicao(f"'{chave}' deve ser um número inteiro.")
+    return valor
+
+
+def _lista_textos(args: dict, chave: str) -> list[str]:
+    valor = args.get(chave, [])
+    if not isinstance(valor, list) or not all(isinstance(item, str) for item in valor):
+        raise ErroRequisicao(f"'{chave}' deve ser uma lista de textos.")
+    return valor
+
+
+def _op_ping(gerenciador, args):
+    return "pong"
+
+
+def _op_buscar_filme(gerenciador, args):
+    return gerenciador.buscar_filme_por_id(_texto(args, 'id'))
+
+
+def _op_buscar(gerenciador, args):
+    criterios = {}
+    if 'generos' in args:
+        criterios['generos'] = _lista_textos(args, 'generos')
+    if 'todos_generos' in args:
+        if not isinstance(args['todos_generos'], bool):
+            raise ErroRequisicao("'todos_generos' deve ser true ou false.")
+        criterios['todos_generos'] = args['todos_generos']
+    for chave in ('ator', 'diretor', 'status'):
+        if chave in args:
+            criterios[chave] = _texto(args, chave, opcional=True)
+    for chave in ('ano_min', 'ano_max'):
+        if args.get(chave) is not None:
+            criterios[chave] = _inteiro(args, chave)
+    return list(gerenciador.buscar_filmes(offset=_offset_pagina(args), limite=_limite_pagina(args), **criterios))
+
+
+def _op_buscar_titulo(gerenciador, args):
+    return gerenciador.buscar_por_titulo(_texto(args, 'consulta'), min(_inteiro(args, 'k', 10), LIMITE_MAXIMO_PAGINA))
+
+
+def _op_similares(gerenciador, args):
+    similares = gerenciador.filmes_similares(_texto(args, 'id_filme'), min(_inteiro(args, 'k', 10), LIMITE_MAXIMO_PAGINA))
+    return [{'filme': filme, 'pontuacao': pontuacao} for filme, pontuacao in similares]
+
+
+def _op_listar_filmes(gerenciador, args):
+    filmes = list(gerenciador.iterar_filmes(_offset_pagina(args), _limite_pagina(args),
+                                            _texto(args, 'apos_id', opcional=True)))
+    # O cursor permite paginar sem custo de offset: basta repassá-lo em 'apos_id'.
+    return {'filmes': filmes, 'proximo': filmes[-1]['id'] if filmes else None}
+
+
+def _op_listar_clientes(gerenciador, args):
+    return list(gerenciador.iterar_clientes(_offset_pagina(args), _limite_pagina(args)))
+
+
+def _op_historico(gerenciador, args):
+    alugueis = gerenciador.iterar_historico_cliente(_texto(args, 'id_cliente'), _offset_pagina(args), _limite_pagina(args))
+    return [{'id_filme': id_filme, 'titulo': titulo, 'data_aluguel': data_aluguel, 'data_devolucao': data_devolucao}
+            for id_filme, titulo, data_aluguel, data_devolucao in alugueis]
+
+
+def _op_alugueis_entre(gerenciador, args):
+    data_ini, data_fim = _texto(args, 'data_ini'), _texto(args, 'data_fim')
+    try:
+        alugueis = list(gerenciador.alugueis_entre(data_ini, data_fim, _offset_pagina(args), _limite_pagina(args)))
+    except ValueError:
+        raise ErroRequisicao("'data_ini' e 'data_fim' devem estar no formato AAAA-MM-DD.") from None
+    return [{'id_filme': id_filme, 'titulo': titulo, 'id_cliente': id_cliente,
+             'data_aluguel': data_aluguel, 'data_devolucao': data_devolucao}
+            for id_filme, titulo, id_cliente, data_aluguel, data_devolucao in alugueis]
+
+
+def _op_alugar(gerenciador, args):
+    return gerenciador.alugar_filme(_texto(args, 'id_filme'), _texto(args, 'id_cliente'))
+
+
+def _op_devolver(gerenciador, args):
+    return gerenciador.devolver_filme(_texto(args, 'id_filme'), _texto(args, 'id_cliente', opcional=True))
+
+
+def _op_reservar(gerenciador, args):
+    return gerenciador.reservar_filme(_texto(args, 'id_filme'), _texto(args, 'id_cliente'))
+
+
+def _op_cancelar_reserva(gerenciador, args):
+    return gerenciador.cancelar_reserva(_texto(args, 'id_filme'), _texto(args, 'id_cliente'))
+
+
+def _op_posicao_fila(gerenciador, args):
+    id_filme = _texto(args, 'id_filme')
+    return {'posicao': gerenciador.posicao_na_fila(id_filme, _texto(args, 'id_cliente')),
+            'tamanho': gerenciador.tamanho_fila(id_filme)}
+
+
+def _op_adicionar_filme(gerenciador, args):
+    return gerenciador.adicionar_filme_catalogo(
+        _texto(args, 'titulo'), _inteiro(args, 'ano'), _texto(args, 'diretor', ''),
+        set(_lista_textos(args, 'generos')), _lista_textos(args, 'atores'), _inteiro(args, 'copias', 1))
+
+
+def _op_adicionar_cliente(gerenciador, args):
+    return gerenciador.adicionar_cliente(_texto(args, 'nome'), _texto(args, 'contato', ''))
+
+
+OPERACOES = {
+    'ping': _op_ping,
+    'buscar_filme': _op_buscar_filme,
+    'buscar': _op_buscar,
+    'buscar_titulo': _op_buscar_titulo,
+    'similares': _op_similares,
+    'listar_filmes': _op_listar_filmes,
+    'listar_clientes': _op_listar_clientes,
+    'historico': _op_historico,
+    'alugueis_entre': _op_alugueis_entre,
+    'alugar': _op_alugar,
+    'devolver': _op_devolver,
+    'reservar': _op_reservar,
+    'cancelar_reserva': _op_cancelar_reserva,
+    'posicao_fila': _op_posicao_fila,
+    'adicionar_filme': _op_adicionar_filme,
+    'adicionar_cliente': _op_adicionar_cliente,
+}
+
+# Operações que podem gerar entradas no journal: a resposta só sai depois do fsync.
+OPERACOES_ESCRITA = frozenset({
+    'alugar', 'devolver', 'reservar', 'cancelar_reserva', 'adicionar_filme', 'adicionar_cliente',
+})
+
+
+class ServidorLocadora:
+    """
+    Servidor asyncio que expõe as operações do GerenciadorLocadora.
+
+    O protocolo é JSON delimitado por linha: cada requisição é um objeto
+    {"id": ..., "op": "...", "args": {...}} e cada resposta traz o mesmo "id",
+    "ok" (sucesso da operação), "resultado" e "mensagem" (o texto que a
+    operação escreveria no terminal). As conexões são persistentes e aceitam
+    pipelining: o cliente pode enviar várias requisições sem esperar as
+    respostas, que voltam na mesma ordem.
+
+    Tudo roda em um único event loop, então as operações acessam o catálogo
+    em memória uma de cada vez e não precisam de travas. A contrapressão vem
+    do próprio asyncio: cada conexão lê no máximo `TAMANHO_MAXIMO_LINHA` bytes
+    adiantados e aguarda `drain()` quando o buffer de escrita enche (cliente
+    que não lê as respostas deixa de ser lido).
+
+    Com persistência, a resposta de uma operação de escrita só é enviada depois
+    que o journal foi gravado com fsync. As escritas de todas as conexões
+    atendidas na mesma volta do event loop compartilham um único fsync
+    (group commit); o journal também é sincronizado ao fechar cada conexão.
+    """
+
+    def __init__(self, gerenciador):
+        self.gerenciador = gerenciador
+        self.conexoes_ativas = 0
+        self.requisicoes_atendidas = 0
+        # Há mutações executadas cujo fsync ainda não foi feito; _gravacao é o fsync já agendado.
+        self._gravacao_pendente = False
+        self._gravacao = None
+
+    def executar(self, requisicao) -> dict:
+        """Executa uma requisição já decodificada e monta a resposta."""
+        if not isinstance(requisicao, dict):
+            return {'id': None, 'ok': False, 'erro': "A requisição deve ser um objeto JSON."}
+        id_requisicao = requisicao.get('id')
+        operacao = OPERACOES.get(requisicao.get('op'))
+        if operacao is None:
+            return {'id': id_requisicao, 'ok': False, 'erro': f"Operação desconhecida: '{requisicao.get('op')}'."}
+        args = requisicao.get('args') or {}
+        if not isinstance(args, dict):
+            return {'id': id_requisicao, 'ok': False, 'erro': "'args' deve ser um objeto JSON."}
+
+        if requisicao.get('op') in OPERACOES_ESCRITA:
+            self._gravacao_pendente = True
+        mensagens = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(mensagens):
+                resultado = operacao(self.gerenciador, args)
+        except ErroRequisicao as e:
+            return {'id': id_requisicao, 'ok': False, 'erro': str(e)}
+        except (TypeError, ValueError) as e:
+            return {'id': id_requisicao, 'ok': False, 'erro': f"Argumentos inválidos: {e}"}
+        except Exception as e:
+            # Uma falha inesperada vira resposta de erro: a conexão e as requisições enfileiradas nela seguem vivas.
+            return {'id': id_requisicao, 'ok': False, 'erro': f"Erro interno ao executar '{requisicao.get('op')}': {e!r}"}
+        self.requisicoes_atendidas += 1
+        return {
+            'id': id_requisicao,
+            'ok': resultado is not None and resultado is not False,
+            'resultado': resultado,
+            'mensagem': mensagens.getvalue().strip(),
+        }
+
+    def _responder(self, linha: bytes) -> bytes:
+        try:
+            requisicao = json.loads(linha)
+        except ValueError:
+            resposta = {'id': None, 'ok': False, 'erro': "JSON inválido."}
+        else:
+            resposta = self.executar(requisicao)
+        return (json.dumps(resposta, ensure_ascii=False, default=_para_json) + "\n").encode("utf-8")
+
+    def sincronizar(self):
+        """Grava no journal (com fsync) as mutações já executadas, se houver persistência."""
+        self._gravacao_pendente = False
+        persistencia = getattr(self.gerenciador, 'persistencia', None)
+        if persistencia is not None:
+            persistencia.sincronizar()
+
+    async def _aguardar_gravacao(self):
+        if self._gravacao is None:
+            loop = asyncio.get_running_loop()
+            self._gravacao = loop.create_future()
+            # call_soon roda depois das conexões já prontas nesta volta do loop: um fsync cobre todas elas.
+            loop.call_soon(self._gravar)
+        await self._gravacao
+
+    def _gravar(self):
+        futuro, self._gravacao = self._gravacao, None
+        try:
+            self.sincronizar()
+        except Exception as e:
+            futuro.set_exception(e)
+        else:
+            futuro.set_result(None)
+
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        self.conexoes_ativas += 1
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    # Linha maior que o limite: responde e encerra a conexão.
+                    escritor.write(b'{"id": null, "ok": false, "erro": "Requisicao grande demais."}\n')
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                resposta = self._responder(linha)
+                if self._gravacao_pendente:
+                    await self._aguardar_gravacao()
+                escritor.write(resposta)
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.conexoes_ativas -= 1
+            if self._gravacao_pendente:
+                self.sincronizar()
+            escritor.close()
+            with contextlib.suppress(ConnectionError):
+                await escritor.wait_closed()
+
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = 8765, caminho_unix: str | None = None):
+        if caminho_unix:
+            return await asyncio.start_unix_server(self.atender, caminho_unix, limit=TAMANHO_MAXIMO_LINHA)
+        return await asyncio.start_server(self.atender, host, porta, limit=TAMANHO_MAXIMO_LINHA, backlog=1024)
+
+
+def executar_servidor(gerenciador, host: str = "127.0.0.1", porta: int = 8765, caminho_unix: str | None = None):
+    """Inicia o servidor e atende até ser interrompido (Ctrl+C)."""
+    servidor_locadora = ServidorLocadora(gerenciador)
+
+    async def principal():
+        servidor = await servidor_locadora.iniciar(host, porta, caminho_unix)
+        endereco = caminho_unix or f"{host}:{porta}"
+        print(f"Servidor da locadora aguardando conexões em {endereco} (Ctrl+C para encerrar).")
+        async with servidor:
+            await servidor.serve_forever()
+
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+    finally:
+        servidor_locadora.sincronizar()